@@ -0,0 +1,77 @@
+# === Analista Esportivo Inteligente ===
+# Ponto de entrada único: estilo, entradas e barra lateral rodam sempre; a página
+# da fase ativa é importada só quando é exibida pela primeira vez.
+import importlib
+
+import streamlit as st
+
+import sessao
+from memoria import diagnosticar_memoria
+from paginas import entradas, lateral
+from perfil import finalizar_perfil, iniciar_perfil, parar_perfil
+
+st.set_page_config(page_title="Analista Esportivo Inteligente", layout="wide")
+medicao_perfil = iniciar_perfil()
+# O perfil é parado num finally: st.rerun() e st.stop() interrompem o script com
+# uma exceção e pulariam o fim da página
+concluida = False
+try:
+    background_image_base64 = sessao.get_base64_image("ChatGPTima.png")
+
+    # Estilo
+    st.markdown(f"""
+        <style>
+        .stApp {{
+            background-image: url("data:image/png;base64,{background_image_base64}");
+            background-size: cover;
+            background-attachment: fixed;
+            background-repeat: no-repeat;
+            background-position: center;
+        }}
+        .block-container {{
+            background-color: rgba(0, 0, 0, 0.75);
+            padding: 2rem;
+            border-radius: 15px;
+        }}
+        input, textarea {{ background-color: #111; color: white; }}
+        .stMarkdown, .stTextInput, .stNumberInput, .stRadio, .stButton, .stDownloadButton {{
+            color: white !important;
+        }}
+        </style>
+    """, unsafe_allow_html=True)
+
+    # Título
+    st.markdown("""
+        <div style="padding: 30px; border-radius: 10px; color: white; margin-bottom: 30px;">
+            <h1>⚽ Analista Esportivo Inteligente</h1>
+            <p>Preencha os dados abaixo para começar a análise:</p>
+        </div>
+    """, unsafe_allow_html=True)
+
+    questionarios, erros_questionarios = sessao.inicializar()
+    entradas.exibir_campos()
+    modo_rodada = lateral.exibir(sessao.fatores_por_questionario())
+
+    # Página ativa: o fluxo da análise é guiado pelo estado (fase e subfase), não pela URL,
+    # por isso o despacho é feito aqui e não com st.navigation
+    fase = st.session_state.fase
+    if modo_rodada:
+        importlib.import_module("paginas.rodada").exibir()
+    elif fase == 1:
+        entradas.exibir(questionarios, erros_questionarios)
+    elif fase == 2:
+        importlib.import_module("paginas.checklist").exibir()
+    elif fase == 3:
+        if 'subfase_kelly' not in st.session_state:
+            st.session_state.subfase_kelly = 0
+        if st.session_state.subfase_kelly == 0:
+            importlib.import_module("paginas.probabilidades").exibir()
+        else:
+            importlib.import_module("paginas.kelly").exibir()
+
+    # === Diagnóstico de memória (?memoria=1) ===
+    diagnosticar_memoria("rodada" if modo_rodada else fase)
+    concluida = True
+finally:
+    # Perfil da execução (?profile=1); se interrompida, fica para a próxima
+    finalizar_perfil(parar_perfil(medicao_perfil), concluida)
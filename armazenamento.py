@@ -0,0 +1,299 @@
+# === Histórico colunar (Apache Arrow) com leitura mapeada em memória ===
+# Cada tabela (análises, odds, fechamento, resultados, apostas, o livro-caixa da
+# banca, as características dos times e os jogos da forma recente) é uma pasta com
+# arquivos Arrow IPC sem compressão, um por lote gravado. A leitura usa
+# memory-map: abrir um histórico de várias temporadas só lê os metadados, as
+# páginas das colunas são carregadas pelo sistema operacional quando tocadas e
+# ficam compartilhadas entre os processos do Streamlit. Parquet serve para
+# exportar/importar arquivos compactos.
+#
+# Quando os lotes passam de LIMITE_PARTES, a tabela é compactada numa base
+# "base-<último lote>.arrow". A base entra com um rename atômico e o seu nome diz
+# até qual lote ela cobre: a partir daí os leitores ignoram os lotes incorporados,
+# que só então são apagados. Gravar e compactar a mesma tabela passam por uma
+# trava de arquivo, que vale também entre processos.
+import glob
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+PASTA_HISTORICO = os.path.join("dados", "historico")
+LIMITE_PARTES = 64
+ARQUIVO_TRAVA = ".trava"
+_trava = threading.Lock()
+
+
+def _esquemas():
+    return {
+        "analises": pa.schema([
+            ("data", pa.timestamp("s")),
+            ("analista", pa.string()),
+            ("partida", pa.string()),
+            ("time_casa", pa.string()),
+            ("time_fora", pa.string()),
+            ("questionario", pa.string()),
+            ("vitoria", pa.float64()),
+            ("empate", pa.float64()),
+            ("derrota", pa.float64()),
+            ("odd_vitoria", pa.float64()),
+            ("odd_empate", pa.float64()),
+            ("odd_derrota", pa.float64()),
+            ("banca", pa.float64()),
+            ("stake", pa.float64()),
+            ("mercado", pa.string()),
+        ]),
+        "odds": pa.schema([
+            ("data", pa.timestamp("s")),
+            ("partida", pa.string()),
+            ("casa_aposta", pa.string()),
+            ("resultado", pa.int8()),
+            ("odd", pa.float64()),
+        ]),
+        "fechamento": pa.schema([
+            ("data", pa.timestamp("s")),
+            ("partida", pa.string()),
+            ("resultado", pa.int8()),
+            ("odd", pa.float64()),
+        ]),
+        "resultados": pa.schema([
+            ("data", pa.timestamp("s")),
+            ("partida", pa.string()),
+            ("gols_casa", pa.int16()),
+            ("gols_fora", pa.int16()),
+            ("liga", pa.string()),
+        ]),
+        "apostas": pa.schema([
+            ("data", pa.timestamp("s")),
+            ("id_aposta", pa.string()),
+            ("analista", pa.string()),
+            ("partida", pa.string()),
+            ("mercado", pa.string()),
+            ("selecao", pa.int8()),
+            ("linha", pa.float64()),
+            ("odd", pa.float64()),
+            ("stake", pa.float64()),
+        ]),
+        "banca": pa.schema([
+            ("data", pa.timestamp("s")),
+            ("analista", pa.string()),
+            ("id_aposta", pa.string()),
+            ("tipo", pa.string()),
+            ("valor", pa.float64()),
+        ]),
+        "jogos": pa.schema([
+            ("data", pa.timestamp("s")),
+            ("data_jogo", pa.timestamp("s")),
+            ("time_casa", pa.string()),
+            ("time_fora", pa.string()),
+            ("gols_casa", pa.int16()),
+            ("gols_fora", pa.int16()),
+            ("xg_casa", pa.float64()),
+            ("xg_fora", pa.float64()),
+        ]),
+        "caracteristicas": pa.schema([
+            ("data", pa.timestamp("s")),
+            ("arquivo", pa.string()),
+            ("partida", pa.string()),
+            ("time", pa.string()),
+            ("adversario", pa.string()),
+            ("chutes", pa.int32()),
+            ("chutes_no_alvo", pa.int32()),
+            ("gols", pa.int32()),
+            ("xg", pa.float64()),
+            ("posse", pa.float64()),
+            ("passes", pa.int32()),
+            ("chutes_contra", pa.int32()),
+            ("gols_contra", pa.int32()),
+            ("xg_contra", pa.float64()),
+        ]),
+    }
+
+
+def _exigir_pyarrow():
+    if pa is None:
+        raise RuntimeError("Instale o pacote 'pyarrow' para usar o histórico colunar")
+
+
+def esquema(nome):
+    _exigir_pyarrow()
+    esquemas = _esquemas()
+    if nome not in esquemas:
+        raise ValueError(f"Tabela desconhecida: {nome}")
+    return esquemas[nome]
+
+
+@contextmanager
+def _tabela_travada(nome, pasta):
+    # Não reentrante: quem já está com a trava não chama gravar_lote nem compactar
+    pasta_tabela = os.path.join(pasta, nome)
+    with _trava:
+        os.makedirs(pasta_tabela, exist_ok=True)
+        if fcntl is None:
+            # Sem fcntl (Windows) vale só a trava do processo
+            yield pasta_tabela
+            return
+        with open(os.path.join(pasta_tabela, ARQUIVO_TRAVA), "a") as arquivo:
+            fcntl.flock(arquivo, fcntl.LOCK_EX)
+            try:
+                yield pasta_tabela
+            finally:
+                fcntl.flock(arquivo, fcntl.LOCK_UN)
+
+
+def _listar(nome, pasta):
+    # (arquivos vigentes, arquivos já incorporados a uma base, ainda no disco)
+    pasta_tabela = os.path.join(pasta, nome)
+    bases = sorted(glob.glob(os.path.join(pasta_tabela, "base-*.arrow")))
+    partes = sorted(glob.glob(os.path.join(pasta_tabela, "parte-*.arrow")))
+    if not bases:
+        return partes, []
+    # Os nomes dos lotes crescem com o tempo; a base "base-<lote>+<n>" cobre até o lote do seu nome
+    cobertura = "parte-" + _lote_coberto(bases[-1]) + ".arrow"
+    novas = [caminho for caminho in partes if os.path.basename(caminho) > cobertura]
+    return [bases[-1]] + novas, bases[:-1] + partes[:len(partes) - len(novas)]
+
+
+def _lote_coberto(base):
+    return os.path.basename(base)[len("base-"):].rsplit("+", 1)[0]
+
+
+def arquivos_tabela(nome, pasta):
+    return _listar(nome, pasta)[0]
+
+
+def lotes_novos(nome, pasta, marca=None):
+    # Leitura incremental: devolve (reler, caminhos, marca nova). 'marca' guarda a base
+    # vigente, o último arquivo lido e o mtime da pasta; sem mudança na pasta custa um
+    # stat, sem listar nada. reler=True quando a base mudou (compactação): os caminhos
+    # são a tabela inteira e quem acompanha recomeça do zero
+    try:
+        versao = os.stat(os.path.join(pasta, nome)).st_mtime_ns
+    except FileNotFoundError:
+        versao = None
+    base, ultimo, versao_lida = marca if marca is not None else (None, "", None)
+    # Um mtime recente pode esconder uma gravação no mesmo tique do relógio do sistema
+    # de arquivos: só vale como "nada mudou" depois de um segundo
+    if marca is not None and versao == versao_lida and (versao is None or time.time_ns() - versao > 1_000_000_000):
+        return False, [], marca
+    arquivos = arquivos_tabela(nome, pasta)
+    base_atual = arquivos[0] if arquivos and os.path.basename(arquivos[0]).startswith("base-") else None
+    reler = marca is not None and base_atual != base
+    novos = arquivos if reler else [caminho for caminho in arquivos if os.path.basename(caminho) > ultimo]
+    return reler, novos, (base_atual, os.path.basename(arquivos[-1]) if arquivos else "", versao)
+
+
+def _escrever(caminho, tabela):
+    temporario = caminho + ".tmp"
+    with pa.OSFile(temporario, "wb") as destino:
+        with pa.ipc.new_file(destino, tabela.schema) as escritor:
+            escritor.write_table(tabela)
+    # Renomear é atômico: leitores nunca veem um arquivo pela metade
+    os.replace(temporario, caminho)
+
+
+def gravar_lote(nome, dados, pasta=PASTA_HISTORICO):
+    # Acrescenta um lote (DataFrame ou tabela Arrow) como um novo arquivo;
+    # arquivos já gravados nunca mudam
+    esquema_tabela = esquema(nome)
+    if isinstance(dados, pa.Table):
+        tabela = dados.select(esquema_tabela.names).cast(esquema_tabela)
+    else:
+        tabela = pa.Table.from_pandas(dados, schema=esquema_tabela, preserve_index=False)
+    with _tabela_travada(nome, pasta) as pasta_tabela:
+        # O nome sai dentro da trava, então os lotes aparecem na ordem dos nomes
+        caminho = os.path.join(pasta_tabela, f"parte-{datetime.now():%Y%m%d%H%M%S%f}-{os.getpid()}.arrow")
+        _escrever(caminho, tabela)
+        n_arquivos = len(arquivos_tabela(nome, pasta))
+    if n_arquivos > LIMITE_PARTES:
+        compactar(nome, pasta)
+    return caminho
+
+
+def ler_parte(caminho):
+    return pa.ipc.open_file(pa.memory_map(caminho, "r")).read_all()
+
+
+def abrir_tabela(nome, pasta=PASTA_HISTORICO):
+    # Tabela Arrow apoiada nos arquivos mapeados em memória (sem cópia)
+    esquema_tabela = esquema(nome)
+    while True:
+        try:
+            partes = [ler_parte(caminho) for caminho in arquivos_tabela(nome, pasta)]
+            break
+        except FileNotFoundError:
+            # Compactação entre a listagem e a leitura: a lista nova já tem a base
+            continue
+    if not partes:
+        return esquema_tabela.empty_table()
+    return pa.concat_tables(partes)
+
+
+def abrir_dataframe(nome, pasta=PASTA_HISTORICO, colunas=None):
+    tabela = abrir_tabela(nome, pasta)
+    if colunas is not None:
+        tabela = tabela.select(colunas)
+    # split_blocks evita consolidar colunas numéricas num bloco novo (sem cópia quando possível)
+    return tabela.to_pandas(split_blocks=True, self_destruct=False)
+
+
+def coluna_numpy(tabela, coluna):
+    # Sem cópia quando a coluna tem um único bloco numérico sem nulos
+    dados = tabela.column(coluna)
+    if dados.num_chunks == 1:
+        return dados.chunk(0).to_numpy(zero_copy_only=False)
+    return dados.to_numpy()
+
+
+def compactar(nome, pasta=PASTA_HISTORICO, transformar=None):
+    # Junta a base e os lotes num único arquivo, com um bloco só por coluna;
+    # 'transformar' (tabela Arrow -> tabela Arrow) reescreve as linhas no caminho
+    # e devolve None quando não há o que mudar
+    with _tabela_travada(nome, pasta) as pasta_tabela:
+        atuais = arquivos_tabela(nome, pasta)
+        if not atuais or (len(atuais) == 1 and transformar is None):
+            return None
+        tabela = pa.concat_tables([ler_parte(caminho) for caminho in atuais])
+        if transformar is not None:
+            tabela = transformar(tabela)
+            if tabela is None:
+                return None
+            tabela = tabela.cast(esquema(nome))
+        # A base nova leva o nome do último lote incorporado; reescrever uma base sem
+        # lotes novos só avança o contador
+        ultimo = os.path.basename(atuais[-1])
+        if ultimo.startswith("parte-"):
+            caminho = os.path.join(pasta_tabela, f"base-{ultimo[len('parte-'):-len('.arrow')]}+000000.arrow")
+        else:
+            contador = int(ultimo[:-len(".arrow")].rsplit("+", 1)[1]) + 1
+            caminho = os.path.join(pasta_tabela, f"base-{_lote_coberto(ultimo)}+{contador:06d}.arrow")
+        _escrever(caminho, tabela.combine_chunks())
+    # Os incorporados já estão fora da listagem; leitores que ainda os têm mapeados
+    # continuam lendo (no Windows o arquivo aberto não sai e fica para a próxima vez)
+    for antigo in _listar(nome, pasta)[1]:
+        try:
+            os.remove(antigo)
+        except OSError:
+            pass
+    return caminho
+
+
+def exportar_parquet(nome, caminho, pasta=PASTA_HISTORICO):
+    pq.write_table(abrir_tabela(nome, pasta), caminho, compression="zstd")
+
+
+def importar_parquet(nome, caminho, pasta=PASTA_HISTORICO):
+    return gravar_lote(nome, pq.read_table(caminho), pasta)
@@ -0,0 +1,45 @@
+# === Mercado como prior, checklist como evidência (Dirichlet) ===
+# As odds sem a margem da casa viram um prior de Dirichlet sobre (vitória, empate,
+# derrota) com tantas pseudo-contagens quanto a confiança no mercado pedir; cada
+# resposta do checklist soma o seu peso às contagens do resultado favorecido e
+# "Nenhum" divide o peso igualmente entre os três. A Dirichlet é conjugada, então
+# o posterior é só uma soma de contagens: fórmulas fechadas, vetorizadas sobre
+# lotes com a última dimensão (vitória, empate, derrota).
+import numpy as np
+
+PESO_MERCADO_PADRAO = 0.5
+PESO_MERCADO_MAXIMO = 0.99
+
+
+def probabilidades_sem_margem(odds):
+    # Inversos das odds normalizados; sem odds válidas, 1/3 para cada resultado
+    odds = np.asarray(odds, dtype=float)
+    validas = odds > 0
+    inversos = np.where(validas, 1 / np.where(validas, odds, 1), 0)
+    total = inversos.sum(axis=-1, keepdims=True)
+    return np.where(total > 0, inversos / np.where(total > 0, total, 1), 1 / 3)
+
+
+def concentracao(peso_mercado, total_pesos):
+    # Pseudo-contagens do prior: com o checklist inteiro respondido, o mercado
+    # responde por 'peso_mercado' das contagens do posterior
+    peso = np.clip(peso_mercado, 0, PESO_MERCADO_MAXIMO)
+    return np.asarray(total_pesos, dtype=float) * peso / (1 - peso)
+
+
+def evidencia(saldo_casa, saldo_fora, peso_respondido):
+    casa, fora, respondido = np.broadcast_arrays(
+        np.asarray(saldo_casa, dtype=float), np.asarray(saldo_fora, dtype=float), np.asarray(peso_respondido, dtype=float)
+    )
+    neutro = np.maximum(respondido - casa - fora, 0) / 3
+    return np.stack([casa + neutro, neutro, fora + neutro], axis=-1)
+
+
+def posterior(odds, saldo_casa, saldo_fora, peso_respondido, peso_mercado, total_pesos):
+    # Média e desvio padrão (em %) de cada resultado sob Dirichlet(alfa)
+    alfa = (np.asarray(concentracao(peso_mercado, total_pesos))[..., None] * probabilidades_sem_margem(odds)
+            + evidencia(saldo_casa, saldo_fora, peso_respondido))
+    alfa0 = alfa.sum(axis=-1, keepdims=True)
+    media = np.where(alfa0 > 0, alfa / np.where(alfa0 > 0, alfa0, 1), 1 / 3)
+    desvio = np.sqrt(media * (1 - media) / (alfa0 + 1))
+    return {"alfa": alfa, "media": media * 100, "desvio": desvio * 100}
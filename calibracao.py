@@ -0,0 +1,222 @@
+# === Calibração e pontuação das previsões salvas ===
+# Compara as probabilidades (vitória, empate, derrota) de cada análise salva com o
+# resultado real do jogo: Brier, log-loss, RPS (ranked probability score, que leva
+# em conta a ordem vitória < empate < derrota) e diagrama de confiabilidade por
+# faixa de probabilidade. Tudo fica em somas por grupo (liga, analista, questionário
+# e mês) atualizadas só com os lotes novos do histórico, então o painel lê somas
+# prontas em vez de recalcular sobre todas as previsões.
+import glob
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+import armazenamento
+from surebet import RESULTADOS
+
+COLUNAS_RESULTADOS = ["partida", "gols_casa", "gols_fora"]
+DIMENSOES = {"total": "Todas", "liga": "Liga", "analista": "Analista", "questionario": "Questionário", "mes": "Mês"}
+N_FAIXAS = 10
+EPS = 1e-4
+# Somas por grupo: previsões, Brier, log-loss, RPS
+_N, _BRIER, _LOG, _RPS = range(4)
+# Por resultado e faixa: previsões, probabilidade prevista, acertos
+_CONTAGEM, _PREVISTA, _OBSERVADA = range(3)
+
+
+def ler_resultados(caminhos):
+    # CSV com partida, gols_casa, gols_fora e, opcionalmente, liga
+    if isinstance(caminhos, (str, os.PathLike)):
+        caminhos = sorted(glob.glob(os.path.join(caminhos, "*.csv"))) if os.path.isdir(caminhos) else [caminhos]
+    tabelas = [pd.read_csv(c, usecols=lambda coluna: coluna in COLUNAS_RESULTADOS + ["liga"]) for c in caminhos]
+    if not tabelas:
+        return pd.DataFrame(columns=COLUNAS_RESULTADOS + ["liga"])
+    return pd.concat(tabelas, ignore_index=True)
+
+
+def importar_resultados(df, pasta=armazenamento.PASTA_HISTORICO):
+    faltando = set(COLUNAS_RESULTADOS) - set(df.columns)
+    if faltando:
+        raise KeyError(f"Colunas ausentes: {', '.join(sorted(faltando))}")
+    df = df.dropna(subset=COLUNAS_RESULTADOS)
+    if not len(df):
+        return None
+    liga = df["liga"].fillna("").astype(str) if "liga" in df else pd.Series("", index=df.index)
+    return armazenamento.gravar_lote("resultados", pd.DataFrame({
+        "data": pd.Timestamp.now().floor("s"),
+        "partida": df["partida"].astype(str).to_numpy(),
+        "gols_casa": df["gols_casa"].to_numpy(dtype=np.int16),
+        "gols_fora": df["gols_fora"].to_numpy(dtype=np.int16),
+        "liga": liga.to_numpy(),
+    }), pasta)
+
+
+def resultado_1x2(gols_casa, gols_fora):
+    # 0 = vitória da casa, 1 = empate, 2 = vitória do visitante
+    diferenca = np.asarray(gols_casa, dtype=int) - np.asarray(gols_fora, dtype=int)
+    return np.where(diferenca > 0, 0, np.where(diferenca == 0, 1, 2))
+
+
+def pontuacoes(probs, resultados):
+    # probs: (n, 3) somando 1; resultados: códigos 0/1/2. Brier multiclasse (0 a 2),
+    # log-loss natural e RPS (0 a 1)
+    probs = np.asarray(probs, dtype=float)
+    observado = np.eye(3)[np.asarray(resultados, dtype=int)]
+    brier = ((probs - observado) ** 2).sum(axis=1)
+    log = -np.log(np.clip(probs[np.arange(len(probs)), resultados], EPS, 1))
+    rps = ((np.cumsum(probs, axis=1)[:, :2] - np.cumsum(observado, axis=1)[:, :2]) ** 2).sum(axis=1) / 2
+    return brier, log, rps
+
+
+def normalizar(vitoria, empate, derrota):
+    # Percentuais salvos (arredondados) para probabilidades que somam 1
+    probs = np.column_stack([vitoria, empate, derrota]).astype(float)
+    total = probs.sum(axis=1, keepdims=True)
+    return np.where(total > 0, probs / np.where(total > 0, total, 1), 1 / 3)
+
+
+class AgregadosCalibracao:
+    # Mesmo esquema dos agregados de CLV: previsões e resultados entram nas somas
+    # dos seus grupos quando aparecem, e um resultado corrigido sai e entra de novo
+    def __init__(self, pasta=armazenamento.PASTA_HISTORICO, n_faixas=N_FAIXAS):
+        self.pasta = pasta
+        self.n_faixas = n_faixas
+        self._trava = threading.Lock()
+        self._limpar()
+
+    def _limpar(self):
+        self._arquivos = set()
+        self._resultados = {}
+        self._previsoes = pd.DataFrame({
+            "partida": pd.Series(dtype=object), "analista": pd.Series(dtype=object),
+            "questionario": pd.Series(dtype=object), "mes": pd.Series(dtype=object),
+            "vitoria": pd.Series(dtype=float), "empate": pd.Series(dtype=float), "derrota": pd.Series(dtype=float),
+        })
+        self._pontos = {dimensao: {} for dimensao in DIMENSOES}
+        self._faixas = {dimensao: {} for dimensao in DIMENSOES}
+
+    def _somar(self, previsoes, sinal):
+        # Soma (ou subtrai) um lote de previsões com resultado conhecido em cada dimensão
+        if not len(previsoes):
+            return
+        resultado, liga = zip(*previsoes["partida"].map(self._resultados))
+        resultado = np.asarray(resultado, dtype=int)
+        probs = normalizar(previsoes["vitoria"], previsoes["empate"], previsoes["derrota"])
+        pontos = np.column_stack([np.ones(len(probs)), *pontuacoes(probs, resultado)])
+        faixa = np.minimum((probs * self.n_faixas).astype(int), self.n_faixas - 1)
+        observado = np.eye(3)[resultado]
+
+        grupos = {
+            "total": np.full(len(probs), DIMENSOES["total"], dtype=object),
+            "liga": np.asarray(liga, dtype=object),
+            "analista": previsoes["analista"].to_numpy(dtype=object),
+            "questionario": previsoes["questionario"].to_numpy(dtype=object),
+            "mes": previsoes["mes"].to_numpy(dtype=object),
+        }
+        celula = (np.arange(3) * self.n_faixas + faixa).ravel()
+        for dimensao, valores in grupos.items():
+            codigos, nomes = pd.factorize(pd.Series(valores).replace("", "—").fillna("—"))
+            n_grupos = len(nomes)
+            somas = np.stack([np.bincount(codigos, weights=pontos[:, k], minlength=n_grupos) for k in range(4)], axis=1)
+            # Faixas: índice (grupo, resultado, faixa) achatado
+            indice = np.repeat(codigos, 3) * 3 * self.n_faixas + celula
+            tamanho = n_grupos * 3 * self.n_faixas
+            faixas = np.stack([
+                np.bincount(indice, minlength=tamanho),
+                np.bincount(indice, weights=probs.ravel(), minlength=tamanho),
+                np.bincount(indice, weights=observado.ravel(), minlength=tamanho),
+            ], axis=-1).reshape(n_grupos, 3, self.n_faixas, 3)
+            for k, nome in enumerate(nomes):
+                self._pontos[dimensao][nome] = self._pontos[dimensao].get(nome, 0) + sinal * somas[k]
+                self._faixas[dimensao][nome] = self._faixas[dimensao].get(nome, 0) + sinal * faixas[k]
+
+    def registrar_previsoes(self, analises):
+        # Só os meses distintos são formatados como texto
+        codigos_mes, meses = pd.factorize(pd.to_datetime(analises["data"]).dt.to_period("M"))
+        previsoes = pd.DataFrame({
+            "partida": analises["partida"].astype(str).to_numpy(),
+            "analista": analises["analista"].fillna("").to_numpy(dtype=object),
+            "questionario": analises["questionario"].fillna("").to_numpy(dtype=object),
+            "mes": meses.astype(str).to_numpy(dtype=object)[codigos_mes],
+            "vitoria": analises["vitoria"].to_numpy(dtype=float),
+            "empate": analises["empate"].to_numpy(dtype=float),
+            "derrota": analises["derrota"].to_numpy(dtype=float),
+        })
+        self._previsoes = pd.concat([self._previsoes, previsoes], ignore_index=True)
+        self._somar(previsoes[previsoes["partida"].isin(self._resultados.keys())], 1)
+
+    def registrar_resultados(self, resultados):
+        # O último lote importado vale; jogos que mudaram de placar (ou de liga) saem das somas
+        novos = resultados.drop_duplicates("partida", keep="last")
+        codigos = resultado_1x2(novos["gols_casa"], novos["gols_fora"])
+        ligas = novos["liga"].fillna("").astype(str) if "liga" in novos else pd.Series("", index=novos.index)
+        mudaram = {}
+        for partida, codigo, liga in zip(novos["partida"].astype(str), codigos, ligas):
+            novo = (int(codigo), liga)
+            if self._resultados.get(partida) != novo:
+                mudaram[partida] = novo
+        if not mudaram:
+            return
+        afetadas = self._previsoes[self._previsoes["partida"].isin(mudaram.keys())]
+        self._somar(afetadas[afetadas["partida"].isin(self._resultados.keys())], -1)
+        self._resultados.update(mudaram)
+        self._somar(afetadas, 1)
+
+    def sincronizar(self):
+        with self._trava:
+            analises = armazenamento.arquivos_tabela("analises", self.pasta)
+            resultados = armazenamento.arquivos_tabela("resultados", self.pasta)
+            if not self._arquivos <= set(analises) | set(resultados):
+                # Lotes sumiram (histórico compactado): recomeça do zero
+                self._limpar()
+            for caminho in resultados:
+                if caminho not in self._arquivos:
+                    self.registrar_resultados(armazenamento.ler_parte(caminho).to_pandas())
+                    self._arquivos.add(caminho)
+            novas = [caminho for caminho in analises if caminho not in self._arquivos]
+            if novas:
+                self.registrar_previsoes(pd.concat([armazenamento.ler_parte(c).to_pandas() for c in novas], ignore_index=True))
+                self._arquivos.update(novas)
+
+    def grupos(self, dimensao):
+        with self._trava:
+            return [grupo for grupo, somas in self._pontos[dimensao].items() if somas[_N] > 0.5]
+
+    def resumo(self, dimensao):
+        with self._trava:
+            linhas = [{DIMENSOES[dimensao]: grupo, **self._linha(somas)} for grupo, somas in self._pontos[dimensao].items() if somas[_N] > 0.5]
+        colunas = [DIMENSOES[dimensao], "Previsões", "Brier", "Log-loss", "RPS"]
+        return pd.DataFrame(linhas, columns=colunas).sort_values("Previsões", ascending=False, ignore_index=True)
+
+    def confiabilidade(self, dimensao, grupo):
+        # Diagrama de confiabilidade: probabilidade prevista média x frequência observada por faixa
+        with self._trava:
+            faixas = self._faixas[dimensao].get(grupo)
+            faixas = None if faixas is None else faixas.copy()
+        colunas = ["Resultado", "Faixa (%)", "Previsões", "Prevista (%)", "Observada (%)"]
+        if faixas is None:
+            return pd.DataFrame(columns=colunas)
+        contagem = np.round(faixas[..., _CONTAGEM])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            prevista = faixas[..., _PREVISTA] / contagem * 100
+            observada = faixas[..., _OBSERVADA] / contagem * 100
+        largura = 100 // self.n_faixas
+        resultado, faixa = np.nonzero(contagem > 0)
+        return pd.DataFrame({
+            "Resultado": np.asarray(RESULTADOS)[resultado],
+            "Faixa (%)": [f"{f * largura}-{(f + 1) * largura}" for f in faixa],
+            "Previsões": contagem[resultado, faixa].astype(int),
+            "Prevista (%)": prevista[resultado, faixa].round(1),
+            "Observada (%)": observada[resultado, faixa].round(1),
+        }, columns=colunas)
+
+    @staticmethod
+    def _linha(somas):
+        n = round(somas[_N])
+        return {
+            "Previsões": int(n),
+            "Brier": round(somas[_BRIER] / n, 4) if n else np.nan,
+            "Log-loss": round(somas[_LOG] / n, 4) if n else np.nan,
+            "RPS": round(somas[_RPS] / n, 4) if n else np.nan,
+        }
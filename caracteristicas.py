@@ -0,0 +1,242 @@
+# === Dados de evento das partidas: características dos times ===
+# Arquivos locais de eventos (JSON com a lista de eventos de uma partida, ou JSONL
+# com um evento por linha, opcionalmente .gz) são lidos em fluxo: cada evento é
+# somado nos contadores da sua partida e descartado, então a memória depende do
+# número de partidas do arquivo e não do seu tamanho. Os arquivos (e os JSONL grandes,
+# em faixas de bytes) são divididos entre processos, que devolvem só os contadores por
+# (partida, time); somados por arquivo, viram uma linha por (partida, time) com chutes,
+# gols, xG, posse e passes, e os lotes vão para a tabela colunar "caracteristicas".
+# Aceita o formato StatsBomb (type/team/shot.statsbomb_xg/duration) e um formato
+# plano (tipo/time/xg/gol/duracao).
+import glob
+import gzip
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import armazenamento
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+PASTA_EVENTOS = os.path.join("dados", "eventos")
+EXTENSOES = (".json", ".jsonl", ".ndjson", ".json.gz", ".jsonl.gz", ".ndjson.gz")
+ARQUIVOS_POR_LOTE = 200
+# JSONL sem compressão acima disso é lido em faixas de bytes por processos diferentes
+TAMANHO_FATIA = 64 * 2 ** 20
+# Sem ijson um JSON é carregado inteiro na memória do processo: acima disso é recusado
+LIMITE_JSON_SEM_IJSON = 32 * 2 ** 20
+TIPOS_CHUTE = {"Shot", "chute"}
+TIPOS_PASSE = {"Pass", "passe"}
+DESFECHOS_NO_ALVO = {"Goal", "Saved", "Saved To Post", "Saved Off Target"}
+# Contadores por (partida, time)
+_CHUTES, _NO_ALVO, _GOLS, _XG, _POSSE, _PASSES = range(6)
+COLUNAS_CONTADORES = ["chutes", "chutes_no_alvo", "gols", "xg", "posse", "passes"]
+
+
+def listar_arquivos(caminhos):
+    if isinstance(caminhos, (str, os.PathLike)):
+        if os.path.isdir(caminhos):
+            return sorted(c for c in glob.glob(os.path.join(caminhos, "**", "*"), recursive=True) if c.endswith(EXTENSOES))
+        return [os.fspath(caminhos)]
+    return [os.fspath(c) for c in caminhos]
+
+
+def ler_eventos(caminho):
+    # Gerador de eventos; JSONL linha a linha, JSON com ijson quando instalado
+    abrir = gzip.open if caminho.endswith(".gz") else open
+    with abrir(caminho, "rb") as arquivo:
+        if caminho.removesuffix(".gz").endswith((".jsonl", ".ndjson")):
+            for linha in arquivo:
+                if linha.strip():
+                    yield json.loads(linha)
+        elif ijson is not None:
+            yield from ijson.items(arquivo, "item", use_float=True)
+        else:
+            # Sem ijson o arquivo de uma partida é carregado inteiro (até LIMITE_JSON_SEM_IJSON)
+            yield from json.load(arquivo)
+
+
+def ler_faixa(caminho, inicio, fim):
+    # Eventos das linhas que começam em [inicio, fim): a linha cortada no início da
+    # faixa pertence à faixa anterior
+    with open(caminho, "rb") as arquivo:
+        if inicio > 0:
+            arquivo.seek(inicio - 1)
+            arquivo.readline()
+        posicao = arquivo.tell()
+        while posicao < fim:
+            linha = arquivo.readline()
+            if not linha:
+                break
+            posicao += len(linha)
+            if linha.strip():
+                yield json.loads(linha)
+
+
+def fatias_arquivo(caminho, tamanho_fatia=TAMANHO_FATIA):
+    # (caminho, início, fim) de cada faixa; fim None lê o arquivo inteiro (JSON, .gz, pequenos)
+    if caminho.endswith((".jsonl", ".ndjson")):
+        tamanho = os.path.getsize(caminho)
+        if tamanho > tamanho_fatia:
+            return [(caminho, inicio, min(inicio + tamanho_fatia, tamanho)) for inicio in range(0, tamanho, tamanho_fatia)]
+    return [(caminho, 0, None)]
+
+
+def _nome(valor):
+    return valor.get("name") if isinstance(valor, dict) else valor
+
+
+def agregar_eventos(eventos, partida_padrao=""):
+    # {partida: {time: contadores}} somando evento a evento
+    partidas = {}
+    for evento in eventos:
+        time = _nome(evento.get("team", evento.get("time")))
+        if time is None:
+            continue
+        partida = str(evento.get("match_id", evento.get("partida", partida_padrao)))
+        times = partidas.setdefault(partida, {})
+        contadores = times.setdefault(time, np.zeros(len(COLUNAS_CONTADORES)))
+        tipo = _nome(evento.get("type", evento.get("tipo")))
+        if tipo in TIPOS_CHUTE:
+            chute = evento.get("shot") or {}
+            desfecho = _nome(chute.get("outcome"))
+            contadores[_CHUTES] += 1
+            contadores[_XG] += float(chute.get("statsbomb_xg", evento.get("xg")) or 0)
+            contadores[_GOLS] += desfecho == "Goal" or bool(evento.get("gol"))
+            contadores[_NO_ALVO] += desfecho in DESFECHOS_NO_ALVO or bool(evento.get("no_alvo")) or bool(evento.get("gol"))
+        elif tipo in TIPOS_PASSE:
+            contadores[_PASSES] += 1
+        # Tempo de posse: duração do evento creditada ao time com a bola
+        posse = _nome(evento.get("possession_team", evento.get("time_posse", time)))
+        duracao = float(evento.get("duration", evento.get("duracao")) or 0)
+        times.setdefault(posse, np.zeros(len(COLUNAS_CONTADORES)))[_POSSE] += duracao
+    return partidas
+
+
+def linhas_partidas(partidas, arquivo=""):
+    # Uma linha por (partida, time) com os números do adversário ao lado
+    linhas = []
+    for partida, times in partidas.items():
+        total = sum(times.values())
+        for time, contadores in times.items():
+            adversario = next((outro for outro in times if outro != time), "")
+            contra = times.get(adversario, np.zeros(len(COLUNAS_CONTADORES)))
+            # Sem durações no arquivo, a posse sai da participação nos passes
+            if total[_POSSE] > 0:
+                posse = contadores[_POSSE] / total[_POSSE] * 100
+            else:
+                posse = contadores[_PASSES] / total[_PASSES] * 100 if total[_PASSES] > 0 else np.nan
+            linhas.append({
+                "arquivo": arquivo, "partida": partida, "time": time, "adversario": adversario,
+                "chutes": int(contadores[_CHUTES]), "chutes_no_alvo": int(contadores[_NO_ALVO]),
+                "gols": int(contadores[_GOLS]), "xg": contadores[_XG], "posse": posse, "passes": int(contadores[_PASSES]),
+                "chutes_contra": int(contra[_CHUTES]), "gols_contra": int(contra[_GOLS]), "xg_contra": contra[_XG],
+            })
+    return linhas
+
+
+def somar_partidas(partidas, outras):
+    # Junta os contadores de faixas diferentes do mesmo arquivo
+    for partida, times in outras.items():
+        destino = partidas.setdefault(partida, {})
+        for time, contadores in times.items():
+            if time in destino:
+                destino[time] += contadores
+            else:
+                destino[time] = contadores
+    return partidas
+
+
+def agregar_fatia(fatia):
+    # Executado nos processos: recebe uma faixa e devolve só os contadores por (partida, time)
+    caminho, inicio, fim = fatia
+    partida_padrao = os.path.basename(caminho).split(".")[0]
+    eventos = ler_eventos(caminho) if fim is None else ler_faixa(caminho, inicio, fim)
+    return agregar_eventos(eventos, partida_padrao)
+
+
+def agregar_arquivo(caminho, tamanho_fatia=TAMANHO_FATIA):
+    partidas = {}
+    for fatia in fatias_arquivo(caminho, tamanho_fatia):
+        somar_partidas(partidas, agregar_fatia(fatia))
+    return linhas_partidas(partidas, os.path.abspath(caminho))
+
+
+def arquivos_ingeridos(pasta=armazenamento.PASTA_HISTORICO):
+    return set(armazenamento.abrir_dataframe("caracteristicas", pasta, ["arquivo"])["arquivo"])
+
+
+def ingerir(caminhos=PASTA_EVENTOS, pasta=armazenamento.PASTA_HISTORICO, processos=None,
+            arquivos_por_lote=ARQUIVOS_POR_LOTE, tamanho_fatia=TAMANHO_FATIA):
+    # Arquivos já ingeridos são pulados; retorna (arquivos lidos, linhas gravadas)
+    ingeridos = arquivos_ingeridos(pasta)
+    novos = [c for c in listar_arquivos(caminhos) if os.path.abspath(c) not in ingeridos]
+    if not novos:
+        return 0, 0
+    if ijson is None:
+        grandes = [c for c in novos if c.removesuffix(".gz").endswith(".json") and os.path.getsize(c) > LIMITE_JSON_SEM_IJSON]
+        if grandes:
+            raise ValueError(
+                f"{len(grandes)} arquivo(s) JSON acima de {LIMITE_JSON_SEM_IJSON // 2 ** 20} MB exigem o ijson "
+                f"(pip install ijson): {', '.join(os.path.basename(c) for c in grandes[:5])}"
+            )
+    fatias = [fatia for caminho in novos for fatia in fatias_arquivo(caminho, tamanho_fatia)]
+    processos = min(processos or os.cpu_count() or 1, len(fatias))
+    lote, gravadas = [], 0
+
+    def gravar():
+        nonlocal lote, gravadas
+        if lote:
+            armazenamento.gravar_lote("caracteristicas", pd.DataFrame(lote).assign(data=pd.Timestamp.now().floor("s")), pasta)
+            gravadas += len(lote)
+            lote = []
+
+    if processos <= 1:
+        resultados = map(agregar_fatia, fatias)
+        executor = None
+    else:
+        # spawn: os processos não herdam as threads do servidor do Streamlit
+        executor = ProcessPoolExecutor(processos, mp_context=multiprocessing.get_context("spawn"))
+        resultados = executor.map(agregar_fatia, fatias, chunksize=max(1, len(fatias) // (processos * 8)))
+    try:
+        # As faixas de um arquivo chegam em sequência; o arquivo vira linhas na última
+        faltam = {caminho: 0 for caminho in novos}
+        for caminho, _, _ in fatias:
+            faltam[caminho] += 1
+        partidas_arquivo, lidos = {}, 0
+        for (caminho, _, _), partidas in zip(fatias, resultados):
+            somar_partidas(partidas_arquivo.setdefault(caminho, {}), partidas)
+            faltam[caminho] -= 1
+            if faltam[caminho]:
+                continue
+            lote.extend(linhas_partidas(partidas_arquivo.pop(caminho), os.path.abspath(caminho)))
+            lidos += 1
+            if lidos % arquivos_por_lote == 0:
+                gravar()
+        gravar()
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    return len(novos), gravadas
+
+
+def caracteristicas_times(dados):
+    # Médias por jogo de cada time (uma linha por partida, a última ingerida vale)
+    colunas = ["Time", "Jogos", "xG", "xG contra", "Gols", "Gols contra", "Chutes", "Chutes no alvo", "Chutes contra", "Posse (%)", "Passes"]
+    if not len(dados):
+        return pd.DataFrame(columns=colunas)
+    dados = dados.drop_duplicates(["partida", "time"], keep="last")
+    medias = dados.groupby("time").agg(
+        Jogos=("partida", "size"), xG=("xg", "mean"), **{"xG contra": ("xg_contra", "mean")},
+        Gols=("gols", "mean"), **{"Gols contra": ("gols_contra", "mean")}, Chutes=("chutes", "mean"),
+        **{"Chutes no alvo": ("chutes_no_alvo", "mean"), "Chutes contra": ("chutes_contra", "mean"), "Posse (%)": ("posse", "mean")},
+        Passes=("passes", "mean"),
+    )
+    return medias.round(2).reset_index(names="Time")[colunas].sort_values("xG", ascending=False, ignore_index=True)
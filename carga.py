@@ -0,0 +1,308 @@
+# === Teste de carga: muitos analistas simultâneos num servidor Streamlit real ===
+# Sobe o app com "streamlit run" e abre uma conexão websocket por analista, falando o
+# mesmo protocolo do navegador (BackMsg/ForwardMsg em protobuf). Cada analista
+# preenche a fase 1, responde o checklist, passa pelo Kelly e gera o relatório.
+# Cada clique ou edição é uma reexecução, medida do envio até o "script_finished".
+# No fim: vazão, latência p50/p95/p99 por etapa e memória (RSS) do servidor.
+#
+# Uso: python carga.py --analistas 200 --app app.py
+# Dependências: pip install -r requirements-dev.txt (o app mais o cliente websockets)
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+import urllib.request
+
+import numpy as np
+import pandas as pd
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+from nucleo import FATORES_PADRAO, MERCADOS
+
+PASTA = os.path.dirname(os.path.abspath(__file__))
+INTERVALO_RSS = 0.5
+TEMPO_LIMITE = 120
+
+# Tipo do elemento -> campo do WidgetState com o valor
+CAMPOS_WIDGET = {
+    "text_input": "string_value",
+    "number_input": "double_value",
+    "radio": "string_value",
+    "selectbox": "string_value",
+    "button": "trigger_value",
+    "download_button": "trigger_value",
+}
+BOTOES_MERCADO = {
+    "Empate Anula": "Empate Anula ⚖️",
+    "Dupla Possibilidade": "Dupla Possibilidade 💡",
+    "Handicap": "Handicap ⚔️",
+}
+FIM_EXECUCAO = (
+    ForwardMsg.ScriptFinishedStatus.FINISHED_SUCCESSFULLY,
+    ForwardMsg.ScriptFinishedStatus.FINISHED_FRAGMENT_RUN_SUCCESSFULLY,
+    ForwardMsg.ScriptFinishedStatus.FINISHED_WITH_COMPILE_ERROR,
+)
+
+
+def iniciar_servidor(app, porta):
+    processo = subprocess.Popen(
+        [
+            sys.executable, "-m", "streamlit", "run", app,
+            "--server.headless", "true",
+            "--server.port", str(porta),
+            "--server.fileWatcherType", "none",
+            "--browser.gatherUsageStats", "false",
+        ],
+        cwd=PASTA, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    limite = time.monotonic() + 60
+    while time.monotonic() < limite:
+        if processo.poll() is not None:
+            raise RuntimeError(f"O servidor terminou com código {processo.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{porta}/_stcore/health", timeout=1) as resposta:
+                if resposta.status == 200:
+                    return processo
+        except OSError:
+            time.sleep(0.2)
+    processo.kill()
+    raise RuntimeError("O servidor não respondeu em 60 s")
+
+
+def rss_processo(pid):
+    # Memória residente em bytes, direto do /proc (Linux)
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for linha in status:
+                if linha.startswith("VmRSS:"):
+                    return int(linha.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+class Analista:
+    def __init__(self, url):
+        self.url = url
+        self.conexao = None
+        self.widgets = {}
+        self.estados = {}
+        self.query_string = ""
+        self.pagina = ""
+        self.latencias = []
+        self.erros = []
+
+    async def conectar(self):
+        self.conexao = await websockets.connect(
+            self.url, subprotocols=["streamlit"], max_size=None, open_timeout=TEMPO_LIMITE
+        )
+        await self.executar("inicio")
+
+    async def fechar(self):
+        if self.conexao is not None:
+            await self.conexao.close()
+
+    async def executar(self, etapa, gatilho=None, fragmento=""):
+        # Uma reexecução: envia o estado dos widgets como o navegador e espera o fim
+        mensagem = BackMsg()
+        cliente = mensagem.rerun_script
+        cliente.query_string = self.query_string
+        cliente.page_script_hash = self.pagina
+        cliente.fragment_id = fragmento
+        cliente.widget_states.widgets.extend(self.estados.values())
+        if gatilho is not None:
+            cliente.widget_states.widgets.append(gatilho)
+
+        inicio = time.perf_counter()
+        await self.conexao.send(mensagem.SerializeToString())
+        while True:
+            resposta = ForwardMsg()
+            resposta.ParseFromString(await asyncio.wait_for(self.conexao.recv(), TEMPO_LIMITE))
+            tipo = resposta.WhichOneof("type")
+            if tipo == "new_session":
+                self.pagina = resposta.new_session.main_script_hash
+            elif tipo == "page_info_changed":
+                self.query_string = resposta.page_info_changed.query_string
+            elif tipo == "delta":
+                self._ler_delta(resposta.delta)
+            elif tipo == "script_finished" and resposta.script_finished in FIM_EXECUCAO:
+                break
+        self.latencias.append((etapa, time.perf_counter() - inicio))
+
+    def _ler_delta(self, delta):
+        if delta.WhichOneof("type") != "new_element":
+            return
+        elemento = delta.new_element
+        tipo = elemento.WhichOneof("type")
+        if tipo == "exception":
+            self.erros.append(elemento.exception.message)
+        elif tipo in CAMPOS_WIDGET:
+            widget = getattr(elemento, tipo)
+            # Rótulos repetidos (ex.: "Próxima") ficam com o widget mais recente
+            self.widgets[widget.label] = (widget.id, tipo, delta.fragment_id)
+
+    def _widget(self, rotulo):
+        if rotulo not in self.widgets:
+            raise RuntimeError(f"Widget não encontrado na página: {rotulo}")
+        return self.widgets[rotulo]
+
+    async def definir(self, etapa, rotulo, valor):
+        id_widget, tipo, fragmento = self._widget(rotulo)
+        estado = WidgetState(id=id_widget)
+        setattr(estado, CAMPOS_WIDGET[tipo], valor)
+        self.estados[id_widget] = estado
+        await self.executar(etapa, fragmento=fragmento)
+
+    async def clicar(self, etapa, rotulo):
+        # Gatilhos valem só para a execução do clique, como no navegador
+        id_widget, _, fragmento = self._widget(rotulo)
+        await self.executar(etapa, WidgetState(id=id_widget, trigger_value=True), fragmento)
+
+
+async def jornada(analista, rng, pausa):
+    async def pensar():
+        if pausa > 0:
+            await asyncio.sleep(rng.uniform(0.5, 1.5) * pausa)
+
+    await analista.conectar()
+
+    # Fase 1: times, odds e início do checklist
+    time_casa, time_fora = f"Casa {rng.randrange(1000)}", f"Fora {rng.randrange(1000)}"
+    entradas = [
+        ("Time da Casa", time_casa),
+        ("Time Visitante", time_fora),
+        ("Odd Vitória (Casa)", round(rng.uniform(1.2, 5), 2)),
+        ("Odd Empate", round(rng.uniform(2.5, 4.5), 2)),
+        ("Odd Vitória (Visitante)", round(rng.uniform(1.2, 8), 2)),
+    ]
+    for rotulo, valor in entradas:
+        await pensar()
+        await analista.definir("fase 1", rotulo, valor)
+    await pensar()
+    await analista.clicar("fase 1", "➡️ Começar Checklist")
+
+    # Fase 2: uma resposta por critério (mudar o rádio também reexecuta o fragmento)
+    for _ in FATORES_PADRAO:
+        await pensar()
+        escolha = rng.choice(["Nenhum", time_casa, time_fora])
+        if escolha != "Nenhum":
+            await analista.definir("checklist", "Quem leva vantagem?", escolha)
+        await analista.clicar("checklist", "Próxima")
+
+    # Fase 3: probabilidades, Kelly e relatório
+    await pensar()
+    await analista.clicar("kelly", "➡️ Próximo")
+    await pensar()
+    await analista.clicar("relatorio", BOTOES_MERCADO[rng.choice(MERCADOS)])
+    analista._widget("📥 Baixar Relatório TXT")
+
+
+async def monitorar_rss(pid, amostras, parar):
+    while not parar.is_set():
+        rss = rss_processo(pid)
+        if rss is not None:
+            amostras.append(rss)
+        try:
+            await asyncio.wait_for(parar.wait(), INTERVALO_RSS)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def rodar_carga(url, n_analistas, rampa, pausa, semente, pid):
+    rng = random.Random(semente)
+    analistas = [Analista(url) for _ in range(n_analistas)]
+    falhas = []
+
+    async def iniciar(i, analista):
+        await asyncio.sleep(rampa * i / max(1, n_analistas))
+        try:
+            await jornada(analista, random.Random(rng.random()), pausa)
+        except Exception as erro:
+            falhas.append(f"analista {i}: {type(erro).__name__}: {erro}")
+        finally:
+            await analista.fechar()
+
+    amostras_rss, parar = [], asyncio.Event()
+    monitor = asyncio.create_task(monitorar_rss(pid, amostras_rss, parar)) if pid else None
+    inicio = time.perf_counter()
+    await asyncio.gather(*(iniciar(i, analista) for i, analista in enumerate(analistas)))
+    duracao = time.perf_counter() - inicio
+    parar.set()
+    if monitor is not None:
+        await monitor
+    return analistas, falhas, duracao, amostras_rss
+
+
+def percentis(latencias):
+    ms = np.asarray(latencias) * 1000
+    return {
+        "Execuções": len(ms),
+        "p50 (ms)": round(float(np.percentile(ms, 50)), 1),
+        "p95 (ms)": round(float(np.percentile(ms, 95)), 1),
+        "p99 (ms)": round(float(np.percentile(ms, 99)), 1),
+        "Máx (ms)": round(float(ms.max()), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga com analistas simultâneos")
+    parser.add_argument("--analistas", type=int, default=50)
+    parser.add_argument("--app", default="app.py")
+    parser.add_argument("--porta", type=int, default=8599)
+    parser.add_argument("--url", help="servidor já em execução (ex.: ws://localhost:8501/_stcore/stream)")
+    parser.add_argument("--pid", type=int, help="PID do servidor indicado em --url, para medir o RSS")
+    parser.add_argument("--rampa", type=float, default=5.0, help="segundos para todos os analistas entrarem")
+    parser.add_argument("--pausa", type=float, default=0.0, help="tempo médio de reflexão entre ações (s)")
+    parser.add_argument("--semente", type=int, default=0)
+    args = parser.parse_args()
+
+    servidor = None
+    if args.url:
+        url, pid = args.url, args.pid
+    else:
+        servidor = iniciar_servidor(args.app, args.porta)
+        url, pid = f"ws://127.0.0.1:{args.porta}/_stcore/stream", servidor.pid
+
+    try:
+        # Aquece imports e caches do servidor com um analista antes de medir
+        asyncio.run(rodar_carga(url, 1, 0, 0, args.semente, None))
+        rss_base = rss_processo(pid) if pid else None
+        analistas, falhas, duracao, amostras_rss = asyncio.run(
+            rodar_carga(url, args.analistas, args.rampa, args.pausa, args.semente, pid)
+        )
+    finally:
+        if servidor is not None:
+            servidor.terminate()
+            servidor.wait()
+
+    latencias = [registro for analista in analistas for registro in analista.latencias]
+    erros = [erro for analista in analistas for erro in analista.erros]
+    concluidos = args.analistas - len(falhas)
+
+    print(f"Analistas:                 {args.analistas} ({concluidos} concluíram, {len(falhas)} falharam)")
+    print(f"Duração:                   {duracao:.1f} s")
+    if latencias:
+        print(f"Vazão:                     {len(latencias) / duracao:.1f} execuções/s, {concluidos / duracao * 60:.1f} análises/min")
+        df = pd.DataFrame(latencias, columns=["Etapa", "Latência"])
+        resumo = pd.DataFrame(
+            [{"Etapa": etapa, **percentis(grupo["Latência"])} for etapa, grupo in df.groupby("Etapa", sort=False)]
+            + [{"Etapa": "total", **percentis(df["Latência"])}]
+        )
+        print(resumo.to_string(index=False))
+    if amostras_rss:
+        pico = max(amostras_rss)
+        print(f"RSS do servidor:           base {rss_base / 1024 ** 2:.0f} MiB, pico {pico / 1024 ** 2:.0f} MiB, "
+              f"final {amostras_rss[-1] / 1024 ** 2:.0f} MiB")
+        print(f"RSS por analista:          {(pico - rss_base) / max(1, args.analistas) / 1024:.0f} KiB")
+    for mensagem in (falhas + [f"exceção no app: {erro}" for erro in erros])[:10]:
+        print("⚠️", mensagem)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+# === Closing Line Value (CLV) ===
+# Compara a odd tomada em cada aposta registrada com a odd de fechamento da mesma
+# seleção: CLV = odd tomada / odd de fechamento - 1. CLV positivo de forma consistente
+# indica que o analista encontra valor antes do mercado. Os fechamentos (1X2) ficam
+# numa tabela própria do histórico colunar, importados em lote de arquivos locais;
+# o fechamento de empate anula, dupla possibilidade e das linhas de handicap -0,5,
+# 0 e +0,5 sai das três odds de fechamento. As demais linhas não têm equivalente no
+# 1X2 e ficam fora do CLV.
+import glob
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+import armazenamento
+import liquidacao
+from nucleo import MERCADOS
+from surebet import codigos_resultado
+
+COLUNAS_FECHAMENTO = ["partida", "resultado", "odd"]
+SUFIXOS = ["vitoria", "empate", "derrota"]
+DIMENSOES = {"mercado": "Mercado", "analista": "Analista"}
+# Somas por grupo: apostas, CLV, stake, CLV x stake, apostas acima do fechamento
+_N, _CLV, _STAKE, _CLV_STAKE, _POSITIVAS = range(5)
+
+
+def ler_fechamentos(caminhos):
+    # CSV no formato longo: partida, resultado, odd (odd de fechamento)
+    if isinstance(caminhos, (str, os.PathLike)):
+        caminhos = sorted(glob.glob(os.path.join(caminhos, "*.csv"))) if os.path.isdir(caminhos) else [caminhos]
+    tabelas = [pd.read_csv(c, usecols=COLUNAS_FECHAMENTO) for c in caminhos]
+    if not tabelas:
+        return pd.DataFrame(columns=COLUNAS_FECHAMENTO)
+    return pd.concat(tabelas, ignore_index=True)
+
+
+def importar_fechamentos(df, pasta=armazenamento.PASTA_HISTORICO):
+    df = df.dropna(subset=COLUNAS_FECHAMENTO)
+    df = df[df["odd"].astype(float) > 1]
+    if not len(df):
+        return None
+    return armazenamento.gravar_lote("fechamento", pd.DataFrame({
+        "data": pd.Timestamp.now().floor("s"),
+        "partida": df["partida"].astype(str).to_numpy(),
+        "resultado": codigos_resultado(df["resultado"]).to_numpy(dtype=np.int8),
+        "odd": df["odd"].to_numpy(dtype=float),
+    }), pasta)
+
+
+def fechamento_largo(fechamento):
+    # Uma linha por jogo com as três odds de fechamento; o último lote importado vale
+    largo = (
+        fechamento.drop_duplicates(["partida", "resultado"], keep="last")
+        .pivot(index="partida", columns="resultado", values="odd")
+        .reindex(columns=range(len(SUFIXOS)))
+    )
+    largo.columns = [f"fechamento_{sufixo}" for sufixo in SUFIXOS]
+    return largo
+
+
+def calcular_clv(odd_tomada, odd_fechamento):
+    odd_tomada = np.asarray(odd_tomada, dtype=float)
+    odd_fechamento = np.asarray(odd_fechamento, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(odd_fechamento > 1, odd_tomada / odd_fechamento - 1, np.nan)
+
+
+def fechamento_equivalente(mercados, selecoes, linhas, fechamentos):
+    # Odd de fechamento da seleção apostada a partir das odds 1X2 de fechamento
+    # (apostas, 3); NaN quando o mercado ou a linha não têm equivalente
+    mercados, selecoes = np.asarray(mercados), np.asarray(selecoes, dtype=int)
+    linhas = np.asarray(linhas, dtype=float)
+    fechamentos = np.atleast_2d(np.asarray(fechamentos, dtype=float))
+    linha_apostas = np.arange(len(selecoes))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inversos = 1 / fechamentos
+        lado = fechamentos[linha_apostas, selecoes]
+        empate = fechamentos[:, liquidacao.EMPATE]
+        lado_ou_empate = 1 / (inversos[linha_apostas, selecoes] + inversos[:, liquidacao.EMPATE])
+        empate_anula = lado * (empate - 1) / empate
+        # Dupla possibilidade: a seleção é o resultado que fica de fora
+        dupla = 1 / (inversos.sum(axis=1) - inversos[linha_apostas, selecoes])
+    lado_valido = selecoes != liquidacao.EMPATE
+    return np.select(
+        [
+            mercados == liquidacao.MERCADO_1X2,
+            (mercados == MERCADOS[0]) & lado_valido,
+            mercados == MERCADOS[1],
+            (mercados == MERCADOS[2]) & lado_valido & np.isclose(linhas, -0.5),
+            (mercados == MERCADOS[2]) & lado_valido & np.isclose(linhas, 0.0),
+            (mercados == MERCADOS[2]) & lado_valido & np.isclose(linhas, 0.5),
+        ],
+        [lado, empate_anula, dupla, lado, empate_anula, lado_ou_empate],
+        np.nan
+    )
+
+
+def analises_com_clv(analises, fechamento):
+    # Junta o fechamento a todo o histórico e calcula o CLV de cada resultado 1X2
+    # com as odds anotadas na análise; o CLV das apostas vem de AgregadosCLV
+    df = analises.merge(fechamento_largo(fechamento), left_on="partida", right_index=True, how="left")
+    for sufixo in SUFIXOS:
+        df[f"clv_{sufixo}"] = calcular_clv(df[f"odd_{sufixo}"], df[f"fechamento_{sufixo}"])
+    return df
+
+
+class AgregadosCLV:
+    # Somas por mercado e por analista das apostas registradas, mantidas
+    # incrementalmente: cada aposta ou fechamento novo mexe só nas somas dos seus
+    # grupos e o painel apenas lê as somas. Os lotes do histórico nunca mudam, então
+    # sincronizar lê só os arquivos depois da marca de cada tabela, e sem lote novo é
+    # um stat por tabela.
+    def __init__(self, pasta=armazenamento.PASTA_HISTORICO):
+        self.pasta = pasta
+        self._trava = threading.Lock()
+        self._limpar()
+
+    def _limpar(self):
+        self._marcas = {}
+        self._ids = set()
+        self._apostas = {}
+        self._fechamento = {}
+        self._somas = {dimensao: {} for dimensao in DIMENSOES}
+        self._total = np.zeros(5)
+
+    def _somar(self, aposta, fechamentos, sinal):
+        analista, mercado, selecao, linha, odd, stake = aposta
+        clv = float(calcular_clv(odd, fechamento_equivalente([mercado], [selecao], [linha], fechamentos)[0]))
+        if np.isnan(clv):
+            return
+        parcela = sinal * np.array([1, clv, stake, clv * stake, clv > 0])
+        self._total += parcela
+        for dimensao, grupo in (("mercado", mercado), ("analista", analista or "—")):
+            somas = self._somas[dimensao]
+            somas[grupo] = somas.get(grupo, 0) + parcela
+
+    def registrar_aposta(self, id_aposta, partida, analista, mercado, selecao, linha, odd, stake):
+        if id_aposta in self._ids:
+            return
+        self._ids.add(id_aposta)
+        aposta = (analista, mercado, int(selecao), float(linha), float(odd), float(stake))
+        self._apostas.setdefault(partida, []).append(aposta)
+        if partida in self._fechamento:
+            self._somar(aposta, self._fechamento[partida], 1)
+
+    def registrar_fechamento(self, partida, resultado, odd):
+        # Fechamento corrigido ou completado: as apostas do jogo saem das somas e entram de novo
+        anterior = self._fechamento.get(partida)
+        atual = np.full(len(SUFIXOS), np.nan) if anterior is None else anterior.copy()
+        atual[int(resultado)] = float(odd)
+        self._fechamento[partida] = atual
+        for aposta in self._apostas.get(partida, []):
+            if anterior is not None:
+                self._somar(aposta, anterior, -1)
+            self._somar(aposta, atual, 1)
+
+    def sincronizar(self):
+        with self._trava:
+            while True:
+                try:
+                    self._sincronizar()
+                    return
+                except FileNotFoundError:
+                    # Compactação no meio da leitura: recomeça do zero com a base nova
+                    self._limpar()
+
+    def _lotes_novos(self):
+        # Novos lotes de cada tabela desde a marca; None quando alguma foi compactada
+        novos, reler = {}, False
+        for nome in ("fechamento", "apostas"):
+            compactada, novos[nome], self._marcas[nome] = armazenamento.lotes_novos(nome, self.pasta, self._marcas.get(nome))
+            reler = reler or compactada
+        return None if reler else novos
+
+    def _sincronizar(self):
+        novos = self._lotes_novos()
+        if novos is None:
+            self._limpar()
+            novos = self._lotes_novos()
+        for caminho in novos["fechamento"]:
+            parte = armazenamento.ler_parte(caminho).to_pandas()
+            for partida, resultado, odd in zip(parte["partida"], parte["resultado"], parte["odd"]):
+                self.registrar_fechamento(partida, resultado, odd)
+        for caminho in novos["apostas"]:
+            parte = armazenamento.ler_parte(caminho).to_pandas()
+            for aposta in parte.itertuples(index=False):
+                self.registrar_aposta(
+                    aposta.id_aposta, aposta.partida, aposta.analista, aposta.mercado,
+                    aposta.selecao, aposta.linha, aposta.odd, aposta.stake
+                )
+
+    def total(self):
+        with self._trava:
+            return self._linha(self._total)
+
+    def resumo(self, dimensao):
+        with self._trava:
+            linhas = [{DIMENSOES[dimensao]: grupo, **self._linha(somas)} for grupo, somas in self._somas[dimensao].items() if somas[_N] > 0.5]
+        colunas = [DIMENSOES[dimensao], "Apostas", "CLV médio (%)", "CLV ponderado (%)", "Acima do fechamento (%)"]
+        return pd.DataFrame(linhas, columns=colunas).sort_values("Apostas", ascending=False, ignore_index=True)
+
+    @staticmethod
+    def _linha(somas):
+        n = round(somas[_N])
+        return {
+            "Apostas": int(n),
+            "CLV médio (%)": round(somas[_CLV] / n * 100, 2) if n else np.nan,
+            "CLV ponderado (%)": round(somas[_CLV_STAKE] / somas[_STAKE] * 100, 2) if somas[_STAKE] else np.nan,
+            "Acima do fechamento (%)": round(somas[_POSITIVAS] / n * 100, 1) if n else np.nan,
+        }
@@ -0,0 +1,60 @@
+# === Distribuição da probabilidade final durante o checklist ===
+# As perguntas que faltam são tratadas como variáveis aleatórias (Nenhum / Casa / Fora)
+# e suas somas de peso são convoluídas por programação dinâmica sobre os saldos,
+# em vez de enumerar as 3^n combinações de respostas. As tabelas de cada sufixo do
+# checklist são montadas uma vez e reaproveitadas: a cada clique só resta deslocar
+# a grade pelo saldo atual e somar.
+from functools import lru_cache
+
+import numpy as np
+
+from questionario import tabela_pontuacao
+
+# Chance assumida para cada resposta ainda não dada: Nenhum, Casa, Fora
+PROB_RESPOSTAS_PADRAO = (1 / 3, 1 / 3, 1 / 3)
+
+
+@lru_cache(maxsize=32)
+def tabelas_sufixo(pesos, probs=PROB_RESPOSTAS_PADRAO):
+    # tabelas[k][i, j] = P(perguntas k..n-1 somarem i ao saldo da casa e j ao do visitante)
+    p_nenhum, p_casa, p_fora = probs
+    tabelas = [np.ones((1, 1))]
+    for peso in reversed(pesos):
+        atual = tabelas[-1]
+        n = atual.shape[0] + peso
+        nova = np.zeros((n, n))
+        nova[:n - peso, :n - peso] += p_nenhum * atual
+        nova[peso:, :n - peso] += p_casa * atual
+        nova[:n - peso, peso:] += p_fora * atual
+        tabelas.append(nova)
+    tabelas.reverse()
+    for tabela in tabelas:
+        tabela.setflags(write=False)
+    return tabelas
+
+
+def distribuicao_vitoria(fatores, etapa, saldo_casa, saldo_fora, odd_vitoria,
+                         probs=PROB_RESPOSTAS_PADRAO, pontuar=None):
+    pesos = tuple(peso for _, peso in fatores)
+    tabela = tabelas_sufixo(pesos, probs)[etapa]
+    delta = np.arange(tabela.shape[0])
+    casa, fora = saldo_casa + delta[:, None], saldo_fora + delta[None, :]
+    # A vitória final de cada par de saldos vem da tabela pré-compilada do questionário
+    # ou, se informada, de pontuar(casas, foras, peso respondido) sobre a grade inteira
+    if pontuar is None:
+        vitoria = tabela_pontuacao(pesos).vitoria[casa, fora]
+    else:
+        vitoria = pontuar(*np.broadcast_arrays(casa, fora), sum(pesos))[0]
+
+    massa = tabela > 0
+    valores, inverso = np.unique(vitoria[massa], return_inverse=True)
+    probabilidades = np.bincount(inverso, weights=tabela[massa])
+
+    ev = valores / 100 * odd_vitoria - 1
+    return {
+        "vitoria": valores,
+        "probabilidade": probabilidades,
+        "ev": ev,
+        "vitoria_esperada": float(probabilidades @ valores),
+        "prob_ev_positivo": float(probabilidades[ev > 0].sum()),
+    }
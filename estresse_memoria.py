@@ -0,0 +1,106 @@
+# === Estresse de memória: muitas sessões sintéticas do app ===
+# Abre N sessões independentes (AppTest do Streamlit, sem navegador), leva cada uma
+# por fase 1 -> checklist -> Kelly -> relatório e mede com o tracemalloc o custo por
+# sessão. Depois roda mais execuções nas mesmas sessões: o que continuar crescendo
+# sem sessões novas é candidato a vazamento.
+#
+# Uso: python estresse_memoria.py --sessoes 50 --app app.py
+import argparse
+import gc
+import os
+import random
+import sys
+import tracemalloc
+
+from streamlit.testing.v1 import AppTest
+
+from memoria import tamanho_por_chave
+from nucleo import FATORES_PADRAO, MERCADOS, montar_resposta
+from snapshot import codificar_snapshot
+
+PASTA = os.path.dirname(os.path.abspath(__file__))
+
+
+def estado_sintetico(rng, fase):
+    # Estados prontos via snapshot: cada sessão cai direto na fase desejada
+    n_respostas = len(FATORES_PADRAO) if fase == 3 else rng.randrange(len(FATORES_PADRAO))
+    time_casa, time_fora = f"Casa {rng.randrange(1000)}", f"Fora {rng.randrange(1000)}"
+    return {
+        "fase": fase,
+        "etapa": n_respostas,
+        "subfase_kelly": 1 if fase == 3 else 0,
+        "mercado_escolhido": rng.choice(MERCADOS) if fase == 3 else None,
+        "questionario": "padrao",
+        "fatores": FATORES_PADRAO,
+        "respostas": [
+            montar_resposta(rng.randrange(3), pergunta, peso, time_casa, time_fora)
+            for pergunta, peso in FATORES_PADRAO[:n_respostas]
+        ],
+        "time_casa": time_casa,
+        "time_fora": time_fora,
+        "odd_vitoria": round(rng.uniform(1.2, 5), 2),
+        "odd_empate": round(rng.uniform(2.5, 4.5), 2),
+        "odd_derrota": round(rng.uniform(1.2, 8), 2),
+        "banca": 100.0,
+    }
+
+
+def abrir_sessao(app, estado):
+    sessao = AppTest.from_file(os.path.join(PASTA, app), default_timeout=60)
+    sessao.query_params["s"] = codificar_snapshot(estado)
+    sessao.run()
+    if sessao.exception:
+        raise RuntimeError(sessao.exception[0].value)
+    return sessao
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessoes", type=int, default=20)
+    parser.add_argument("--reruns", type=int, default=5, help="execuções extras por sessão para detectar vazamento")
+    parser.add_argument("--app", default="app.py")
+    parser.add_argument("--semente", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.semente)
+    os.chdir(PASTA)
+    sys.path.insert(0, PASTA)
+
+    # Aquece imports e caches globais antes de medir
+    abrir_sessao(args.app, estado_sintetico(rng, 3))
+    gc.collect()
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+
+    sessoes = []
+    for i in range(args.sessoes):
+        sessoes.append(abrir_sessao(args.app, estado_sintetico(rng, rng.choice([2, 3]))))
+    # Uma execução a mais em cada sessão preenche caches de primeira execução
+    for sessao in sessoes:
+        sessao.run()
+    gc.collect()
+    depois_abrir, pico = tracemalloc.get_traced_memory()
+
+    for _ in range(args.reruns):
+        for sessao in sessoes:
+            sessao.run()
+    gc.collect()
+    depois_reruns, _ = tracemalloc.get_traced_memory()
+
+    tamanhos = [int(tamanho_por_chave(sessao.session_state)["Bytes"].sum()) for sessao in sessoes]
+    por_sessao = (depois_abrir - base) / max(1, args.sessoes)
+    crescimento = (depois_reruns - depois_abrir) / max(1, args.sessoes * args.reruns)
+
+    print(f"Sessões abertas:           {args.sessoes}")
+    print(f"Custo por sessão (total):  {por_sessao / 1024:.1f} KiB")
+    print(f"session_state por sessão:  média {sum(tamanhos) / len(tamanhos) / 1024:.1f} KiB, máx {max(tamanhos) / 1024:.1f} KiB")
+    print(f"Pico alocado:              {pico / 1024 ** 2:.1f} MiB")
+    print(f"Crescimento por rerun:     {crescimento / 1024:.2f} KiB/sessão")
+    if crescimento > 1024:
+        print("⚠️ A memória continua crescendo em reruns sem sessões novas: possível vazamento.")
+        for estatistica in tracemalloc.take_snapshot().statistics("lineno")[:10]:
+            print("   ", estatistica)
+
+
+if __name__ == "__main__":
+    main()
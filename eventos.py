@@ -0,0 +1,105 @@
+# === Checklist como log de eventos (desfazer / refazer / pular) ===
+# Cada ação do analista vira um evento acrescentado a um log que nunca é reescrito.
+# Ao lado do log ficam as respostas do ramo atual e um checkpoint dos saldos após
+# cada pergunta, então desfazer, refazer ou pular para uma pergunta só move o
+# cursor e os saldos de qualquer etapa saem em O(1). Reproduzir o log do zero
+# reconstrói o mesmo estado: serve de trilha de auditoria e de replay.
+import time
+
+import pandas as pd
+
+from nucleo import CASA, FORA, NENHUM
+
+RESPOSTA, DESFAZER, REFAZER, IR_PARA = "resposta", "desfazer", "refazer", "ir_para"
+NOMES_EVENTOS = {RESPOSTA: "Resposta", DESFAZER: "Desfazer", REFAZER: "Refazer", IR_PARA: "Ir para pergunta"}
+
+
+def novo_log():
+    return {"eventos": [], "codigos": [], "saldos": [(0, 0)], "cursor": 0}
+
+
+def _registrar(log, tipo, **dados):
+    log["eventos"].append({"tipo": tipo, "instante": time.time(), "etapa": log["cursor"], **dados})
+
+
+def saldos(log):
+    return log["saldos"][log["cursor"]]
+
+
+def pode_desfazer(log):
+    return log["cursor"] > 0
+
+
+def pode_refazer(log):
+    return log["cursor"] < len(log["codigos"])
+
+
+def responder(log, codigo, peso, origem="analista"):
+    cursor = log["cursor"]
+    if cursor < len(log["codigos"]) and log["codigos"][cursor] != codigo:
+        # Resposta diferente depois de desfazer abre um ramo novo: o que vinha depois sai
+        del log["codigos"][cursor:]
+        del log["saldos"][cursor + 1:]
+    if cursor == len(log["codigos"]):
+        casa, fora = log["saldos"][cursor]
+        log["codigos"].append(codigo)
+        log["saldos"].append((casa + peso if codigo == CASA else casa, fora + peso if codigo == FORA else fora))
+    _registrar(log, RESPOSTA, codigo=codigo, peso=peso, origem=origem)
+    log["cursor"] += 1
+
+
+def desfazer(log):
+    if pode_desfazer(log):
+        _registrar(log, DESFAZER)
+        log["cursor"] -= 1
+
+
+def refazer(log):
+    if pode_refazer(log):
+        _registrar(log, REFAZER)
+        log["cursor"] += 1
+
+
+def ir_para(log, destino):
+    # Só dá para pular entre perguntas já respondidas neste ramo (ou a próxima em aberto)
+    destino = max(0, min(destino, len(log["codigos"])))
+    if destino != log["cursor"]:
+        _registrar(log, IR_PARA, destino=destino)
+        log["cursor"] = destino
+
+
+def log_de_codigos(codigos, pesos, origem="snapshot"):
+    log = novo_log()
+    for codigo, peso in zip(codigos, pesos):
+        responder(log, codigo, peso, origem)
+    return log
+
+
+def reproduzir(eventos, ate=None):
+    # Estado do checklist depois dos primeiros 'ate' eventos (todos, por padrão)
+    log = novo_log()
+    for evento in eventos[:ate]:
+        if evento["tipo"] == RESPOSTA:
+            responder(log, evento["codigo"], evento["peso"], evento.get("origem", "analista"))
+        elif evento["tipo"] == DESFAZER:
+            desfazer(log)
+        elif evento["tipo"] == REFAZER:
+            refazer(log)
+        elif evento["tipo"] == IR_PARA:
+            ir_para(log, evento["destino"])
+    return log
+
+
+def trilha_auditoria(log, fatores, time_casa, time_fora):
+    nomes = {NENHUM: "Nenhum", CASA: time_casa, FORA: time_fora}
+    linhas = []
+    for evento in log["eventos"]:
+        etapa = evento.get("destino", evento["etapa"]) if evento["tipo"] != DESFAZER else evento["etapa"] - 1
+        linhas.append({
+            "Hora": pd.Timestamp(evento["instante"], unit="s").floor("s"),
+            "Evento": NOMES_EVENTOS[evento["tipo"]],
+            "Pergunta": f"{etapa + 1}. {fatores[etapa][0]}" if 0 <= etapa < len(fatores) else "—",
+            "Resposta": nomes.get(evento.get("codigo"), ""),
+            "Origem": evento.get("origem", ""),
+        })
+    return pd.DataFrame(linhas, columns=["Hora", "Evento", "Pergunta", "Resposta", "Origem"])
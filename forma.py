@@ -0,0 +1,242 @@
+# === Forma recente dos times em buffers circulares ===
+# Cada time tem três buffers circulares de tamanho fixo (todos os jogos, jogos em
+# casa e jogos fora) com pontos, gols pró/contra e xG pró/contra de cada partida,
+# mais as somas da janela. Um resultado novo sobrescreve a posição mais antiga e
+# ajusta as somas: O(1) por jogo, sem reler o histórico. Reconstruir a partir do
+# histórico inteiro (tabela "jogos") é vetorizado: só os últimos jogos de cada
+# time entram nos buffers, cada um na posição em que a escrita incremental o poria.
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+import armazenamento
+
+CAPACIDADE = 10
+JANELA_PADRAO = 5
+PASTA_JOGOS = os.path.join("dados", "jogos")
+COLUNAS_JOGOS = ["data", "time_casa", "time_fora", "gols_casa", "gols_fora"]
+COLUNAS_XG = ["xg_casa", "xg_fora"]
+MANDOS = {"geral": "geral", "casa": "em casa", "fora": "fora de casa"}
+_GERAL, _EM_CASA, _FORA = range(3)
+_CODIGOS_MANDO = {"geral": _GERAL, "casa": _EM_CASA, "fora": _FORA}
+METRICAS = ["pontos", "gols_pro", "gols_contra", "xg_pro", "xg_contra"]
+_PONTOS, _GOLS_PRO, _GOLS_CONTRA, _XG_PRO, _XG_CONTRA = range(5)
+LETRAS_RESULTADO = {3: "V", 1: "E", 0: "D"}
+
+
+def ler_jogos(caminhos):
+    # CSV com data, time_casa, time_fora, gols_casa, gols_fora e, opcionalmente, xg_casa e xg_fora
+    if isinstance(caminhos, (str, os.PathLike)):
+        caminhos = sorted(os.path.join(caminhos, c) for c in os.listdir(caminhos) if c.endswith(".csv")) if os.path.isdir(caminhos) else [caminhos]
+    tabelas = [pd.read_csv(c, usecols=lambda coluna: coluna in COLUNAS_JOGOS + COLUNAS_XG) for c in caminhos]
+    if not tabelas:
+        return pd.DataFrame(columns=COLUNAS_JOGOS + COLUNAS_XG)
+    return pd.concat(tabelas, ignore_index=True)
+
+
+def jogos_de_resultados(resultados):
+    # Resultados importados ("Casa x Fora") viram jogos de hoje, sem xG
+    times = resultados["partida"].astype(str).str.split(" x ", n=1, expand=True).reindex(columns=[0, 1])
+    validos = times[1].notna()
+    return pd.DataFrame({
+        "data": pd.Timestamp.now().floor("s"),
+        "time_casa": times.loc[validos, 0].str.strip(),
+        "time_fora": times.loc[validos, 1].str.strip(),
+        "gols_casa": resultados.loc[validos, "gols_casa"],
+        "gols_fora": resultados.loc[validos, "gols_fora"],
+    })
+
+
+def importar_jogos(df, pasta=armazenamento.PASTA_HISTORICO):
+    faltando = set(COLUNAS_JOGOS) - set(df.columns)
+    if faltando:
+        raise KeyError(f"Colunas ausentes: {', '.join(sorted(faltando))}")
+    df = df.dropna(subset=COLUNAS_JOGOS)
+    if not len(df):
+        return None
+    return armazenamento.gravar_lote("jogos", pd.DataFrame({
+        "data": pd.Timestamp.now().floor("s"),
+        "data_jogo": pd.to_datetime(df["data"]).dt.floor("s").to_numpy(),
+        "time_casa": df["time_casa"].astype(str).to_numpy(),
+        "time_fora": df["time_fora"].astype(str).to_numpy(),
+        "gols_casa": df["gols_casa"].to_numpy(dtype=np.int16),
+        "gols_fora": df["gols_fora"].to_numpy(dtype=np.int16),
+        **{coluna: (df[coluna] if coluna in df else pd.Series(np.nan, index=df.index)).to_numpy(dtype=float) for coluna in COLUNAS_XG},
+    }), pasta)
+
+
+def pontos(gols_pro, gols_contra):
+    diferenca = np.asarray(gols_pro) - np.asarray(gols_contra)
+    return np.where(diferenca > 0, 3, np.where(diferenca == 0, 1, 0))
+
+
+class MotorForma:
+    def __init__(self, pasta=armazenamento.PASTA_HISTORICO, capacidade=CAPACIDADE):
+        self.pasta = pasta
+        self.capacidade = capacidade
+        self._trava = threading.Lock()
+        self._limpar()
+
+    def _limpar(self):
+        self._arquivos = set()
+        self._indices = {}
+        self.times = []
+        # (time, mando, posição, métrica); posição vazia ou xG ausente = NaN
+        self._buffers = np.full((0, 3, self.capacidade, len(METRICAS)), np.nan)
+        self._somas = np.zeros((0, 3, len(METRICAS)))
+        self._contagens = np.zeros((0, 3, len(METRICAS)), dtype=np.int64)
+        self._escritas = np.zeros((0, 3), dtype=np.int64)
+
+    def __len__(self):
+        return len(self.times)
+
+    def _linhas(self, nomes):
+        # Linha de cada time; times novos ganham linhas (crescimento em dobro)
+        codigos, unicos = pd.factorize(np.asarray(nomes, dtype=object))
+        linhas = np.empty(len(unicos), dtype=np.int64)
+        for k, nome in enumerate(unicos):
+            linha = self._indices.get(nome)
+            if linha is None:
+                linha = self._indices[nome] = len(self.times)
+                self.times.append(nome)
+            linhas[k] = linha
+        faltam = len(self.times) - len(self._escritas)
+        if faltam > 0:
+            novas = max(faltam, len(self._escritas))
+            self._buffers = np.concatenate([self._buffers, np.full((novas,) + self._buffers.shape[1:], np.nan)])
+            self._somas = np.concatenate([self._somas, np.zeros((novas,) + self._somas.shape[1:])])
+            self._contagens = np.concatenate([self._contagens, np.zeros((novas,) + self._contagens.shape[1:], dtype=np.int64)])
+            self._escritas = np.concatenate([self._escritas, np.zeros((novas, 3), dtype=np.int64)])
+        return linhas[codigos]
+
+    def _posicoes(self, nomes):
+        # Linha de cada time consultado; -1 para time sem jogos
+        nomes = np.atleast_1d(nomes)
+        return np.fromiter((self._indices.get(nome, -1) for nome in nomes), dtype=np.int64, count=len(nomes))
+
+    def _escrever(self, linha, mando, valores):
+        # O(1): o valor mais antigo sai das somas e o novo entra
+        posicao = self._escritas[linha, mando] % self.capacidade
+        antigo = self._buffers[linha, mando, posicao]
+        self._somas[linha, mando] += np.nan_to_num(valores) - np.nan_to_num(antigo)
+        self._contagens[linha, mando] += (~np.isnan(valores)).astype(np.int64) - (~np.isnan(antigo)).astype(np.int64)
+        self._buffers[linha, mando, posicao] = valores
+        self._escritas[linha, mando] += 1
+
+    def registrar(self, time_casa, time_fora, gols_casa, gols_fora, xg_casa=np.nan, xg_fora=np.nan):
+        if time_casa not in self._indices or time_fora not in self._indices:
+            self._linhas([time_casa, time_fora])
+        casa, fora = self._indices[time_casa], self._indices[time_fora]
+        valores_casa = np.array([pontos(gols_casa, gols_fora), gols_casa, gols_fora, xg_casa, xg_fora], dtype=float)
+        valores_fora = np.array([pontos(gols_fora, gols_casa), gols_fora, gols_casa, xg_fora, xg_casa], dtype=float)
+        for linha, mando, valores in ((casa, _GERAL, valores_casa), (casa, _EM_CASA, valores_casa),
+                                      (fora, _GERAL, valores_fora), (fora, _FORA, valores_fora)):
+            self._escrever(linha, mando, valores)
+
+    def registrar_jogos(self, jogos):
+        # Jogos novos em ordem cronológica, um a um (O(1) cada)
+        jogos = jogos.sort_values("data_jogo", kind="stable")
+        xg_casa = jogos["xg_casa"] if "xg_casa" in jogos else pd.Series(np.nan, index=jogos.index)
+        xg_fora = jogos["xg_fora"] if "xg_fora" in jogos else pd.Series(np.nan, index=jogos.index)
+        for linha in zip(jogos["time_casa"], jogos["time_fora"], jogos["gols_casa"], jogos["gols_fora"], xg_casa, xg_fora):
+            self.registrar(*linha)
+
+    def reconstruir(self, jogos):
+        # Estado final igual ao de registrar todos os jogos em ordem, sem laço por jogo
+        self._limpar()
+        jogos = jogos.sort_values("data_jogo", kind="stable")
+        n = len(jogos)
+        if not n:
+            return
+        gols_casa, gols_fora = jogos["gols_casa"].to_numpy(dtype=float), jogos["gols_fora"].to_numpy(dtype=float)
+        xg_casa = jogos["xg_casa"].to_numpy(dtype=float) if "xg_casa" in jogos else np.full(n, np.nan)
+        xg_fora = jogos["xg_fora"].to_numpy(dtype=float) if "xg_fora" in jogos else np.full(n, np.nan)
+        casa = self._linhas(jogos["time_casa"].to_numpy(dtype=object))
+        fora = self._linhas(jogos["time_fora"].to_numpy(dtype=object))
+        valores_casa = np.column_stack([pontos(gols_casa, gols_fora), gols_casa, gols_fora, xg_casa, xg_fora])
+        valores_fora = np.column_stack([pontos(gols_fora, gols_casa), gols_fora, gols_casa, xg_fora, xg_casa])
+
+        # Quatro entradas por jogo: (casa, geral), (casa, em casa), (fora, geral), (fora, fora)
+        linhas = np.concatenate([casa, casa, fora, fora])
+        mandos = np.repeat([_GERAL, _EM_CASA, _GERAL, _FORA], n)
+        valores = np.concatenate([valores_casa, valores_casa, valores_fora, valores_fora])
+        ordem = np.tile(np.arange(n), 4)
+        chave = linhas * 3 + mandos
+        indice = np.lexsort((ordem, chave))
+        chave, valores = chave[indice], valores[indice]
+        unicas, inicio, contagem = np.unique(chave, return_index=True, return_counts=True)
+        # j-ésima escrita de cada buffer cai na posição j % capacidade; só as últimas ficam
+        j = np.arange(len(chave)) - np.repeat(inicio, contagem)
+        ficam = j >= np.repeat(contagem - self.capacidade, contagem)
+        self._buffers[chave[ficam] // 3, chave[ficam] % 3, j[ficam] % self.capacidade] = valores[ficam]
+        self._escritas[unicas // 3, unicas % 3] = contagem
+        self._somas = np.nansum(self._buffers, axis=2)
+        self._contagens = (~np.isnan(self._buffers)).sum(axis=2)
+
+    def sincronizar(self):
+        # Lê só os lotes novos da tabela "jogos"; na primeira vez (ou se lotes sumiram) reconstrói
+        with self._trava:
+            arquivos = armazenamento.arquivos_tabela("jogos", self.pasta)
+            if not self._arquivos or not self._arquivos <= set(arquivos):
+                self.reconstruir(armazenamento.abrir_dataframe("jogos", self.pasta))
+                self._arquivos = set(arquivos)
+                return
+            for caminho in arquivos:
+                if caminho not in self._arquivos:
+                    self.registrar_jogos(armazenamento.ler_parte(caminho).to_pandas())
+                    self._arquivos.add(caminho)
+
+    def medias(self, times, janela=JANELA_PADRAO, mando="geral"):
+        # (times, métricas): médias por jogo nos últimos 'janela' jogos; time sem jogos = NaN.
+        # 'mando' pode ser um array ("casa"/"fora"/"geral" por time)
+        janela = min(janela, self.capacidade)
+        mandos = np.broadcast_to([_CODIGOS_MANDO[m] for m in np.atleast_1d(mando)], (len(np.atleast_1d(times)),))
+        with self._trava:
+            linhas = self._posicoes(times)
+            conhecidos = linhas >= 0
+            linhas = np.where(conhecidos, linhas, 0)
+            if not len(self.times):
+                return np.full((len(linhas), len(METRICAS)), np.nan)
+            if janela == self.capacidade:
+                somas, contagens = self._somas[linhas, mandos], self._contagens[linhas, mandos]
+            else:
+                # Últimas 'janela' posições escritas de cada buffer
+                posicoes = (self._escritas[linhas, mandos][:, None] - 1 - np.arange(janela)) % self.capacidade
+                ultimas = self._buffers[linhas[:, None], mandos[:, None], posicoes]
+                somas, contagens = np.nansum(ultimas, axis=1), (~np.isnan(ultimas)).sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            medias = somas / contagens
+        medias[~conhecidos] = np.nan
+        return medias
+
+    def sequencia(self, time, janela=JANELA_PADRAO, mando="geral"):
+        # Resultados dos últimos jogos, do mais antigo ao mais recente (ex.: "VEDVV")
+        janela = min(janela, self.capacidade)
+        with self._trava:
+            linha = self._indices.get(time, -1)
+            if linha < 0:
+                return ""
+            m = _CODIGOS_MANDO[mando]
+            escritas = self._escritas[linha, m]
+            posicoes = np.arange(max(escritas - janela, 0), escritas) % self.capacidade
+            return "".join(LETRAS_RESULTADO[int(p)] for p in self._buffers[linha, m, posicoes, _PONTOS])
+
+    def comparar(self, time_casa, time_fora, janela=JANELA_PADRAO):
+        # Uma linha por time e recorte: cada time no geral e no seu mando
+        recortes = [(time_casa, "geral"), (time_casa, "casa"), (time_fora, "geral"), (time_fora, "fora")]
+        medias = self.medias([t for t, _ in recortes], janela, [m for _, m in recortes])
+        with self._trava:
+            linhas = self._posicoes([t for t, _ in recortes])
+            jogos = [min(int(self._escritas[l, _CODIGOS_MANDO[m]]), janela) if l >= 0 else 0 for l, (_, m) in zip(linhas, recortes)]
+        return pd.DataFrame({
+            "Time": [f"{t} ({MANDOS[m]})" for t, m in recortes],
+            "Jogos": jogos,
+            "Sequência": [self.sequencia(t, janela, m) for t, m in recortes],
+            "Pontos/jogo": medias[:, _PONTOS].round(2),
+            "Gols pró": medias[:, _GOLS_PRO].round(2),
+            "Gols contra": medias[:, _GOLS_CONTRA].round(2),
+            "xG pró": medias[:, _XG_PRO].round(2),
+            "xG contra": medias[:, _XG_CONTRA].round(2),
+        })
@@ -0,0 +1,139 @@
+# === Grade de resultados paginada no servidor ===
+# Ordenação, filtro e paginação acontecem em NumPy no servidor; só a página visível
+# vira DataFrame e é enviada ao navegador. Os índices de ordenação de cada coluna são
+# calculados uma vez (argsort estável) e as colunas de texto viram códigos de
+# categoria, então filtrar por texto testa apenas os valores distintos.
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+TAMANHOS_PAGINA = [25, 50, 100, 250]
+_MAX_MASCARAS = 16
+
+
+class GradeResultados:
+    def __init__(self, df, preindexar=True):
+        self.df = df.reset_index(drop=True)
+        self._valores = {}
+        self._categorias = {}
+        self._ordens = {}
+        self._mascaras = {}
+        if preindexar:
+            for coluna in self.df.columns:
+                self.ordem(coluna)
+
+    def __len__(self):
+        return len(self.df)
+
+    def _coluna(self, coluna):
+        if coluna not in self._valores:
+            serie = self.df[coluna]
+            if pd.api.types.is_numeric_dtype(serie) or pd.api.types.is_datetime64_any_dtype(serie):
+                self._valores[coluna] = serie.to_numpy()
+            else:
+                categorias = pd.Categorical(serie.astype(str))
+                self._valores[coluna] = categorias.codes
+                self._categorias[coluna] = np.asarray(categorias.categories, dtype=str)
+        return self._valores[coluna]
+
+    def eh_texto(self, coluna):
+        self._coluna(coluna)
+        return coluna in self._categorias
+
+    def ordem(self, coluna):
+        # Categorias do pandas já vêm ordenadas, então ordenar os códigos ordena o texto
+        if coluna not in self._ordens:
+            self._ordens[coluna] = np.argsort(self._coluna(coluna), kind="stable")
+        return self._ordens[coluna]
+
+    def mascara(self, filtros):
+        # filtros: tupla de (coluna, valor), onde valor é um texto (contém) ou (mínimo, máximo)
+        if not filtros:
+            return None
+        if filtros not in self._mascaras:
+            mascara = np.ones(len(self.df), dtype=bool)
+            for coluna, valor in filtros:
+                valores = self._coluna(coluna)
+                if self.eh_texto(coluna):
+                    categorias = self._categorias[coluna]
+                    aceitas = np.flatnonzero(np.char.find(np.char.lower(categorias), str(valor).lower()) >= 0)
+                    mascara &= np.isin(valores, aceitas)
+                else:
+                    minimo, maximo = valor
+                    mascara &= (valores >= minimo) & (valores <= maximo)
+            if len(self._mascaras) >= _MAX_MASCARAS:
+                self._mascaras.pop(next(iter(self._mascaras)))
+            self._mascaras[filtros] = mascara
+        return self._mascaras[filtros]
+
+    def pagina(self, numero, tamanho, ordenar_por=None, decrescente=False, filtros=()):
+        # Retorna (DataFrame só com a página pedida, total de linhas após o filtro)
+        mascara = self.mascara(tuple(filtros))
+        if ordenar_por is None:
+            indices = np.flatnonzero(mascara) if mascara is not None else None
+        else:
+            indices = self.ordem(ordenar_por)
+            if decrescente:
+                indices = indices[::-1]
+            if mascara is not None:
+                indices = indices[mascara[indices]]
+
+        total = len(self.df) if indices is None else len(indices)
+        inicio = max(0, numero) * tamanho
+        if indices is None:
+            return self.df.iloc[inicio:inicio + tamanho], total
+        return self.df.take(indices[inicio:inicio + tamanho]), total
+
+
+@st.fragment
+def exibir_grade(grade, chave, tamanho_padrao=50):
+    # Controles e página rodam num fragmento: mudar página ou filtro não reexecuta o app
+    colunas = list(grade.df.columns)
+    col_ordem, col_sentido, col_filtro, col_valor = st.columns([2, 1, 2, 2])
+    ordenar_por = col_ordem.selectbox("Ordenar por", ["—"] + colunas, key=f"{chave}_ordem")
+    decrescente = col_sentido.toggle("Decrescente", key=f"{chave}_desc")
+    coluna_filtro = col_filtro.selectbox("Filtrar coluna", ["—"] + colunas, key=f"{chave}_filtro")
+
+    filtros = ()
+    if coluna_filtro != "—":
+        if grade.eh_texto(coluna_filtro):
+            texto = col_valor.text_input("Contém", key=f"{chave}_texto")
+            if texto:
+                filtros = ((coluna_filtro, texto),)
+        elif pd.api.types.is_datetime64_any_dtype(grade.df[coluna_filtro]):
+            # Datas: intervalo de dias inteiros, comparado como datetime64
+            valores = grade.df[coluna_filtro].dropna()
+            if len(valores):
+                inicio = col_valor.date_input("De", value=valores.min().date(), key=f"{chave}_de")
+                fim = col_valor.date_input("Até", value=valores.max().date(), key=f"{chave}_ate")
+                filtros = ((coluna_filtro, (
+                    np.datetime64(pd.Timestamp(inicio), "ns"),
+                    np.datetime64(pd.Timestamp(fim) + pd.Timedelta(days=1) - pd.Timedelta(1, "ns"), "ns"),
+                )),)
+        else:
+            # Coluna só com NaN não tem faixa: fica sem filtro numérico
+            valores = grade.df[coluna_filtro].dropna()
+            if len(valores):
+                minimo = col_valor.number_input("Mínimo", value=float(valores.min()), key=f"{chave}_min")
+                maximo = col_valor.number_input("Máximo", value=float(valores.max()), key=f"{chave}_max")
+                filtros = ((coluna_filtro, (minimo, maximo)),)
+            else:
+                col_valor.info("Coluna sem valores para filtrar.")
+
+    col_tamanho, col_pagina, col_info = st.columns([1, 1, 2])
+    tamanho = col_tamanho.selectbox(
+        "Linhas por página", TAMANHOS_PAGINA,
+        index=TAMANHOS_PAGINA.index(tamanho_padrao) if tamanho_padrao in TAMANHOS_PAGINA else 0,
+        key=f"{chave}_tamanho"
+    )
+    _, total = grade.pagina(0, 0, None if ordenar_por == "—" else ordenar_por, decrescente, filtros)
+    n_paginas = max(1, -(-total // tamanho))
+    numero = min(col_pagina.number_input("Página", min_value=1, value=1, key=f"{chave}_pagina"), n_paginas)
+
+    df_pagina, total = grade.pagina(numero - 1, tamanho, None if ordenar_por == "—" else ordenar_por, decrescente, filtros)
+    inicio = (numero - 1) * tamanho
+    col_info.markdown(
+        f"<br>Página {numero} de {n_paginas} · linhas {min(inicio + 1, total)}–{min(inicio + tamanho, total)} de **{total}**",
+        unsafe_allow_html=True
+    )
+    st.dataframe(df_pagina, use_container_width=True, hide_index=True)
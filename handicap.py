@@ -0,0 +1,137 @@
+# === Handicap asiático: escada de linhas a partir da distribuição do saldo de gols ===
+# As probabilidades 1X2 viram médias de gols (Poisson independentes para casa e
+# visitante) e daí a distribuição do saldo de gols do jogo. Cada linha da escada
+# (-3,0 a +3,0, de quarto em quarto) é liquidada como duas meias apostas: nas linhas
+# inteiras e de meio gol as duas metades são iguais, nas de quarto (x,25 / x,75)
+# ficam nas linhas vizinhas e surgem o meio ganho e a meia perda. Probabilidades,
+# odd justa, EV e Kelly saem de uma vez para todas as linhas e todos os jogos.
+from functools import lru_cache
+
+import numpy as np
+
+MAX_GOLS = 10
+SALDOS = np.arange(-MAX_GOLS, MAX_GOLS + 1)
+LINHAS = np.round(np.arange(-3, 3.25, 0.25), 2)
+MEDIAS_GRADE = np.round(np.arange(0.05, 4.55, 0.05), 2)
+RESULTADOS_LINHA = ["Ganha", "Meio ganho", "Devolvida", "Meia perda", "Perde"]
+
+
+def _poisson(medias):
+    # pmf de 0..MAX_GOLS gols para cada média (última dimensão = gols)
+    medias = np.asarray(medias, dtype=float)[..., None]
+    gols = np.arange(MAX_GOLS + 1)
+    log_fatorial = np.cumsum(np.log(np.maximum(gols, 1)))
+    return np.exp(gols * np.log(medias) - medias - log_fatorial)
+
+
+def distribuicao_saldo(media_casa, media_fora):
+    # P(saldo = d) para d em SALDOS, com a massa além de MAX_GOLS renormalizada
+    casa, fora = _poisson(media_casa), _poisson(media_fora)
+    conjunta = casa[..., :, None] * fora[..., None, :]
+    dist = np.stack([np.trace(conjunta, offset=-d, axis1=-2, axis2=-1) for d in SALDOS], axis=-1)
+    return dist / dist.sum(axis=-1, keepdims=True)
+
+
+def _probabilidades_1x2(dist):
+    return dist[..., SALDOS > 0].sum(axis=-1), dist[..., SALDOS == 0].sum(axis=-1), dist[..., SALDOS < 0].sum(axis=-1)
+
+
+def _vitoria_derrota(medias):
+    vitoria, _, derrota = _probabilidades_1x2(distribuicao_saldo(medias[:, 0], medias[:, 1]))
+    return np.column_stack([vitoria, derrota])
+
+
+@lru_cache(maxsize=1)
+def _grade_medias():
+    casa, fora = np.meshgrid(MEDIAS_GRADE, MEDIAS_GRADE, indexing="ij")
+    medias = np.column_stack([casa.ravel(), fora.ravel()])
+    return medias, _vitoria_derrota(medias)
+
+
+def ajustar_medias(vitoria, empate, derrota, iteracoes=4):
+    # Médias de gols (casa, visitante) que reproduzem vitória e derrota (em %): ponto
+    # mais próximo da grade e alguns passos de Newton com jacobiano numérico
+    probs = np.column_stack(np.broadcast_arrays(*map(np.atleast_1d, (vitoria, empate, derrota)))).astype(float)
+    alvo = (probs / np.maximum(probs.sum(axis=1, keepdims=True), 1e-9))[:, [0, 2]]
+    medias_grade, probs_grade = _grade_medias()
+    mais_proximo = ((alvo[:, None, :] - probs_grade[None, :, :]) ** 2).sum(axis=2).argmin(axis=1)
+    grade = medias = medias_grade[mais_proximo]
+
+    passo = 1e-4
+    for _ in range(iteracoes):
+        atual = _vitoria_derrota(medias)
+        jacobiano = np.stack([(_vitoria_derrota(medias + passo * np.eye(2)[k]) - atual) / passo for k in range(2)], axis=2)
+        # Jacobiano quase singular (probabilidades extremas): fica no ponto da grade
+        seguro = np.abs(np.linalg.det(jacobiano)) > 1e-8
+        delta = np.zeros_like(medias)
+        delta[seguro] = np.linalg.solve(jacobiano[seguro], (alvo - atual)[seguro][..., None])[..., 0]
+        medias = np.clip(medias + delta, MEDIAS_GRADE[0], MEDIAS_GRADE[-1])
+    # Sem solução exata (empate abaixo do que a Poisson permite): vale o ajuste mais próximo
+    erro = ((_vitoria_derrota(medias) - alvo) ** 2).sum(axis=1)
+    melhor_grade = ((probs_grade[mais_proximo] - alvo) ** 2).sum(axis=1) < erro
+    medias = np.where(melhor_grade[:, None], grade, medias)
+    return medias[:, 0], medias[:, 1]
+
+
+def metades(linhas):
+    # As duas meias linhas de cada linha (iguais fora das linhas de quarto)
+    linhas = np.asarray(linhas, dtype=float)
+    quarto = np.isclose(np.mod(linhas * 4, 2), 1)
+    return linhas - np.where(quarto, 0.25, 0), linhas + np.where(quarto, 0.25, 0)
+
+
+def _sinais(linhas):
+    # (linhas, saldos): +1 meia aposta ganha, 0 devolvida, -1 perdida, para cada metade
+    baixa, alta = metades(linhas)
+    return np.sign(SALDOS[None, :] + baixa[:, None]), np.sign(SALDOS[None, :] + alta[:, None])
+
+
+def precificar(dist, linhas=LINHAS):
+    # Probabilidade de cada desfecho e odd justa por (jogo, linha), do lado da casa;
+    # para o visitante basta inverter o saldo: dist[..., ::-1]
+    dist = np.atleast_2d(dist)
+    baixa, alta = _sinais(linhas)
+    soma = baixa + alta
+    desfechos = {
+        "Ganha": soma == 2,
+        "Meio ganho": soma == 1,
+        "Devolvida": (soma == 0) & (baixa == 0),
+        "Meia perda": soma == -1,
+        "Perde": soma == -2,
+    }
+    probs = {nome: dist @ mascara.T.astype(float) for nome, mascara in desfechos.items()}
+    ganho = probs["Ganha"] + probs["Meio ganho"] / 2
+    perda = probs["Perde"] + probs["Meia perda"] / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        probs["odd_justa"] = np.where(ganho > 0, 1 + perda / ganho, np.inf)
+    return probs
+
+
+def retorno_por_saldo(linhas, odds):
+    # Lucro por unidade apostada para cada saldo: (..., linhas, saldos)
+    baixa, alta = _sinais(linhas)
+    odds = np.asarray(odds, dtype=float)[..., None]
+    meia = lambda sinal: np.where(sinal > 0, odds - 1, np.where(sinal < 0, -1.0, 0.0)) / 2
+    return meia(baixa) + meia(alta)
+
+
+def ev_kelly(dist, odds, linhas=LINHAS, iteracoes=40):
+    # EV e fração de Kelly exata (máximo de E[log banca]) por (jogo, linha); odds com
+    # forma (jogos, linhas) ou que se expanda para ela; odd ausente (NaN) dá NaN
+    dist = np.atleast_2d(dist)
+    odds = np.broadcast_to(np.asarray(odds, dtype=float), (dist.shape[0], len(linhas)))
+    retorno = retorno_por_saldo(linhas, np.nan_to_num(odds, nan=1.0))
+    ev = np.einsum("jd,jld->jl", dist, retorno)
+
+    # E[log] é côncavo em f: bissecção na derivada, só onde o EV é positivo
+    baixo = np.zeros_like(ev)
+    alto = np.full_like(ev, 0.999)
+    for _ in range(iteracoes):
+        meio = (baixo + alto) / 2
+        derivada = np.einsum("jd,jld->jl", dist, retorno / (1 + meio[..., None] * retorno))
+        sobe = derivada > 0
+        baixo = np.where(sobe, meio, baixo)
+        alto = np.where(sobe, alto, meio)
+    kelly = np.where(ev > 0, (baixo + alto) / 2, 0.0)
+    invalidas = np.isnan(odds) | (odds <= 1)
+    return np.where(invalidas, np.nan, ev), np.where(invalidas, np.nan, kelly)
@@ -0,0 +1,114 @@
+# === Kelly de carteira para vários jogos simultâneos ===
+# Maximiza o crescimento logarítmico esperado da banca apostando ao mesmo tempo em
+# vários jogos independentes (1X2), com teto de exposição total e por aposta.
+# O log-crescimento é côncavo nas frações apostadas, então um gradiente projetado
+# acelerado (FISTA) sobre cenários de resultados converge para o ótimo global.
+# Até ~3^8 cenários a enumeração é exata; acima disso os cenários são sorteados.
+# O Kelly fracionário resolve o Kelly cheio com os tetos divididos pela fração e
+# escala o resultado: a fração vale antes dos tetos, que continuam respeitados.
+import itertools
+
+import numpy as np
+
+MAX_CENARIOS_EXATOS = 6561
+N_CENARIOS_AMOSTRA = 10000
+
+
+def _cenarios(probs, n_amostras, semente):
+    n_jogos = probs.shape[0]
+    if 3 ** n_jogos <= MAX_CENARIOS_EXATOS:
+        resultados = np.array(list(itertools.product(range(3), repeat=n_jogos)), dtype=np.int8)
+        resultados = resultados.reshape(-1, n_jogos)
+        pesos = np.prod(probs[np.arange(n_jogos), resultados], axis=1)
+        return resultados, pesos / pesos.sum()
+    rng = np.random.default_rng(semente)
+    acumulada = np.cumsum(probs, axis=1)
+    sorteio = rng.random((n_amostras, n_jogos, 1))
+    resultados = (sorteio > acumulada[None, :, :2]).sum(axis=2).astype(np.int8)
+    return resultados, np.full(n_amostras, 1 / n_amostras)
+
+
+def _projetar(x, limite_total, limite_aposta):
+    # Projeção euclidiana em {0 <= f <= limite_aposta, soma(f) <= limite_total}
+    f = np.clip(x, 0, limite_aposta)
+    if f.sum() <= limite_total:
+        return f
+    baixo, alto = 0.0, float(x.max())
+    for _ in range(60):
+        meio = (baixo + alto) / 2
+        if np.clip(x - meio, 0, limite_aposta).sum() > limite_total:
+            baixo = meio
+        else:
+            alto = meio
+    return np.clip(x - alto, 0, limite_aposta)
+
+
+def kelly_carteira(probs, odds, limite_total=0.25, limite_aposta=0.10, fracao=1.0,
+                   n_amostras=N_CENARIOS_AMOSTRA, max_iter=300, tol=1e-7, semente=0):
+    # probs e odds: matrizes (jogos x 3) na ordem vitória, empate, derrota.
+    # Probabilidades em fração (0-1). Retorna as frações da banca por jogo/resultado.
+    probs = np.asarray(probs, dtype=float)
+    odds = np.asarray(odds, dtype=float)
+    probs = probs / probs.sum(axis=1, keepdims=True)
+    n_jogos = probs.shape[0]
+    limite_total = min(limite_total, 0.99)
+
+    # Só entram no otimizador as apostas com valor esperado positivo
+    ativo = (probs * odds > 1) & (odds > 1)
+    fracoes = np.zeros((n_jogos, 3))
+    if n_jogos == 0 or not ativo.any() or fracao <= 0:
+        return fracoes
+    teto_total = min(limite_total / fracao, 0.99)
+    teto_aposta = limite_aposta / fracao
+
+    resultados, pesos = _cenarios(probs, n_amostras, semente)
+    # Matriz de retornos (cenários x apostas ativas): odd se o resultado sai, 0 caso contrário
+    jogo_ativo, resultado_ativo = np.nonzero(ativo)
+    retornos = np.where(resultados[:, jogo_ativo] == resultado_ativo, odds[jogo_ativo, resultado_ativo], 0.0)
+
+    def objetivo(f):
+        return pesos @ np.log(1 - f.sum() + retornos @ f)
+
+    def gradiente(f):
+        inv = pesos / (1 - f.sum() + retornos @ f)
+        return retornos.T @ inv - inv.sum()
+
+    f = np.zeros(len(jogo_ativo))
+    y, t, passo = f.copy(), 1.0, 1.0
+    valor = objetivo(f)
+    for _ in range(max_iter):
+        g = gradiente(y)
+        valor_y = objetivo(y)
+        # Busca de passo com retrocesso (condição de majoração quadrática)
+        while True:
+            candidato = _projetar(y + passo * g, teto_total, teto_aposta)
+            diferenca = candidato - y
+            if objetivo(candidato) >= valor_y + g @ diferenca - diferenca @ diferenca / (2 * passo):
+                break
+            passo /= 2
+        novo_valor = objetivo(candidato)
+        t_novo = (1 + np.sqrt(1 + 4 * t * t)) / 2
+        if novo_valor < valor:
+            # Reinício adaptativo quando a aceleração piora o objetivo
+            y, t = f.copy(), 1.0
+            continue
+        y = candidato + (t - 1) / t_novo * (candidato - f)
+        convergiu = abs(novo_valor - valor) < tol
+        f, t, valor = candidato, t_novo, novo_valor
+        if convergiu:
+            break
+
+    fracoes[jogo_ativo, resultado_ativo] = f * fracao
+    return fracoes
+
+
+def crescimento_esperado(probs, odds, fracoes, n_amostras=N_CENARIOS_AMOSTRA, semente=0):
+    probs = np.asarray(probs, dtype=float)
+    probs = probs / probs.sum(axis=1, keepdims=True)
+    fracoes = np.asarray(fracoes, dtype=float)
+    n_jogos = probs.shape[0]
+    if n_jogos == 0:
+        return 0.0
+    resultados, pesos = _cenarios(probs, n_amostras, semente)
+    ganho = (fracoes * np.asarray(odds, dtype=float))[np.arange(n_jogos), resultados].sum(axis=1)
+    return float(pesos @ np.log(1 - fracoes.sum() + ganho))
@@ -0,0 +1,174 @@
+# === Liquidação de apostas em lote e livro-caixa da banca ===
+# Cada aposta registrada debita a stake no livro-caixa (tabela "banca") e fica aberta
+# até surgir o resultado do jogo na tabela "resultados". Liquidar cruza todas as
+# apostas abertas com os resultados por um índice de partidas, calcula o retorno de
+# cada mercado de uma vez (vetorizado) e grava um único lote de créditos. A aposta
+# liquidada ganha uma linha "liquidacao" com o seu id, então liquidar de novo não
+# paga duas vezes. O saldo da banca é a soma do livro-caixa do analista. Ler as
+# apostas abertas e gravar os créditos acontece sob uma trava de arquivo, que vale
+# também entre os processos do Streamlit que dividem a mesma pasta.
+import hashlib
+import os
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+import armazenamento
+import handicap
+from nucleo import MERCADOS
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+MERCADO_1X2 = "1X2"
+# Códigos de mercado usados no cálculo vetorizado
+CODIGOS_MERCADO = {MERCADO_1X2: 0, MERCADOS[0]: 1, MERCADOS[1]: 2, MERCADOS[2]: 3}
+# Seleção: 0 = casa, 1 = empate, 2 = visitante (na dupla possibilidade, o resultado que fica de fora)
+CASA, EMPATE, FORA = 0, 1, 2
+DEPOSITO, APOSTA, LIQUIDACAO = "deposito", "aposta", "liquidacao"
+LINHA_HANDICAP_PADRAO = -0.5
+LINHAS_HANDICAP = [float(linha) for linha in handicap.LINHAS]
+
+# Registro e liquidação não se cruzam no livro-caixa: a trava de thread serve ao
+# processo e o flock no arquivo da pasta aos demais processos
+_trava = threading.Lock()
+ARQUIVO_TRAVA = "banca.lock"
+
+
+@contextmanager
+def _livro_travado(pasta):
+    with _trava:
+        if fcntl is None:
+            # Sem fcntl (Windows) vale só a trava do processo
+            yield
+            return
+        os.makedirs(pasta, exist_ok=True)
+        with open(os.path.join(pasta, ARQUIVO_TRAVA), "a") as arquivo:
+            fcntl.flock(arquivo, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(arquivo, fcntl.LOCK_UN)
+
+
+def odd_mercado(mercado, odd_vitoria, odd_empate, odd_derrota):
+    # Odd equivalente para a casa a partir do 1X2: empate anula devolve a stake no
+    # empate, dupla possibilidade cobre vitória ou empate; o handicap -0,5 é a própria vitória
+    if mercado == MERCADOS[0]:
+        return round(odd_vitoria * (odd_empate - 1) / odd_empate, 2) if odd_empate > 0 else odd_vitoria
+    if mercado == MERCADOS[1]:
+        return round(1 / (1 / odd_vitoria + 1 / odd_empate), 2) if odd_vitoria > 0 and odd_empate > 0 else 0.0
+    return odd_vitoria
+
+
+def retornos(mercados, selecoes, linhas, odds, gols_casa, gols_fora):
+    # Quanto volta por unidade apostada (0 = perdida, 1 = devolvida, odd = ganha)
+    mercados = np.asarray(mercados, dtype=int)
+    selecoes = np.asarray(selecoes, dtype=int)
+    odds = np.asarray(odds, dtype=float)
+    diferenca = np.asarray(gols_casa, dtype=float) - np.asarray(gols_fora, dtype=float)
+    resultado = np.where(diferenca > 0, CASA, np.where(diferenca == 0, EMPATE, FORA))
+    # Margem do ponto de vista do time escolhido (casa ou visitante)
+    margem = np.where(selecoes == FORA, -diferenca, diferenca)
+
+    ganhou_1x2 = resultado == selecoes
+    dupla = resultado != selecoes
+    anula = np.where(resultado == EMPATE, 1.0, np.where(margem > 0, odds, 0.0))
+
+    # Handicap asiático: linhas de quarto (x,25 / x,75) dividem a stake entre as duas linhas vizinhas
+    linhas = np.nan_to_num(np.asarray(linhas, dtype=float), nan=LINHA_HANDICAP_PADRAO)
+    retorno_handicap = sum(
+        np.select([margem + linha > 0, margem + linha == 0], [odds, 1.0], 0.0) for linha in handicap.metades(linhas)
+    ) / 2
+
+    return np.select(
+        [mercados == 0, mercados == 1, mercados == 2, mercados == 3],
+        [np.where(ganhou_1x2, odds, 0.0), anula, np.where(dupla, odds, 0.0), retorno_handicap],
+        np.nan
+    )
+
+
+def _id_aposta(*campos):
+    # Mesmo registro no mesmo segundo (clique duplo) gera o mesmo id
+    return hashlib.sha1("|".join(map(str, campos)).encode("utf-8")).hexdigest()[:16]
+
+
+def livro_caixa(pasta=armazenamento.PASTA_HISTORICO, analista=None):
+    livro = armazenamento.abrir_dataframe("banca", pasta)
+    if analista is not None:
+        livro = livro[livro["analista"] == analista]
+    return livro
+
+
+def saldo(analista, pasta=armazenamento.PASTA_HISTORICO):
+    # None quando o analista ainda não tem livro-caixa
+    livro = livro_caixa(pasta, analista)
+    return float(livro["valor"].sum()) if len(livro) else None
+
+
+def registrar_aposta(partida, analista, mercado, odd, stake, banca_atual,
+                     selecao=CASA, linha=np.nan, pasta=armazenamento.PASTA_HISTORICO):
+    # O primeiro registro do analista abre o livro-caixa com a banca informada
+    agora = pd.Timestamp.now().floor("s")
+    id_aposta = _id_aposta(agora, analista, partida, mercado, selecao, linha, odd, stake)
+    with _livro_travado(pasta):
+        livro = livro_caixa(pasta, analista)
+        if (livro["id_aposta"] == id_aposta).any():
+            return id_aposta
+        armazenamento.gravar_lote("apostas", pd.DataFrame([{
+            "data": agora, "id_aposta": id_aposta, "analista": analista, "partida": partida,
+            "mercado": mercado, "selecao": selecao, "linha": linha, "odd": float(odd), "stake": float(stake),
+        }]), pasta)
+        movimentos = [] if len(livro) else [{"data": agora, "analista": analista, "id_aposta": "", "tipo": DEPOSITO, "valor": float(banca_atual)}]
+        movimentos.append({"data": agora, "analista": analista, "id_aposta": id_aposta, "tipo": APOSTA, "valor": -float(stake)})
+        armazenamento.gravar_lote("banca", pd.DataFrame(movimentos), pasta)
+    return id_aposta
+
+
+def apostas_abertas(pasta=armazenamento.PASTA_HISTORICO):
+    apostas = armazenamento.abrir_dataframe("apostas", pasta)
+    livro = armazenamento.abrir_dataframe("banca", pasta, ["id_aposta", "tipo"])
+    liquidadas = livro.loc[livro["tipo"] == LIQUIDACAO, "id_aposta"]
+    return apostas[~apostas["id_aposta"].isin(liquidadas)].drop_duplicates("id_aposta")
+
+
+def ultimos_resultados(pasta=armazenamento.PASTA_HISTORICO):
+    # Um placar por partida (o último importado vale), indexado pela partida
+    resultados = armazenamento.abrir_dataframe("resultados", pasta, ["partida", "gols_casa", "gols_fora"])
+    return resultados.drop_duplicates("partida", keep="last").set_index("partida")
+
+
+def liquidar(pasta=armazenamento.PASTA_HISTORICO):
+    # Liquida todas as apostas abertas com resultado conhecido; idempotente
+    with _livro_travado(pasta):
+        abertas = apostas_abertas(pasta)
+        resultados = ultimos_resultados(pasta)
+        posicao = resultados.index.get_indexer(abertas["partida"])
+        abertas = abertas[posicao >= 0]
+        posicao = posicao[posicao >= 0]
+        if not len(abertas):
+            return abertas.assign(retorno=pd.Series(dtype=float))
+        retorno = retornos(
+            abertas["mercado"].map(CODIGOS_MERCADO).fillna(-1).to_numpy(),
+            abertas["selecao"].to_numpy(),
+            abertas["linha"].to_numpy(),
+            abertas["odd"].to_numpy(),
+            resultados["gols_casa"].to_numpy()[posicao],
+            resultados["gols_fora"].to_numpy()[posicao],
+        )
+        # Mercado desconhecido fica aberto em vez de ser liquidado com valor inventado
+        validas = ~np.isnan(retorno)
+        abertas = abertas[validas].assign(retorno=abertas["stake"].to_numpy()[validas] * retorno[validas])
+        if len(abertas):
+            armazenamento.gravar_lote("banca", pd.DataFrame({
+                "data": pd.Timestamp.now().floor("s"),
+                "analista": abertas["analista"].to_numpy(),
+                "id_aposta": abertas["id_aposta"].to_numpy(),
+                "tipo": LIQUIDACAO,
+                "valor": abertas["retorno"].to_numpy(),
+            }), pasta)
+    return abertas
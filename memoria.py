@@ -0,0 +1,114 @@
+# === Diagnóstico de memória por sessão (?memoria=1) ===
+# Mede quanto cada chave do st.session_state ocupa, guarda um snapshot do
+# tracemalloc por fase e acompanha o crescimento entre reruns para apontar vazamentos.
+# O tracemalloc pesa em toda alocação do processo, de todas as sessões: o app nunca o
+# liga sozinho. As alocações só aparecem com o servidor iniciado com
+# PYTHONTRACEMALLOC=<quadros> (ou python -X tracemalloc); sem isso, ?memoria=1 mostra
+# apenas o tamanho do session_state.
+import sys
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+CHAVE_DIAGNOSTICO = "_memoria"
+N_QUADROS = 10
+N_HISTORICO = 50
+RERUNS_CRESCIMENTO = 5
+
+# O tracemalloc enxerga o processo inteiro: um snapshot por fase para todo o
+# processo, fora do session_state, para o diagnóstico não virar ele próprio o vazamento
+_snapshots_por_fase = {}
+
+
+def tamanho_profundo(obj, vistos=None):
+    # sys.getsizeof recursivo, sem contar duas vezes objetos compartilhados
+    if vistos is None:
+        vistos = set()
+    if id(obj) in vistos:
+        return 0
+    vistos.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        return sys.getsizeof(obj) + (obj.nbytes if obj.base is None else 0)
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return int(obj.memory_usage(deep=True).sum()) if isinstance(obj, pd.DataFrame) else int(obj.memory_usage(deep=True))
+    tamanho = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        tamanho += sum(tamanho_profundo(k, vistos) + tamanho_profundo(v, vistos) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        tamanho += sum(tamanho_profundo(item, vistos) for item in obj)
+    elif hasattr(obj, "__dict__") and not isinstance(obj, type):
+        tamanho += tamanho_profundo(vars(obj), vistos)
+    return tamanho
+
+
+def tamanho_por_chave(estado):
+    linhas = [
+        {"Chave": str(chave), "Tipo": type(valor).__name__, "Bytes": tamanho_profundo(valor)}
+        for chave, valor in estado.items()
+        if chave != CHAVE_DIAGNOSTICO
+    ]
+    df = pd.DataFrame(linhas, columns=["Chave", "Tipo", "Bytes"])
+    return df.sort_values("Bytes", ascending=False, ignore_index=True)
+
+
+def crescimento_continuo(historico, n=RERUNS_CRESCIMENTO):
+    # Sessão que só cresce nas últimas n execuções sem mudar de fase é suspeita
+    if len(historico) < n:
+        return False
+    recentes = historico[-n:]
+    if len({registro["fase"] for registro in recentes}) > 1:
+        return False
+    tamanhos = [registro["sessao"] for registro in recentes]
+    return all(b > a for a, b in zip(tamanhos, tamanhos[1:]))
+
+
+def maiores_alocacoes(snapshot, anterior=None, n=N_QUADROS):
+    filtros = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen importlib._bootstrap>")]
+    snapshot = snapshot.filter_traces(filtros)
+    if anterior is not None:
+        estatisticas = snapshot.compare_to(anterior.filter_traces(filtros), "lineno")[:n]
+        return pd.DataFrame([
+            {"Local": str(e.traceback), "KiB": round(e.size / 1024, 1), "Δ KiB": round(e.size_diff / 1024, 1), "Blocos": e.count}
+            for e in estatisticas
+        ])
+    return pd.DataFrame([
+        {"Local": str(e.traceback), "KiB": round(e.size / 1024, 1), "Blocos": e.count}
+        for e in snapshot.statistics("lineno")[:n]
+    ])
+
+
+def diagnosticar_memoria(fase):
+    if st.query_params.get("memoria") != "1":
+        return
+    rastreando = tracemalloc.is_tracing()
+
+    diagnostico = st.session_state.setdefault(CHAVE_DIAGNOSTICO, {"historico": []})
+    por_chave = tamanho_por_chave(st.session_state)
+    atual, pico = tracemalloc.get_traced_memory() if rastreando else (None, None)
+    diagnostico["historico"].append({"fase": fase, "sessao": int(por_chave["Bytes"].sum()), "processo": atual})
+    del diagnostico["historico"][:-N_HISTORICO]
+
+    if rastreando:
+        snapshot = tracemalloc.take_snapshot()
+        anterior = _snapshots_por_fase.get(fase)
+        _snapshots_por_fase[fase] = snapshot
+
+    with st.expander("🧠 Diagnóstico de Memória", expanded=True):
+        col_sessao, col_processo, col_pico = st.columns(3)
+        col_sessao.metric("session_state", f"{por_chave['Bytes'].sum() / 1024:.1f} KiB")
+        if rastreando:
+            col_processo.metric("Alocado (tracemalloc)", f"{atual / 1024 ** 2:.1f} MiB")
+            col_pico.metric("Pico", f"{pico / 1024 ** 2:.1f} MiB")
+        if crescimento_continuo(diagnostico["historico"]):
+            st.warning(f"⚠️ session_state cresceu nas últimas {RERUNS_CRESCIMENTO} execuções sem mudar de fase: possível vazamento.")
+        st.markdown("**Tamanho por chave do session_state**")
+        st.dataframe(por_chave, use_container_width=True, hide_index=True)
+        st.markdown("**Evolução entre execuções**")
+        st.line_chart(pd.DataFrame(diagnostico["historico"])[["sessao"]])
+        if not rastreando:
+            st.info("Alocações do processo: inicie o servidor com PYTHONTRACEMALLOC=10 (ou python -X tracemalloc=10).")
+            return
+        st.markdown(f"**Maiores alocações na fase {fase}**" + (" (comparadas à última execução nesta fase)" if anterior is not None else ""))
+        st.dataframe(maiores_alocacoes(snapshot, anterior), use_container_width=True, hide_index=True)
@@ -0,0 +1,78 @@
+# === Núcleo compartilhado do Analista Esportivo Inteligente ===
+# Dados e regras usados por mais de uma parte do app (checklist, snapshot, etc.)
+
+FATORES_PADRAO = [
+    ("Quem tem o melhor goleiro?", 3),
+    ("Quem tem os melhores zagueiros?", 3),
+    ("Quem tem os melhores laterais?", 2),
+    ("Quem tem os melhores volantes?", 2),
+    ("Quem tem os melhores meias e atacantes?", 3),
+    ("Quem tem jogadores mais habilidosos?", 2),
+    ("Quem tem jogadores mais disciplinados taticamente?", 2),
+    ("Quem joga em liga mais competitiva?", 3),
+    ("Quem tem melhor técnico?", 3),
+    ("Quem tem melhor ataque?", 4),
+    ("Quem tem melhor defesa?", 4),
+    ("Quem tem mais posse de bola durante os jogos?", 2),
+    ("Quem tem mais camisa/tradição?", 2),
+    ("Quem fez mais investimento no elenco?", 2),
+    ("Quem joga em casa?", 3),
+    ("Quem vem melhor nos últimos 5 jogos?", 4),
+    ("É jogo de mata-mata, classificação ou liderança?", 2),
+    ("Pode chover durante o jogo?", 1),
+    ("O gramado é bom ou ruim?", 1)
+]
+
+MERCADOS = ["Empate Anula", "Dupla Possibilidade", "Handicap"]
+
+# Códigos de resposta do checklist: 0 = Nenhum, 1 = Casa, 2 = Fora
+NENHUM, CASA, FORA = 0, 1, 2
+
+
+def calcular_odds(prob):
+    return round(1 / (prob / 100), 2) if prob > 0 else float('inf')
+
+
+def calcular_probabilidades(saldo_casa, saldo_fora):
+    # Base 50/50 deslocada pelo saldo de vantagem de cada time
+    prob_casa = max(0, 50 + saldo_casa)
+    prob_fora = max(0, 50 + saldo_fora)
+    total = prob_casa + prob_fora
+    vitoria = round((prob_casa / total) * 100, 1) if total > 0 else 50
+    derrota = round((prob_fora / total) * 100, 1) if total > 0 else 50
+    empate = max(0, round(100 - vitoria - derrota, 1))
+    return vitoria, empate, derrota
+
+
+def montar_resposta(codigo, pergunta, peso, time_casa, time_fora):
+    if codigo == CASA:
+        return (peso, f"⬆️ {pergunta} → {time_casa} (+{peso}%)")
+    if codigo == FORA:
+        return (-peso, f"⬇️ {pergunta} → {time_fora} (+{peso}%)")
+    return (0, f"⚖️ {pergunta} → Nenhuma vantagem (0%)")
+
+
+def codigo_resposta(resposta):
+    _, msg = resposta
+    if '⬆️' in msg:
+        return CASA
+    if '⬇️' in msg:
+        return FORA
+    return NENHUM
+
+
+def kelly_formula(p, b):
+    # Fração de Kelly para odd líquida b; nunca negativa
+    try:
+        return max(0, (p * (b + 1) - 1) / b)
+    except ZeroDivisionError:
+        return 0
+
+
+def probabilidades_mercado(odd_vitoria, odd_empate, odd_derrota):
+    # Probabilidades implícitas nas odds, sem a margem da casa (em %)
+    inversos = [100 / odd if odd > 0 else 0 for odd in (odd_vitoria, odd_empate, odd_derrota)]
+    total = sum(inversos)
+    if total <= 0:
+        return [0, 0, 0]
+    return [round(inverso / total * 100, 1) for inverso in inversos]
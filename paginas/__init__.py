@@ -0,0 +1,3 @@
+# === Páginas do Analista Esportivo Inteligente ===
+# Um módulo por fase da análise. O app.py importa e executa só a página ativa,
+# então o código (e as bibliotecas) das outras fases não roda a cada reexecução.
@@ -0,0 +1,126 @@
+# === Checklist dinâmico (fase 2) ===
+# A pergunta e o gráfico rodam em fragmentos: um clique em "Próxima" reexecuta só o
+# checklist (e o gráfico aninhado), sem reenviar estilo, cabeçalho e entradas
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+import eventos
+from distribuicao import distribuicao_vitoria
+from nucleo import CASA, FORA, NENHUM, probabilidades_mercado
+from paginas.comum import figura_comparativo
+from regras import SEM_RESPOSTA, descrever_regra
+from sessao import (
+    desfazer_resposta, ir_para_pergunta, pontuar, probabilidades_atuais, refazer_resposta,
+    registrar_resposta, regras_atuais, responder_com_dados, sincronizar_snapshot, sugestoes_atuais
+)
+
+
+@st.fragment
+def grafico_checklist(etapa, saldo_casa, saldo_fora, vitoria, empate, derrota):
+    time_casa, time_fora = st.session_state.time_casa, st.session_state.time_fora
+    odd_vitoria = st.session_state.odd_vitoria
+    prob_mercado = probabilidades_mercado(odd_vitoria, st.session_state.odd_empate, st.session_state.odd_derrota)
+
+    labels = [f"{time_casa} 🏠", "Empate 🤝", f"{time_fora} 🛫"]
+    fig = figura_comparativo(labels, [vitoria, empate, derrota], prob_mercado, "📊 Comparativo: Sua Análise x Odds do Mercado")
+    fig.update_layout(
+        yaxis=dict(range=[0, 100]),
+        height=380,
+        margin=dict(t=30, b=20)
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    # Distribuição da vitória final considerando as perguntas que faltam
+    if not st.toggle("🎲 Mostrar distribuição final", value=True, key="mostrar_distribuicao"):
+        return
+    dist = distribuicao_vitoria(st.session_state.fatores, etapa, saldo_casa, saldo_fora, odd_vitoria, pontuar=pontuar)
+    col_ev, col_esperada = st.columns(2)
+    col_ev.metric("Chance de terminar com EV+", f"{dist['prob_ev_positivo'] * 100:.1f}%")
+    col_esperada.metric(f"Vitória {time_casa} esperada", f"{dist['vitoria_esperada']:.1f}%")
+
+    data_dist = pd.DataFrame({
+        "Vitória final (%)": dist["vitoria"],
+        "Chance (%)": dist["probabilidade"] * 100,
+        "EV": np.where(dist["ev"] > 0, "Positivo", "Negativo")
+    })
+    fig_dist = px.bar(
+        data_dist,
+        x="Vitória final (%)",
+        y="Chance (%)",
+        color="EV",
+        color_discrete_map={
+            "Positivo": "#00cc96",
+            "Negativo": "#ef553b"
+        }
+    )
+    fig_dist.update_layout(
+        title="🎲 Distribuição da Probabilidade Final",
+        height=300,
+        margin=dict(t=30, b=20)
+    )
+    st.plotly_chart(fig_dist, use_container_width=True)
+
+
+@st.fragment
+def checklist_etapa():
+    fatores = st.session_state.fatores
+    etapa = st.session_state.etapa
+    if etapa >= len(fatores):
+        # Checklist concluído: a fase 3 precisa da página inteira
+        st.rerun()
+    sincronizar_snapshot()
+
+    log = st.session_state.log_checklist
+    time_casa, time_fora = st.session_state.time_casa, st.session_state.time_fora
+    saldo_casa, saldo_fora, (vitoria, empate, derrota) = probabilidades_atuais()
+
+    col_pergunta, col_grafico = st.columns([2, 1])
+    with col_pergunta:
+        pergunta, peso = fatores[etapa]
+        st.markdown(f"**{etapa + 1}/{len(fatores)}** - {pergunta}")
+        # Com dados dos times, a pergunta já vem marcada; o analista só muda se discordar
+        codigos_dados, valores_dados = sugestoes_atuais()
+        sugestao = codigos_dados[etapa]
+        nomes = {NENHUM: "Nenhum", CASA: time_casa, FORA: time_fora}
+        if sugestao != SEM_RESPOSTA and f"etapa_{etapa}" not in st.session_state:
+            st.session_state[f"etapa_{etapa}"] = nomes[sugestao]
+        st.radio("Quem leva vantagem?", ["Nenhum", time_casa, time_fora], key=f"etapa_{etapa}")
+        if sugestao != SEM_RESPOSTA:
+            valor_casa, valor_fora = valores_dados[etapa]
+            comparacao = "" if np.isnan(valor_casa) else f": {valor_casa:.2f} x {valor_fora:.2f}"
+            st.caption(f"🤖 Dados: {nomes[sugestao]} ({descrever_regra(regras_atuais()[etapa])}{comparacao})")
+        col_proxima, col_dados = st.columns([1, 2])
+        col_proxima.button("Próxima", key=f"btn_{etapa}", on_click=registrar_resposta)
+        col_dados.button("🤖 Aceitar os dados até a próxima pergunta sem dados", key=f"dados_{etapa}",
+                         on_click=responder_com_dados, disabled=sugestao == SEM_RESPOSTA)
+        st.progress(etapa / len(fatores))
+
+        col_desfazer, col_refazer, col_ir = st.columns([1, 1, 2])
+        col_desfazer.button("↩️ Desfazer", key=f"desfazer_{etapa}", on_click=desfazer_resposta,
+                            disabled=not eventos.pode_desfazer(log))
+        col_refazer.button("↪️ Refazer", key=f"refazer_{etapa}", on_click=refazer_resposta,
+                           disabled=not eventos.pode_refazer(log))
+        alcancaveis = list(range(min(len(log["codigos"]), len(fatores) - 1) + 1))
+        if len(alcancaveis) > 1:
+            with col_ir:
+                st.selectbox(
+                    "Ir para a pergunta",
+                    alcancaveis,
+                    index=etapa,
+                    format_func=lambda i: f"{i + 1}. {fatores[i][0]}",
+                    key=f"ir_para_{etapa}",
+                    on_change=ir_para_pergunta,
+                    args=(f"ir_para_{etapa}",),
+                    label_visibility="collapsed"
+                )
+
+    with col_grafico:
+        grafico_checklist(etapa, saldo_casa, saldo_fora, vitoria, empate, derrota)
+
+
+def exibir():
+    st.subheader(f"✅ CHECKLIST DE ANÁLISE DO JOGO: {st.session_state.time_casa} x {st.session_state.time_fora}")
+    st.markdown("### 🧠 Responda cada critério de forma interativa:")
+    checklist_etapa()
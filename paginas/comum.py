@@ -0,0 +1,28 @@
+# === Gráficos compartilhados pelas páginas ===
+import pandas as pd
+import plotly.express as px
+
+
+def figura_comparativo(labels, prob_analise, prob_mercado, titulo, extras=None):
+    # Barras agrupadas: sua análise x mercado (e outras fontes, ex.: "Mercado agora")
+    fontes = {"Sua Análise": list(prob_analise), "Mercado": list(prob_mercado), **(extras or {})}
+    data_comparativo = pd.DataFrame({
+        "Resultado": labels * len(fontes),
+        "Probabilidade (%)": [p for probs in fontes.values() for p in probs],
+        "Fonte": [fonte for fonte in fontes for _ in labels]
+    })
+    fig = px.bar(
+        data_comparativo,
+        x="Resultado",
+        y="Probabilidade (%)",
+        color="Fonte",
+        barmode="group",
+        text="Probabilidade (%)",
+        color_discrete_map={
+            "Sua Análise": "#00cc96",
+            "Mercado": "#ef553b",
+            "Mercado agora": "#ffa15a"
+        }
+    )
+    fig.update_layout(title=titulo)
+    return fig
@@ -0,0 +1,50 @@
+# === Entrada de dados (sempre visível) e início do checklist (fase 1) ===
+import time
+
+import streamlit as st
+
+
+def exibir_campos():
+    col_titulo, col_banca = st.columns([5, 1])
+    with col_titulo:
+        col_a, col_b, col_c = st.columns(3)
+        with col_a:
+            st.text_input("Time da Casa", key="time_casa")
+        with col_b:
+            st.text_input("Empate", "Empate", disabled=True)
+        with col_c:
+            st.text_input("Time Visitante", key="time_fora")
+
+        col_d, col_e, col_f = st.columns(3)
+        with col_d:
+            st.number_input("Odd Vitória (Casa)", step=0.01, key="odd_vitoria")
+        with col_e:
+            st.number_input("Odd Empate", step=0.01, key="odd_empate")
+        with col_f:
+            st.number_input("Odd Vitória (Visitante)", step=0.01, key="odd_derrota")
+
+    with col_banca:
+        st.markdown("#### 💼 Banca")
+        st.number_input("Banca", step=10.0, label_visibility="collapsed", key="banca")
+        st.markdown("<small>Saldo da Banca (R$)</small>", unsafe_allow_html=True)
+
+
+def exibir(questionarios, erros_questionarios):
+    for erro in erros_questionarios:
+        st.warning(f"⚠️ Questionário ignorado: {erro}")
+    ids_questionarios = list(questionarios)
+    escolhido = st.selectbox(
+        "📋 Questionário",
+        ids_questionarios,
+        index=ids_questionarios.index(st.session_state.questionario),
+        format_func=lambda qid: questionarios[qid]["nome"]
+    )
+    if escolhido != st.session_state.questionario:
+        st.session_state.questionario = escolhido
+        st.session_state.fatores = list(questionarios[escolhido]["fatores"])
+        st.rerun()
+
+    if st.button("➡️ Começar Checklist"):
+        st.session_state.fase = 2
+        st.session_state.inicio_analise = time.time()
+        st.rerun()
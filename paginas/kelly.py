@@ -0,0 +1,280 @@
+# === Stake Kelly e mercados alternativos (fase 3, segunda tela) ===
+# O relatório só é importado depois que um mercado é escolhido.
+import importlib
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import eventos
+import handicap
+import liquidacao
+from kelly_portfolio import kelly_carteira
+from nucleo import MERCADOS, kelly_formula
+from risco import FRACOES, HORIZONTE, LIMITE_RUINA, consultar_risco, grade_risco, risco_analitico
+from sessao import odds_justas, peso_respondido, pontuar, probabilidades_atuais
+
+COLUNAS_RODADA = [
+    "Jogo",
+    "Prob. Vitória (%)", "Prob. Empate (%)", "Prob. Derrota (%)",
+    "Odd Vitória", "Odd Empate", "Odd Derrota"
+]
+
+
+@st.cache_data(show_spinner=False)
+def calcular_carteira(probs, odds, limite_total, limite_aposta, fracao):
+    return kelly_carteira(probs / 100, odds, limite_total, limite_aposta, fracao)
+
+
+@st.cache_data(show_spinner=False)
+def distribuicao_jogo(vitoria, empate, derrota):
+    # Saldo de gols do ponto de vista da casa a partir das probabilidades 1X2
+    return handicap.distribuicao_saldo(*handicap.ajustar_medias(vitoria, empate, derrota))[0]
+
+
+def odds_derivadas(odd_lado, odd_empate, odd_oposta):
+    # Linhas que o 1X2 já precifica: -0,5 é a vitória, 0 o empate anula, +0,5 a dupla possibilidade
+    return {
+        -0.5: odd_lado,
+        0.0: liquidacao.odd_mercado(MERCADOS[0], odd_lado, odd_empate, odd_oposta),
+        0.5: liquidacao.odd_mercado(MERCADOS[1], odd_lado, odd_empate, odd_oposta),
+    }
+
+
+def exibir():
+    time_casa, time_fora = st.session_state.time_casa, st.session_state.time_fora
+    odd_vitoria, odd_empate, odd_derrota = st.session_state.odd_vitoria, st.session_state.odd_empate, st.session_state.odd_derrota
+    banca = st.session_state.banca
+    saldo_casa, saldo_fora, (vitoria, empate, derrota) = probabilidades_atuais()
+    justas = odds_justas(vitoria, empate, derrota)
+
+    st.subheader("⚙️ Stake Kelly e Mercados Alternativos")
+
+    valor_esperado_vitoria = (vitoria / 100) * odd_vitoria - 1
+    kelly_vitoria = kelly_formula(vitoria / 100, odd_vitoria - 1)
+    stake_kelly_vitoria = banca * kelly_vitoria
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric(label="Valor Esperado (EV)", value=f"{valor_esperado_vitoria:.2f}")
+    col2.metric(label="Stake Kelly (%)", value=f"{kelly_vitoria * 100:.1f}%")
+    col3.metric(label="Stake R$", value=f"R$ {stake_kelly_vitoria:.2f}")
+
+    st.markdown("### 💡 Recomendação Final")
+    if valor_esperado_vitoria > 0:
+        st.success("✅ Aposta com valor positivo. Pode valer a pena apostar.")
+    elif valor_esperado_vitoria == 0:
+        st.info("⚠️ Aposta neutra. Sem valor esperado.")
+    else:
+        st.warning("❌ Aposta com valor negativo. Evite apostar.")
+
+    # Risco do Kelly cheio e fracionário na vantagem e odd atuais (grade em cache)
+    with st.expander("📉 Risco de Ruína e Drawdown"):
+        if valor_esperado_vitoria <= 0 or odd_vitoria <= 1:
+            st.info("Sem vantagem na vitória: o Kelly não sugere aposta.")
+        else:
+            with st.spinner("Preparando a grade de risco (uma vez por servidor)..."):
+                grade_risco()
+            simulado, (vantagem_grade, odd_grade) = consultar_risco(valor_esperado_vitoria, odd_vitoria)
+            analitico = risco_analitico(valor_esperado_vitoria, odd_vitoria, np.array(FRACOES))
+            df_risco = pd.DataFrame({
+                "Fração de Kelly": [f"{fracao:.0%}" for fracao in FRACOES],
+                "Stake (% banca)": (analitico["fracao_banca"] * 100).round(2),
+                "Crescimento/aposta (%)": (analitico["crescimento"] * 100).round(3),
+                f"Ruína: perder {1 - LIMITE_RUINA:.0%} (%)": (analitico["ruina"] * 100).round(2),
+                "Chegar a 50% da banca inicial (%)": (analitico["metade_inicial"] * 100).round(2),
+                "Apostas p/ dobrar": np.round(analitico["tempo_dobrar"]),
+                f"Ruína em {HORIZONTE} apostas (sim., %)": (simulado["ruina_simulada"] * 100).round(1),
+                f"Queda máx. em {HORIZONTE} apostas (sim., %)": (simulado["queda_maxima"] * 100).round(1),
+                "Apostas p/ dobrar (sim., mediana)": [
+                    f"> {HORIZONTE}" if np.isinf(t) else f"{t:.0f}" for t in simulado["tempo_dobrar_simulado"]
+                ]
+            })
+            st.dataframe(df_risco, use_container_width=True, hide_index=True)
+            st.markdown(
+                f"<small>Colunas analíticas na vantagem atual ({valor_esperado_vitoria * 100:.1f}%) e odd {odd_vitoria:.2f}; "
+                f"simulação da grade mais próxima (vantagem {vantagem_grade * 100:.1f}%, odd {odd_grade:.2f}).</small>",
+                unsafe_allow_html=True
+            )
+
+    # Carteira da rodada: stakes conjuntas para todos os jogos simultâneos
+    if 'rodada' not in st.session_state:
+        st.session_state.rodada = []
+
+    with st.expander("📅 Carteira da Rodada (Kelly conjunto)"):
+        if st.button("➕ Adicionar este jogo à rodada"):
+            jogo = f"{time_casa} x {time_fora}"
+            st.session_state.rodada = [j for j in st.session_state.rodada if j["Jogo"] != jogo] + [{
+                "Jogo": jogo,
+                "Prob. Vitória (%)": vitoria,
+                "Prob. Empate (%)": empate,
+                "Prob. Derrota (%)": derrota,
+                "Odd Vitória": odd_vitoria,
+                "Odd Empate": odd_empate,
+                "Odd Derrota": odd_derrota
+            }]
+
+        df_rodada = st.data_editor(
+            pd.DataFrame(st.session_state.rodada, columns=COLUNAS_RODADA),
+            num_rows="dynamic",
+            use_container_width=True
+        ).dropna()
+
+        col_exp, col_max, col_frac = st.columns(3)
+        limite_total = col_exp.slider("Exposição máxima da banca (%)", 5, 95, 25) / 100
+        limite_aposta = col_max.slider("Máximo por aposta (%)", 1, 50, 10) / 100
+        fracao_kelly = col_frac.select_slider("Fração de Kelly", options=[0.25, 0.5, 0.75, 1.0], value=0.5)
+
+        if len(df_rodada):
+            fracoes = calcular_carteira(
+                df_rodada[COLUNAS_RODADA[1:4]].to_numpy(dtype=float),
+                df_rodada[COLUNAS_RODADA[4:]].to_numpy(dtype=float),
+                limite_total, limite_aposta, fracao_kelly
+            )
+            df_stakes = pd.DataFrame({
+                "Jogo": df_rodada["Jogo"],
+                "Stake Vitória (R$)": (fracoes[:, 0] * banca).round(2),
+                "Stake Empate (R$)": (fracoes[:, 1] * banca).round(2),
+                "Stake Derrota (R$)": (fracoes[:, 2] * banca).round(2)
+            })
+            st.dataframe(df_stakes, use_container_width=True)
+            st.markdown(f"**💰 Exposição total:** R$ {fracoes.sum() * banca:.2f} ({fracoes.sum() * 100:.1f}% da banca)")
+
+    # Escada de handicap asiático: todas as linhas precificadas de uma vez
+    if 'odds_handicap' not in st.session_state:
+        st.session_state.odds_handicap = {liquidacao.CASA: {}, liquidacao.FORA: {}}
+
+    with st.expander("⚔️ Escada de Handicap Asiático"):
+        lado = st.radio(
+            "Apostar em", [liquidacao.CASA, liquidacao.FORA], horizontal=True, key="lado_handicap",
+            format_func=lambda s: f"{time_casa} (casa)" if s == liquidacao.CASA else f"{time_fora} (visitante)"
+        )
+        dist = distribuicao_jogo(vitoria, empate, derrota)
+        if lado == liquidacao.FORA:
+            dist = dist[::-1]
+            derivadas = odds_derivadas(odd_derrota, odd_empate, odd_vitoria)
+        else:
+            derivadas = odds_derivadas(odd_vitoria, odd_empate, odd_derrota)
+        precos = handicap.precificar(dist)
+        guardadas = st.session_state.odds_handicap[lado]
+        df_escada = pd.DataFrame({
+            "Linha": handicap.LINHAS,
+            **{f"{nome} (%)": (precos[nome][0] * 100).round(1) for nome in handicap.RESULTADOS_LINHA},
+            "Odd Justa": precos["odd_justa"][0].round(2),
+            "Odd Mercado": [guardadas.get(float(linha), derivadas.get(float(linha), np.nan)) for linha in handicap.LINHAS],
+        })
+        editada = st.data_editor(
+            df_escada,
+            disabled=[coluna for coluna in df_escada.columns if coluna != "Odd Mercado"],
+            column_config={"Odd Mercado": st.column_config.NumberColumn(min_value=1.01, step=0.01, format="%.2f")},
+            use_container_width=True, hide_index=True, key=f"editor_handicap_{lado}"
+        )
+        odds_escada = editada["Odd Mercado"].to_numpy(dtype=float)
+        st.session_state.odds_handicap[lado] = {
+            float(linha): float(odd) for linha, odd in zip(handicap.LINHAS, odds_escada) if not np.isnan(odd)
+        }
+
+        ev_escada, kelly_escada = (valores[0] for valores in handicap.ev_kelly(dist, odds_escada))
+        com_odd = ~np.isnan(ev_escada)
+        if com_odd.any():
+            st.dataframe(pd.DataFrame({
+                "Linha": handicap.LINHAS[com_odd],
+                "Odd": odds_escada[com_odd],
+                "EV": ev_escada[com_odd].round(3),
+                "Stake Kelly (%)": (kelly_escada[com_odd] * 100).round(1),
+                "Stake R$": (kelly_escada[com_odd] * banca).round(2),
+            }), use_container_width=True, hide_index=True)
+            melhor = int(np.nanargmax(ev_escada))
+            st.markdown(f"**🏆 Melhor linha:** {handicap.LINHAS[melhor]:+.2f} @ {odds_escada[melhor]:.2f} (EV {ev_escada[melhor]:.3f})")
+        else:
+            melhor = None
+            st.info("Informe a odd de mercado de ao menos uma linha para calcular EV e Kelly.")
+
+    st.markdown("### 📌 Risco Estimado por Mercado")
+
+    # Proteções contra divisões por zero
+    try:
+        risco_empate_anula = (odd_vitoria - justas["Vitória"]) / justas["Vitória"]
+    except ZeroDivisionError:
+        risco_empate_anula = 0
+
+    media_odds_justas = (justas["Vitória"] + justas["Empate"]) / 2
+    if media_odds_justas > 0:
+        risco_dupla = ((odd_vitoria + odd_empate) / 2 - media_odds_justas) / media_odds_justas
+    else:
+        risco_dupla = 0
+
+    # Handicap: EV da melhor linha da escada com odd informada
+    risco_handicap = float(ev_escada[melhor]) if melhor is not None else None
+
+    riscos = {
+        "Empate Anula": risco_empate_anula,
+        "Dupla Possibilidade": risco_dupla,
+        "Handicap": risco_handicap
+    }
+
+    for nome, risco in riscos.items():
+        if isinstance(risco, float) and not pd.isna(risco):
+            cor = "🟢" if risco > 0 else "🔴"
+            st.markdown(f"- {cor} **{nome}**: {risco * 100:.1f}% {'de valor' if risco > 0 else 'de risco'}")
+        else:
+            st.markdown(f"- ⚠️ **{nome}**: dado insuficiente para cálculo")
+
+    if 'mercado_escolhido' not in st.session_state:
+        st.session_state.mercado_escolhido = None
+
+    st.markdown("### 🔘 Escolha o mercado ideal e gere seu relatório:")
+    col_ea, col_dp, col_hc = st.columns(3)
+    with col_ea:
+        if st.button("Empate Anula ⚖️"):
+            st.session_state.mercado_escolhido = "Empate Anula"
+            st.rerun()
+    with col_dp:
+        if st.button("Dupla Possibilidade 💡"):
+            st.session_state.mercado_escolhido = "Dupla Possibilidade"
+            st.rerun()
+    with col_hc:
+        if st.button("Handicap ⚔️"):
+            st.session_state.mercado_escolhido = "Handicap"
+            st.rerun()
+
+    if st.session_state.mercado_escolhido:
+        mercado = st.session_state.mercado_escolhido
+        importlib.import_module("paginas.relatorio").exibir({
+            "mercado": mercado,
+            "risco": riscos.get(mercado, 0),
+            "vitoria": vitoria,
+            "empate": empate,
+            "derrota": derrota,
+            "odds_justas": justas,
+            "stake": stake_kelly_vitoria,
+            "valor_esperado": valor_esperado_vitoria,
+            **({
+                "lado": lado,
+                "linha": float(handicap.LINHAS[melhor]) if melhor is not None else liquidacao.LINHA_HANDICAP_PADRAO,
+                "odds_handicap": st.session_state.odds_handicap[lado],
+                "stake": banca * float(kelly_escada[melhor]) if melhor is not None else 0.0,
+                "valor_esperado": float(ev_escada[melhor]) if melhor is not None else 0.0,
+            } if mercado == MERCADOS[2] else {}),
+        })
+
+    # Trilha de auditoria: o log de eventos reproduzido até qualquer ponto
+    log = st.session_state.log_checklist
+    with st.expander("🧾 Trilha de Auditoria do Checklist"):
+        trilha = eventos.trilha_auditoria(log, st.session_state.fatores, time_casa, time_fora)
+        st.dataframe(trilha, use_container_width=True, hide_index=True)
+        st.download_button(
+            "📥 Baixar Trilha (CSV)",
+            data=trilha.to_csv(index=False).encode("utf-8"),
+            file_name=f"trilha_{time_casa}_x_{time_fora}.csv".replace(" ", "_"),
+            mime="text/csv"
+        )
+        if len(log["eventos"]) > 1:
+            n_eventos = st.slider("Reproduzir até o evento", 1, len(log["eventos"]), len(log["eventos"]), key="replay_eventos")
+            log_replay = eventos.reproduzir(log["eventos"], n_eventos)
+            casa_replay, fora_replay = eventos.saldos(log_replay)
+            v_replay, e_replay, d_replay = pontuar(casa_replay, fora_replay, peso_respondido(log_replay["cursor"]))
+            st.markdown(
+                f"Após o evento {n_eventos}: pergunta **{log_replay['cursor']}/{len(st.session_state.fatores)}** respondida · "
+                f"Vitória {time_casa} **{v_replay:.1f}%** · Empate **{e_replay:.1f}%** · Vitória {time_fora} **{d_replay:.1f}%**"
+            )
+
@@ -0,0 +1,401 @@
+# === Barra lateral: analista, histórico, CLV, calibração, eventos, forma, simulação, banca, snapshot e surebets ===
+# Os painéis que leem o histórico em disco são expanders com estado: fechados, não
+# leem arquivos nem importam o motor; o conteúdo só roda enquanto estão abertos.
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+import armazenamento
+from nucleo import probabilidades_mercado
+from sessao import (
+    PASTA_FECHAMENTO, PASTA_ODDS, PASTA_RESULTADOS, carregar_tensor_odds, grade_historico, grade_surebets,
+    motor_forma_atual, obter_agregados_calibracao, obter_agregados_clv, obter_series_odds, resumo_banca, sincronizar_snapshot,
+    tabela_caracteristicas
+)
+from snapshot import decodificar_snapshot
+
+
+def _sob_demanda(titulo, chave, exibir_painel):
+    painel = st.sidebar.expander(titulo, key=f"painel_{chave}", on_change="rerun")
+    if painel.open:
+        with painel:
+            exibir_painel()
+
+
+def liquidar_apostas(prefixo=""):
+    # Liquida tudo o que tiver resultado e leva o saldo do livro-caixa para a banca
+    import liquidacao
+    liquidadas = liquidacao.liquidar()
+    st.session_state.aviso_banca = f"{prefixo}⚖️ {len(liquidadas)} aposta(s) liquidada(s), retorno de R$ {liquidadas['retorno'].sum():.2f}"
+    saldo_livro = liquidacao.saldo(st.session_state.analista)
+    if saldo_livro is not None:
+        st.session_state.banca_pendente = saldo_livro
+    st.rerun()
+
+
+def _painel_historico():
+    # Histórico colunar de análises salvas
+    from grade import exibir_grade
+    if armazenamento.pa is None:
+        st.info("Instale o pacote 'pyarrow' para guardar o histórico.")
+    else:
+        arquivos_historico = tuple(armazenamento.arquivos_tabela("analises", armazenamento.PASTA_HISTORICO))
+        arquivos_fechamento = tuple(armazenamento.arquivos_tabela("fechamento", armazenamento.PASTA_HISTORICO))
+        if arquivos_historico:
+            exibir_grade(grade_historico(arquivos_historico, arquivos_fechamento), "grade_historico")
+        else:
+            st.info("Nenhuma análise salva ainda.")
+
+
+def _painel_clv():
+    # Closing Line Value: odd tomada nas apostas registradas x odd de fechamento, por mercado e por analista
+    from clv import COLUNAS_FECHAMENTO, DIMENSOES, importar_fechamentos, ler_fechamentos
+    if armazenamento.pa is None:
+        st.info("Instale o pacote 'pyarrow' para acompanhar o CLV.")
+    else:
+        st.markdown(
+            f"<small>CSV com colunas: {', '.join(COLUNAS_FECHAMENTO)} (ou arquivos em {PASTA_FECHAMENTO}). "
+            f"Vale para as apostas registradas (🎟️); handicaps fora de -0,5, 0 e +0,5 não têm fechamento equivalente.</small>",
+            unsafe_allow_html=True
+        )
+        arquivos_clv = st.file_uploader("Odds de fechamento", type=["csv"], accept_multiple_files=True, key="arquivos_fechamento")
+        if st.button("📥 Importar fechamentos"):
+            try:
+                if arquivos_clv:
+                    df_fechamento = pd.concat([pd.read_csv(arquivo, usecols=COLUNAS_FECHAMENTO) for arquivo in arquivos_clv], ignore_index=True)
+                else:
+                    df_fechamento = ler_fechamentos(PASTA_FECHAMENTO) if os.path.isdir(PASTA_FECHAMENTO) else pd.DataFrame(columns=COLUNAS_FECHAMENTO)
+                if importar_fechamentos(df_fechamento) is None:
+                    st.info("Nenhuma odd de fechamento para importar.")
+                else:
+                    st.success(f"✅ {len(df_fechamento)} odds de fechamento importadas")
+            except (ValueError, KeyError) as erro:
+                st.error(f"Arquivo de fechamento inválido: {erro}")
+
+        agregados_clv = obter_agregados_clv()
+        agregados_clv.sincronizar()
+        total_clv = agregados_clv.total()
+        if total_clv["Apostas"]:
+            col_apostas, col_clv, col_acima = st.columns(3)
+            col_apostas.metric("Apostas", total_clv["Apostas"])
+            col_clv.metric("CLV médio", f"{total_clv['CLV médio (%)']:.2f}%")
+            col_acima.metric("Acima do fech.", f"{total_clv['Acima do fechamento (%)']:.0f}%")
+            dimensao_clv = st.radio("Agrupar por", list(DIMENSOES), format_func=DIMENSOES.get, horizontal=True, key="dimensao_clv")
+            st.dataframe(agregados_clv.resumo(dimensao_clv), use_container_width=True, hide_index=True)
+        else:
+            st.info("Nenhuma aposta com odd de fechamento ainda.")
+
+
+def _painel_calibracao():
+    # Calibração: probabilidades salvas x resultados reais, por liga, analista, questionário e mês
+    import calibracao
+    import forma
+    if armazenamento.pa is None:
+        st.info("Instale o pacote 'pyarrow' para avaliar as previsões.")
+    else:
+        st.markdown(
+            f"<small>CSV com colunas: {', '.join(calibracao.COLUNAS_RESULTADOS)} e, opcionalmente, liga "
+            f"(ou arquivos em {PASTA_RESULTADOS})</small>",
+            unsafe_allow_html=True
+        )
+        arquivos_resultados = st.file_uploader("Resultados dos jogos", type=["csv"], accept_multiple_files=True, key="arquivos_resultados")
+        if st.button("📥 Importar resultados"):
+            try:
+                if arquivos_resultados:
+                    df_resultados = pd.concat([calibracao.ler_resultados(arquivo) for arquivo in arquivos_resultados], ignore_index=True)
+                else:
+                    df_resultados = calibracao.ler_resultados(PASTA_RESULTADOS) if os.path.isdir(PASTA_RESULTADOS) else pd.DataFrame(columns=calibracao.COLUNAS_RESULTADOS)
+                if calibracao.importar_resultados(df_resultados) is None:
+                    st.info("Nenhum resultado para importar.")
+                else:
+                    # Os placares também alimentam a forma recente dos times
+                    forma.importar_jogos(forma.jogos_de_resultados(df_resultados))
+                    # Resultados novos liquidam as apostas abertas na hora
+                    liquidar_apostas(f"✅ {len(df_resultados)} resultados importados · ")
+            except (ValueError, KeyError) as erro:
+                st.error(f"Arquivo de resultados inválido: {erro}")
+
+        agregados_calibracao = obter_agregados_calibracao()
+        agregados_calibracao.sincronizar()
+        total_calibracao = agregados_calibracao.resumo("total")
+        if len(total_calibracao):
+            col_previsoes, col_brier, col_rps = st.columns(3)
+            col_previsoes.metric("Previsões", int(total_calibracao["Previsões"].iloc[0]))
+            col_brier.metric("Brier", f"{total_calibracao['Brier'].iloc[0]:.3f}")
+            col_rps.metric("RPS", f"{total_calibracao['RPS'].iloc[0]:.3f}")
+            dimensoes_calibracao = [d for d in calibracao.DIMENSOES if d != "total"]
+            dimensao_calibracao = st.radio(
+                "Agrupar por", dimensoes_calibracao, format_func=calibracao.DIMENSOES.get, horizontal=True, key="dimensao_calibracao"
+            )
+            st.dataframe(agregados_calibracao.resumo(dimensao_calibracao), use_container_width=True, hide_index=True)
+
+            grupo_calibracao = st.selectbox(
+                "Diagrama de confiabilidade",
+                [None] + agregados_calibracao.grupos(dimensao_calibracao),
+                format_func=lambda grupo: calibracao.DIMENSOES["total"] if grupo is None else grupo
+            )
+            if grupo_calibracao is None:
+                df_confiabilidade = agregados_calibracao.confiabilidade("total", calibracao.DIMENSOES["total"])
+            else:
+                df_confiabilidade = agregados_calibracao.confiabilidade(dimensao_calibracao, grupo_calibracao)
+            fig_confiabilidade = px.line(
+                df_confiabilidade, x="Prevista (%)", y="Observada (%)", color="Resultado",
+                markers=True, hover_data=["Faixa (%)", "Previsões"]
+            )
+            # Diagonal: previsão perfeitamente calibrada
+            fig_confiabilidade.add_shape(type="line", x0=0, y0=0, x1=100, y1=100, line=dict(dash="dot", color="gray"))
+            fig_confiabilidade.update_layout(height=300, margin=dict(t=20, b=20), legend=dict(orientation="h"))
+            st.plotly_chart(fig_confiabilidade, use_container_width=True)
+        else:
+            st.info("Nenhuma previsão com resultado ainda.")
+
+
+def _painel_eventos():
+    # Dados de evento: xG, chutes e posse por time, lidos em fluxo e em paralelo
+    import caracteristicas
+    time_casa, time_fora = st.session_state.time_casa, st.session_state.time_fora
+    if armazenamento.pa is None:
+        st.info("Instale o pacote 'pyarrow' para guardar as características dos times.")
+    else:
+        st.markdown(
+            f"<small>Arquivos JSON/JSONL de eventos por partida (StatsBomb ou tipo/time/xg/gol) em {caracteristicas.PASTA_EVENTOS}</small>",
+            unsafe_allow_html=True
+        )
+        if st.button("📥 Ingerir eventos"):
+            try:
+                with st.spinner("Lendo os arquivos de eventos..."):
+                    n_arquivos, n_linhas = caracteristicas.ingerir()
+                if n_arquivos:
+                    st.success(f"✅ {n_arquivos} arquivo(s) lido(s), {n_linhas} linha(s) de partida/time gravadas")
+                else:
+                    st.info("Nenhum arquivo de eventos novo.")
+            except (ValueError, KeyError, OSError) as erro:
+                st.error(f"Arquivo de eventos inválido: {erro}")
+        df_times = tabela_caracteristicas(tuple(armazenamento.arquivos_tabela("caracteristicas", armazenamento.PASTA_HISTORICO)))
+        if len(df_times):
+            destaque = df_times[df_times["Time"].isin([time_casa, time_fora])]
+            if len(destaque) and not st.checkbox("Mostrar todos os times", key="todos_times_eventos"):
+                df_times = destaque
+            st.dataframe(df_times, use_container_width=True, hide_index=True)
+        else:
+            st.info("Nenhuma característica de time ingerida ainda.")
+
+
+def _painel_forma():
+    # Forma recente: últimos jogos de cada time em buffers circulares, no geral e por mando
+    import forma
+    time_casa, time_fora = st.session_state.time_casa, st.session_state.time_fora
+    if armazenamento.pa is None:
+        st.info("Instale o pacote 'pyarrow' para acompanhar a forma dos times.")
+    else:
+        st.markdown(
+            f"<small>CSV com colunas: {', '.join(forma.COLUNAS_JOGOS)} e, opcionalmente, {', '.join(forma.COLUNAS_XG)} "
+            f"(ou arquivos em {forma.PASTA_JOGOS}); os resultados importados em 🎯 Calibração também entram</small>",
+            unsafe_allow_html=True
+        )
+        arquivos_jogos = st.file_uploader("Histórico de jogos", type=["csv"], accept_multiple_files=True, key="arquivos_jogos")
+        if st.button("📥 Importar histórico de jogos"):
+            try:
+                if arquivos_jogos:
+                    df_jogos = pd.concat([forma.ler_jogos(arquivo) for arquivo in arquivos_jogos], ignore_index=True)
+                else:
+                    df_jogos = forma.ler_jogos(forma.PASTA_JOGOS) if os.path.isdir(forma.PASTA_JOGOS) else pd.DataFrame(columns=forma.COLUNAS_JOGOS)
+                if forma.importar_jogos(df_jogos) is None:
+                    st.info("Nenhum jogo para importar.")
+                else:
+                    st.success(f"✅ {len(df_jogos)} jogo(s) importado(s)")
+            except (ValueError, KeyError) as erro:
+                st.error(f"Arquivo de jogos inválido: {erro}")
+
+        motor_forma = motor_forma_atual()
+        if len(motor_forma):
+            janela_forma = st.slider("Últimos jogos", 1, forma.CAPACIDADE, forma.JANELA_PADRAO, key="janela_forma")
+            st.dataframe(motor_forma.comparar(time_casa, time_fora, janela_forma), use_container_width=True, hide_index=True)
+        else:
+            st.info("Nenhum jogo no histórico ainda.")
+
+
+def _painel_simulacao():
+    # Simulação do campeonato: o que o jogo atual vale em título, vaga, rebaixamento ou fase
+    import simulacao
+    time_casa, time_fora = st.session_state.time_casa, st.session_state.time_fora
+    formato = st.radio("Formato", ["Liga", "Mata-mata"], horizontal=True, key="formato_simulacao")
+    if formato == "Liga":
+        st.markdown(
+            f"<small>Classificação: {', '.join(simulacao.COLUNAS_TABELA)} e, opcionalmente, saldo e gols_pro. "
+            f"Jogos restantes: {', '.join(simulacao.COLUNAS_RESTANTES)} e, opcionalmente, "
+            f"{', '.join(simulacao.COLUNAS_PROBABILIDADES)} (%)</small>",
+            unsafe_allow_html=True
+        )
+        arquivo_classificacao = st.file_uploader("Classificação atual", type=["csv"], key="arquivo_classificacao")
+        arquivo_restantes = st.file_uploader("Jogos restantes", type=["csv"], key="arquivo_restantes")
+        col_vagas, col_rebaixados = st.columns(2)
+        vagas = col_vagas.number_input("Vagas", min_value=1, value=4, step=1, key="vagas_simulacao")
+        rebaixados = col_rebaixados.number_input("Rebaixados", min_value=0, value=4, step=1, key="rebaixados_simulacao")
+        prontos = arquivo_classificacao is not None and arquivo_restantes is not None
+    else:
+        st.markdown(
+            "<small>Chave: time, na ordem do chaveamento (1º x 2º, 3º x 4º...) e, opcionalmente, forca (Elo)</small>",
+            unsafe_allow_html=True
+        )
+        arquivo_chave = st.file_uploader("Chaveamento", type=["csv"], key="arquivo_chave")
+        prontos = arquivo_chave is not None
+    n_simulacoes = st.select_slider(
+        "Simulações", [20_000, 50_000, 100_000, 200_000, 500_000], value=simulacao.N_SIMULACOES,
+        format_func=lambda n: f"{n:,}".replace(",", "."), key="n_simulacoes"
+    )
+    if st.button("▶️ Simular campeonato", disabled=not prontos):
+        # O jogo atual entra com as probabilidades das odds, sem depender do checklist
+        probs_jogo = probabilidades_mercado(st.session_state.odd_vitoria, st.session_state.odd_empate, st.session_state.odd_derrota)
+        probs_jogo = probs_jogo if sum(probs_jogo) > 0 else None
+        try:
+            with st.spinner("Simulando os jogos restantes..."):
+                if formato == "Liga":
+                    modelo = simulacao.modelo_liga(
+                        pd.read_csv(arquivo_classificacao), pd.read_csv(arquivo_restantes), (time_casa, time_fora), probs_jogo
+                    )
+                    contagem = simulacao.simular_liga(modelo, n_simulacoes)
+                    df_resumo = simulacao.resumo_liga(contagem, modelo["times"], vagas, rebaixados)
+                    objetivos, nomes = simulacao.objetivos_liga(contagem, vagas, rebaixados), simulacao.NOMES_LIGA
+                else:
+                    modelo = simulacao.modelo_mata_mata(pd.read_csv(arquivo_chave), (time_casa, time_fora), probs_jogo)
+                    contagem = simulacao.simular_mata_mata(modelo, n_simulacoes)
+                    df_resumo = simulacao.resumo_mata_mata(contagem, modelo["times"])
+                    objetivos, nomes = simulacao.objetivos_mata_mata(contagem), simulacao.nomes_mata_mata(len(modelo["times"]))
+            st.session_state.simulacao = {"resumo": df_resumo, "jogo": (time_casa, time_fora), "impacto": None}
+            if modelo["foco"] >= 0:
+                df_impacto, em_jogo = simulacao.impacto(objetivos, contagem, modelo["times"], (time_casa, time_fora), nomes)
+                st.session_state.simulacao["impacto"] = df_impacto
+                # Alimenta a regra "importancia" do checklist para este jogo
+                st.session_state.setdefault("importancia_simulada", {})[(time_casa, time_fora)] = (em_jogo[time_casa], em_jogo[time_fora])
+        except (ValueError, KeyError) as erro:
+            st.error(f"Arquivo de simulação inválido: {erro}")
+
+    if 'simulacao' in st.session_state:
+        resultado = st.session_state.simulacao
+        st.dataframe(resultado["resumo"], use_container_width=True, hide_index=True)
+        casa_simulada, fora_simulada = resultado["jogo"]
+        if resultado["impacto"] is None:
+            st.info(f"{casa_simulada} x {fora_simulada} não está entre os jogos simulados.")
+        else:
+            st.markdown(f"**{casa_simulada} x {fora_simulada}: chances por resultado**")
+            st.dataframe(resultado["impacto"], use_container_width=True, hide_index=True)
+            em_jogo = st.session_state.importancia_simulada[resultado["jogo"]]
+            st.caption(f"Em jogo: {casa_simulada} {em_jogo[0]:.1f} p.p. x {fora_simulada} {em_jogo[1]:.1f} p.p.")
+
+
+def _painel_banca():
+    # Banca: livro-caixa das apostas registradas e liquidação em lote
+    if armazenamento.pa is None:
+        st.info("Instale o pacote 'pyarrow' para acompanhar a banca.")
+    else:
+        saldo_livro, abertas, extrato = resumo_banca(
+            tuple(armazenamento.arquivos_tabela("banca", armazenamento.PASTA_HISTORICO)),
+            tuple(armazenamento.arquivos_tabela("apostas", armazenamento.PASTA_HISTORICO)),
+            st.session_state.analista
+        )
+        if saldo_livro is None:
+            st.info("Registre uma aposta no relatório para abrir o livro-caixa.")
+        else:
+            col_saldo, col_abertas = st.columns(2)
+            col_saldo.metric("Saldo", f"R$ {saldo_livro:.2f}")
+            col_abertas.metric("Em aberto", f"{len(abertas)} · R$ {abertas['stake'].sum():.2f}")
+            if st.button("⚖️ Liquidar apostas"):
+                liquidar_apostas()
+            st.dataframe(extrato[["data", "tipo", "valor", "id_aposta"]], use_container_width=True, hide_index=True)
+        st.markdown("<small>Os resultados vêm da importação em 🎯 Calibração das Previsões.</small>", unsafe_allow_html=True)
+
+
+def _painel_surebets():
+    # Surebets e melhores preços entre várias casas de apostas
+    from grade import exibir_grade
+    from surebet import COLUNAS_ODDS, melhores_precos
+    time_casa, time_fora = st.session_state.time_casa, st.session_state.time_fora
+    st.markdown(f"<small>CSV com colunas: {', '.join(COLUNAS_ODDS)} (ou arquivos em {PASTA_ODDS})</small>", unsafe_allow_html=True)
+    arquivos_odds = st.file_uploader("Odds das casas", type=["csv"], accept_multiple_files=True)
+    conteudos = tuple(arquivo.getvalue() for arquivo in arquivos_odds or [])
+    try:
+        tensor_odds, partidas_odds, casas_odds = carregar_tensor_odds(conteudos)
+    except (ValueError, KeyError) as erro:
+        st.error(f"Arquivo de odds inválido: {erro}")
+        tensor_odds, partidas_odds, casas_odds = None, [], []
+
+    if partidas_odds:
+        obter_series_odds().inserir_tensor(tensor_odds, partidas_odds, casas_odds)
+        st.markdown(f"**{len(partidas_odds)}** jogos x **{len(casas_odds)}** casas")
+        grade = grade_surebets(conteudos, float(st.session_state.banca))
+        if grade is not None:
+            st.success(f"💎 {len(grade.df)} surebet(s) encontrada(s)")
+            exibir_grade(grade, "grade_surebets")
+        else:
+            st.info("Nenhuma surebet nas odds carregadas.")
+
+        jogo_atual = f"{time_casa} x {time_fora}"
+        if jogo_atual in partidas_odds:
+            melhor, _ = melhores_precos(tensor_odds[[partidas_odds.index(jogo_atual)]])
+            if not np.isnan(melhor).any() and st.button("🏷️ Usar melhores odds deste jogo"):
+                st.session_state.odds_pendentes = {
+                    "odd_vitoria": float(melhor[0, 0]),
+                    "odd_empate": float(melhor[0, 1]),
+                    "odd_derrota": float(melhor[0, 2])
+                }
+                st.rerun()
+
+
+def exibir(fatores_por_questionario):
+    # Retorna se o modo rodada (vários jogos) está ligado
+    time_casa, time_fora = st.session_state.time_casa, st.session_state.time_fora
+
+    st.sidebar.text_input("👤 Analista", key="analista")
+    if 'aviso_banca' in st.session_state:
+        st.sidebar.success(st.session_state.pop('aviso_banca'))
+
+    _sob_demanda("📚 Histórico de Análises", "historico", _painel_historico)
+    _sob_demanda("📉 Closing Line Value (CLV)", "clv", _painel_clv)
+    _sob_demanda("🎯 Calibração das Previsões", "calibracao", _painel_calibracao)
+    _sob_demanda("📡 Dados de Evento dos Times", "eventos", _painel_eventos)
+    _sob_demanda("📈 Forma Recente", "forma", _painel_forma)
+    with st.sidebar.expander("🏆 Simulação de Liga / Mata-mata"):
+        _painel_simulacao()
+    _sob_demanda("💰 Banca e Liquidação", "banca", _painel_banca)
+
+    # Snapshot da análise: mantido na URL para sobreviver a reconexões do navegador
+    codigo_snapshot = sincronizar_snapshot()
+
+    with st.sidebar.expander("💾 Salvar / Retomar Análise"):
+        if codigo_snapshot is None:
+            st.info("A análise atual não cabe num snapshot (valores fora do formato).")
+        else:
+            st.code(f"?s={codigo_snapshot}", language=None)
+            st.download_button(
+                "📥 Baixar Snapshot",
+                data=(codigo_snapshot + "\n").encode("ascii"),
+                file_name=f"analise_{time_casa}_x_{time_fora}.snap".replace(" ", "_"),
+                mime="text/plain"
+            )
+        arquivo_snapshot = st.file_uploader("Retomar de arquivo .snap", type=["snap", "txt"])
+        if arquivo_snapshot is not None and st.session_state.get("snapshot_arquivo") != arquivo_snapshot.file_id:
+            st.session_state.snapshot_arquivo = arquivo_snapshot.file_id
+            try:
+                codigo_arquivo = arquivo_snapshot.getvalue().decode("ascii").strip()
+                st.session_state.snapshot_pendente = decodificar_snapshot(codigo_arquivo, fatores_por_questionario)
+                st.rerun()
+            except (ValueError, UnicodeDecodeError) as erro:
+                st.error(f"Snapshot inválido: {erro}")
+
+    _sob_demanda("🔎 Surebets entre Casas", "surebets", _painel_surebets)
+
+    # Odds sem margem como prior: as respostas do checklist deslocam o mercado
+    with st.sidebar.expander("🧮 Mercado como Prior (Bayes)"):
+        st.toggle("Combinar análise e mercado", key="usar_bayes")
+        st.slider("Confiança no mercado (%)", 0, 95, step=5, key="peso_mercado", disabled=not st.session_state.usar_bayes)
+        st.markdown(
+            "<small>Parte do resultado final que vem das odds com o checklist completo; "
+            "antes da primeira resposta vale só o mercado.</small>",
+            unsafe_allow_html=True
+        )
+
+    return st.sidebar.toggle("🗂️ Modo Rodada (vários jogos)", key="modo_rodada")
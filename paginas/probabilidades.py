@@ -0,0 +1,66 @@
+# === Probabilidades e odds justas (fase 3, primeira tela) ===
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from nucleo import probabilidades_mercado
+from paginas.comum import figura_comparativo
+from sessao import desfazer_resposta, obter_series_odds, odds_justas, posterior_atual, peso_respondido, probabilidades_atuais
+from surebet import RESULTADOS
+
+
+def exibir():
+    time_casa, time_fora = st.session_state.time_casa, st.session_state.time_fora
+    odd_vitoria, odd_empate, odd_derrota = st.session_state.odd_vitoria, st.session_state.odd_empate, st.session_state.odd_derrota
+    saldo_casa, saldo_fora, (vitoria, empate, derrota) = probabilidades_atuais()
+    justas = odds_justas(vitoria, empate, derrota)
+
+    st.subheader("📊 Probabilidades e Odds Justas")
+
+    df_prob = pd.DataFrame({
+        "Resultado": [
+            f"Vitória {time_casa} 🏠",
+            "Empate 🤝",
+            f"Vitória {time_fora} 🛫"
+        ],
+        "Probabilidade (%)": [vitoria, empate, derrota],
+        "Odd Justa": [justas["Vitória"], justas["Empate"], justas["Derrota"]],
+        "Odd Mercado": [odd_vitoria, odd_empate, odd_derrota]
+    })
+    if st.session_state.usar_bayes:
+        # Desvio padrão do posterior: o quanto a estimativa ainda é incerta
+        df_prob["Desvio (± p.p.)"] = posterior_atual(saldo_casa, saldo_fora, peso_respondido(None))["desvio"].round(1)
+    st.dataframe(df_prob, use_container_width=True)
+
+    # Movimento das odds do jogo desde o início da análise (buffers em memória)
+    series_odds = obter_series_odds()
+    jogo_atual = f"{time_casa} x {time_fora}"
+    movimento = series_odds.movimento_desde(jogo_atual, st.session_state.get("inicio_analise"))
+    extras = {}
+    if movimento is not None and movimento["Odd agora"].notna().all():
+        inverso_agora = 1 / movimento["Odd agora"].to_numpy()
+        extras["Mercado agora"] = list((inverso_agora / inverso_agora.sum() * 100).round(1))
+
+    # Gráfico comparativo
+    labels = [f"{time_casa} 🏠", "Empate 🤝", f"{time_fora} 🛫"]
+    fig = figura_comparativo(
+        labels, [vitoria, empate, derrota], probabilidades_mercado(odd_vitoria, odd_empate, odd_derrota),
+        "📊 Comparativo: Sua Análise x Mercado", extras
+    )
+    fig.update_layout(height=400)
+    st.plotly_chart(fig, use_container_width=True)
+
+    if movimento is not None:
+        st.markdown("### 📈 Movimento das Odds desde a Análise")
+        st.dataframe(movimento, use_container_width=True)
+        df_cotacoes = series_odds.cotacoes(jogo_atual)
+        df_cotacoes["resultado"] = df_cotacoes["resultado"].map(dict(enumerate(RESULTADOS)))
+        fig_movimento = px.line(df_cotacoes, x="data", y="odd", color="resultado", line_dash="casa_aposta", markers=True)
+        fig_movimento.update_layout(title="📈 Odds por casa ao longo do tempo", height=350)
+        st.plotly_chart(fig_movimento, use_container_width=True)
+
+    col_voltar, col_proximo = st.columns([1, 5])
+    col_voltar.button("↩️ Voltar ao checklist", on_click=desfazer_resposta)
+    if col_proximo.button("➡️ Próximo"):
+        st.session_state.subfase_kelly = 1
+        st.rerun()
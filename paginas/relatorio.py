@@ -0,0 +1,143 @@
+# === Relatório do mercado escolhido, exportação e histórico ===
+from datetime import datetime
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import armazenamento
+import liquidacao
+from nucleo import MERCADOS
+from sessao import nova_analise
+
+
+def export_df_to_excel(df):
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+        df.to_excel(writer, index=False, sheet_name='Analise')
+    return output.getvalue()
+
+
+def gerar_relatorio_aposta(analise, anotacoes=""):
+    time_casa, time_fora = st.session_state.time_casa, st.session_state.time_fora
+    agora = datetime.now().strftime("%d/%m/%Y %H:%M")
+    relatorio = f"""📄 Relatório de Aposta - {agora}
+===============================
+🆚 Jogo: {time_casa} x {time_fora}
+🎯 Mercado Escolhido: {analise["mercado"]}
+
+✅ Probabilidades Estimadas:
+- Vitória {time_casa}: {analise["vitoria"]:.1f}%
+- Empate: {analise["empate"]:.1f}%
+- Vitória {time_fora}: {analise["derrota"]:.1f}%
+
+📊 Odds:
+- Odd de Mercado: {st.session_state.odd_vitoria}
+- Odd Justa: {analise["odds_justas"]["Vitória"]}
+
+💰 Stake Kelly sugerida: R$ {analise["stake"]:.2f}
+📈 Valor Esperado (EV): {analise["valor_esperado"]:.2f}
+⚖️ Risco estimado: {analise["risco"] * 100:.1f}%
+
+📌 Observações:
+- Análise feita com base em {len(st.session_state.fatores)} critérios técnicos e táticos.
+- Ferramenta: Analista Esportivo Inteligente
+"""
+    if "linha" in analise:
+        time_lado = time_casa if analise["lado"] == liquidacao.CASA else time_fora
+        odd_linha = analise["odds_handicap"].get(analise["linha"])
+        relatorio += f"\n⚔️ Handicap Asiático: {time_lado} {analise['linha']:+.2f}" + (f" @ {odd_linha:.2f}\n" if odd_linha else "\n")
+    if anotacoes.strip():
+        relatorio += f"\n📝 Anotações do Analista:\n{anotacoes.strip()}\n"
+    return relatorio
+
+
+def exportar_txt(relatorio):
+    return relatorio.encode("utf-8")
+
+
+def exibir(analise):
+    time_casa, time_fora = st.session_state.time_casa, st.session_state.time_fora
+    odd_vitoria, odd_empate, odd_derrota = st.session_state.odd_vitoria, st.session_state.odd_empate, st.session_state.odd_derrota
+    mercado = analise["mercado"]
+
+    st.subheader("📝 Anotações do Analista")
+    anotacoes = st.text_area("Comentários, observações ou insights sobre este jogo:", height=150, key="anotacoes")
+
+    relatorio = gerar_relatorio_aposta(analise, anotacoes)
+    st.success(f"✅ Relatório pronto para: {mercado}")
+    col_txt, col_excel = st.columns(2)
+    col_txt.download_button(
+        "📥 Baixar Relatório TXT",
+        data=exportar_txt(relatorio),
+        file_name=f"relatorio_{mercado.lower().replace(' ', '_')}.txt",
+        mime="text/plain"
+    )
+    df_prob = pd.DataFrame({
+        "Resultado": [f"Vitória {time_casa}", "Empate", f"Vitória {time_fora}"],
+        "Probabilidade (%)": [analise["vitoria"], analise["empate"], analise["derrota"]],
+        "Odd Justa": [analise["odds_justas"]["Vitória"], analise["odds_justas"]["Empate"], analise["odds_justas"]["Derrota"]],
+        "Odd Mercado": [odd_vitoria, odd_empate, odd_derrota]
+    })
+    col_excel.download_button(
+        "📄 Baixar Tabela em Excel",
+        data=export_df_to_excel(df_prob),
+        file_name="analise_apostas.xlsx"
+    )
+
+    if armazenamento.pa is not None and st.button("💾 Salvar no Histórico"):
+        armazenamento.gravar_lote("analises", pd.DataFrame([{
+            "data": pd.Timestamp.now().floor("s"),
+            "analista": st.session_state.analista,
+            "partida": f"{time_casa} x {time_fora}",
+            "time_casa": time_casa,
+            "time_fora": time_fora,
+            "questionario": st.session_state.questionario,
+            "vitoria": analise["vitoria"],
+            "empate": analise["empate"],
+            "derrota": analise["derrota"],
+            "odd_vitoria": odd_vitoria,
+            "odd_empate": odd_empate,
+            "odd_derrota": odd_derrota,
+            "banca": st.session_state.banca,
+            "stake": analise["stake"],
+            "mercado": mercado
+        }]))
+        st.success("✅ Análise salva no histórico")
+
+    # Aposta no livro-caixa: a stake sai da banca agora e o retorno entra na liquidação
+    if armazenamento.pa is not None:
+        st.markdown("### 🎟️ Registrar Aposta")
+        col_odd, col_linha, col_stake = st.columns(3)
+        odd_padrao = liquidacao.odd_mercado(mercado, odd_vitoria, odd_empate, odd_derrota)
+        selecao = analise.get("lado", liquidacao.CASA)
+        if mercado == MERCADOS[1]:
+            # A dupla possibilidade precificada é casa ou empate: a seleção gravada é o resultado que fica de fora
+            selecao = liquidacao.FORA
+        if mercado == MERCADOS[2]:
+            # A linha sugerida é a de melhor EV na escada; a odd vem da escada quando informada
+            time_lado = time_casa if selecao == liquidacao.CASA else time_fora
+            linha = col_linha.selectbox(
+                f"Linha do handicap ({time_lado})", liquidacao.LINHAS_HANDICAP,
+                index=liquidacao.LINHAS_HANDICAP.index(analise.get("linha", liquidacao.LINHA_HANDICAP_PADRAO)),
+                key=f"linha_aposta_{selecao}"
+            )
+            odd_padrao = analise.get("odds_handicap", {}).get(linha, odd_padrao if selecao == liquidacao.CASA else odd_derrota)
+            chave_odd = f"odd_aposta_{mercado}_{selecao}_{linha}"
+        else:
+            linha = np.nan
+            chave_odd = f"odd_aposta_{mercado}"
+        odd_aposta = col_odd.number_input("Odd da aposta", min_value=1.01, step=0.01, key=chave_odd, value=max(1.01, odd_padrao))
+        stake_aposta = col_stake.number_input("Stake (R$)", min_value=0.0, value=round(analise["stake"], 2), step=1.0, key="stake_aposta")
+        if st.button("🎟️ Registrar Aposta", disabled=stake_aposta <= 0):
+            liquidacao.registrar_aposta(
+                f"{time_casa} x {time_fora}", st.session_state.analista, mercado,
+                odd_aposta, stake_aposta, st.session_state.banca, selecao=selecao, linha=linha
+            )
+            st.session_state.banca_pendente = liquidacao.saldo(st.session_state.analista)
+            st.session_state.aviso_banca = f"🎟️ Aposta registrada: R$ {stake_aposta:.2f} em {mercado} @ {odd_aposta:.2f}"
+            st.rerun()
+
+    st.markdown("---")
+    st.button("🔁 Nova Análise", on_click=nova_analise)
@@ -0,0 +1,162 @@
+# === Rodada: workspace com vários jogos ===
+import pandas as pd
+import streamlit as st
+
+from grade import GradeResultados, exibir_grade
+from nucleo import CASA, FORA, NENHUM
+from regras import IndiceCaracteristicas, checklist_lote
+from sessao import motor_forma_atual, obter_indice_caracteristicas, obter_questionarios
+from workspace import concluida, nova_partida, reiniciar, responder, responder_com_codigos, resumo_partidas
+
+COLUNAS_LOTE = ["time_casa", "time_fora"]
+
+
+def indice_atual():
+    indice = obter_indice_caracteristicas()
+    return IndiceCaracteristicas() if indice is None else indice
+
+
+def adicionar_partida():
+    questionarios, _ = obter_questionarios()
+    pid = st.session_state.proximo_id_partida
+    st.session_state.proximo_id_partida += 1
+    qid = st.session_state.questionario_rodada
+    st.session_state.workspace[pid] = nova_partida(
+        pid,
+        st.session_state.time_casa,
+        st.session_state.time_fora,
+        (st.session_state.odd_vitoria, st.session_state.odd_empate, st.session_state.odd_derrota),
+        qid,
+        questionarios[qid]["fatores"]
+    )
+    st.session_state.partida_ativa = pid
+
+
+def remover_partida():
+    st.session_state.workspace.pop(st.session_state.partida_ativa, None)
+    st.session_state.partida_ativa = next(iter(st.session_state.workspace), None)
+
+
+def responder_partida(pid, etapa_partida):
+    responder(st.session_state.workspace[pid], st.session_state[f"rodada_{pid}_{etapa_partida}"])
+
+
+def responder_rodada_com_dados():
+    # Todos os jogos do workspace de uma vez, um lote por questionário
+    questionarios, _ = obter_questionarios()
+    indice = indice_atual()
+    motor = motor_forma_atual()
+    partidas = list(st.session_state.workspace.values())
+    for qid in {partida["questionario"] for partida in partidas}:
+        grupo = [partida for partida in partidas if partida["questionario"] == qid]
+        codigos, _ = indice.responder(
+            [partida["time_casa"] for partida in grupo], [partida["time_fora"] for partida in grupo], questionarios[qid]["regras"], motor,
+            st.session_state.get("importancia_simulada")
+        )
+        for partida, codigos_partida in zip(grupo, codigos):
+            responder_com_codigos(partida, codigos_partida)
+
+
+# Só o fragmento do jogo ativo reexecuta a cada clique: cabeçalho, entradas e
+# os demais jogos do workspace não são recalculados nem reenviados
+@st.fragment
+def checklist_partida(pid):
+    partida = st.session_state.workspace.get(pid)
+    if partida is None:
+        return
+    questionarios, _ = obter_questionarios()
+    tabela_partida = questionarios[partida["questionario"]]["tabela"]
+    casa, fora = partida["time_casa"], partida["time_fora"]
+    etapa_partida, total_fatores = partida["etapa"], len(partida["fatores"])
+    vitoria_p, empate_p, derrota_p = tabela_partida.pontuar(partida["saldo_casa"], partida["saldo_fora"])
+
+    st.markdown(f"#### ⚽ {casa} x {fora}")
+    col_pergunta, col_placar = st.columns([2, 1])
+    with col_pergunta:
+        if not concluida(partida):
+            pergunta, _ = partida["fatores"][etapa_partida]
+            st.markdown(f"**{etapa_partida + 1}/{total_fatores}** - {pergunta}")
+            nomes = {NENHUM: "Nenhum", CASA: casa, FORA: fora}
+            st.radio(
+                "Quem leva vantagem?",
+                [NENHUM, CASA, FORA],
+                format_func=nomes.get,
+                key=f"rodada_{pid}_{etapa_partida}"
+            )
+            st.button("Próxima", key=f"rodada_btn_{pid}_{etapa_partida}",
+                      on_click=responder_partida, args=(pid, etapa_partida))
+        else:
+            st.success("✅ Checklist concluído")
+            st.button("🔁 Reiniciar este jogo", key=f"rodada_reiniciar_{pid}",
+                      on_click=reiniciar, args=(partida,))
+        st.progress(etapa_partida / total_fatores)
+
+    with col_placar:
+        st.metric(f"Vitória {casa}", f"{vitoria_p:.1f}%")
+        st.metric("Empate", f"{empate_p:.1f}%")
+        st.metric(f"Vitória {fora}", f"{derrota_p:.1f}%")
+        st.metric("Valor Esperado (EV)", f"{vitoria_p / 100 * partida['odds'][0] - 1:.2f}")
+
+
+def exibir():
+    questionarios, _ = obter_questionarios()
+    st.subheader("🗂️ Workspace da Rodada")
+    col_questionario, col_adicionar = st.columns([3, 1])
+    with col_questionario:
+        st.selectbox(
+            "Questionário do novo jogo",
+            list(questionarios),
+            format_func=lambda qid: questionarios[qid]["nome"],
+            key="questionario_rodada"
+        )
+    with col_adicionar:
+        st.button("➕ Adicionar jogo (dados acima)", on_click=adicionar_partida)
+
+    if st.session_state.workspace:
+        st.radio(
+            "Jogo ativo",
+            list(st.session_state.workspace),
+            format_func=lambda pid: "{time_casa} x {time_fora}".format(**st.session_state.workspace[pid]),
+            horizontal=True,
+            key="partida_ativa"
+        )
+        checklist_partida(st.session_state.partida_ativa)
+
+        with st.expander("📋 Resumo da Rodada"):
+            tabelas = {qid: q["tabela"] for qid, q in questionarios.items()}
+            exibir_grade(GradeResultados(resumo_partidas(st.session_state.workspace.values(), tabelas)), "grade_rodada")
+        col_remover, col_dados = st.columns(2)
+        col_remover.button("🗑️ Remover jogo ativo", on_click=remover_partida)
+        col_dados.button("🤖 Responder todos os jogos com os dados", on_click=responder_rodada_com_dados,
+                         help="Completa o checklist de cada jogo; perguntas sem dados ficam como \"Nenhum\"")
+    else:
+        st.info("Preencha os times e odds acima e adicione os jogos da rodada.")
+
+    # Lote de jogos (CSV) respondido inteiro pelos dados dos times, sem passar pelo workspace
+    with st.expander("🤖 Checklist Automático em Lote"):
+        st.markdown(
+            f"<small>CSV com colunas: {', '.join(COLUNAS_LOTE)}. Perguntas sem dados contam como \"Nenhum\"; "
+            f"usa o questionário do novo jogo.</small>",
+            unsafe_allow_html=True
+        )
+        arquivo_lote = st.file_uploader("Jogos", type=["csv"], key="arquivo_lote_checklist")
+        if arquivo_lote is not None:
+            try:
+                jogos = pd.read_csv(arquivo_lote, usecols=COLUNAS_LOTE).dropna()
+            except ValueError as erro:
+                st.error(f"Arquivo de jogos inválido: {erro}")
+            else:
+                questionario = questionarios[st.session_state.questionario_rodada]
+                df_lote = checklist_lote(
+                    indice_atual(), jogos["time_casa"].astype(str).to_numpy(), jogos["time_fora"].astype(str).to_numpy(),
+                    questionario["regras"], questionario["tabela"], motor_forma_atual(),
+                    st.session_state.get("importancia_simulada")
+                )
+                df_lote["Respondidas"] = df_lote["Respondidas"].astype(str) + f"/{len(questionario['fatores'])}"
+                exibir_grade(GradeResultados(df_lote), "grade_lote_checklist")
+                st.download_button(
+                    "📥 Baixar Lote (CSV)",
+                    data=df_lote.to_csv(index=False).encode("utf-8"),
+                    file_name="checklist_lote.csv",
+                    mime="text/csv"
+                )
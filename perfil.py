@@ -0,0 +1,144 @@
+# === Perfil de uma execução do app (?profile=1) ===
+# Com ?profile=1 na URL, a próxima execução do script é medida com pyinstrument
+# (amostragem) quando instalado, ou com cProfile; o parâmetro sai da URL na hora, então
+# só essa execução é medida. No fim da página aparecem as funções mais caras,
+# um dump em formato "collapsed stacks" (flamegraph.pl, speedscope, inferno) e o
+# arquivo bruto para download.
+import cProfile
+import io
+import marshal
+import pstats
+import time
+
+import pandas as pd
+import streamlit as st
+
+try:
+    from pyinstrument import Profiler as _Amostrador
+    from pyinstrument.renderers import SpeedscopeRenderer
+except ImportError:
+    _Amostrador = None
+
+N_FUNCOES = 25
+_PROFUNDIDADE_MAXIMA = 64
+# Ramos abaixo disso (em segundos) são podados: sem a poda, o número de caminhos
+# chamador -> chamado cresce exponencialmente num perfil do app inteiro
+_TEMPO_MINIMO = 1e-4
+
+
+def iniciar_perfil():
+    if st.query_params.get("profile") != "1":
+        return None
+    # Um perfil por pedido: os reruns seguintes rodam sem medidor
+    del st.query_params["profile"]
+    if _Amostrador is not None:
+        perfil = _Amostrador()
+        perfil.start()
+    else:
+        perfil = cProfile.Profile()
+        perfil.enable()
+    return {"perfil": perfil, "inicio": time.perf_counter()}
+
+
+def _nome(funcao):
+    arquivo, linha, nome = funcao
+    return f"{nome} ({arquivo.rsplit('/', 1)[-1]}:{linha})" if linha else nome
+
+
+def tabela_funcoes(estatisticas, n=N_FUNCOES):
+    linhas = [
+        {
+            "Função": _nome(funcao),
+            "Chamadas": nc,
+            "Tempo próprio (ms)": round(tt * 1000, 2),
+            "Tempo acumulado (ms)": round(ct * 1000, 2),
+        }
+        for funcao, (cc, nc, tt, ct, _) in estatisticas.stats.items()
+    ]
+    df = pd.DataFrame(linhas, columns=["Função", "Chamadas", "Tempo próprio (ms)", "Tempo acumulado (ms)"])
+    return df.sort_values("Tempo acumulado (ms)", ascending=False).head(n).reset_index(drop=True)
+
+
+def pilhas_colapsadas(estatisticas):
+    # O cProfile guarda só arestas chamador -> chamado; as pilhas são reconstruídas
+    # descendo a partir das raízes e repartindo o tempo de cada chamado conforme o
+    # tempo acumulado vindo de cada chamador (mesma aproximação do flameprof)
+    chamados = {}
+    for funcao, (_, _, _, _, chamadores) in estatisticas.stats.items():
+        for chamador, (_, _, _, ct) in chamadores.items():
+            chamados.setdefault(chamador, []).append((funcao, ct))
+    raizes = [f for f, (_, _, _, _, chamadores) in estatisticas.stats.items() if not chamadores]
+
+    linhas = []
+
+    def descer(funcao, pilha, fracao):
+        _, _, tt, ct, _ = estatisticas.stats[funcao]
+        if ct * fracao < _TEMPO_MINIMO or len(pilha) >= _PROFUNDIDADE_MAXIMA:
+            return
+        pilha = pilha + [_nome(funcao).replace(";", ",")]
+        proprio = round(tt * fracao * 1e6)
+        if proprio > 0:
+            linhas.append(f"{';'.join(pilha)} {proprio}")
+        for chamado, ct_chamado in chamados.get(funcao, []):
+            if _nome(chamado).replace(";", ",") in pilha:
+                continue
+            descer(chamado, pilha, fracao * ct_chamado / estatisticas.stats[chamado][3]
+                   if estatisticas.stats[chamado][3] > 0 else 0)
+
+    for raiz in raizes:
+        descer(raiz, [], 1.0)
+    return "\n".join(linhas) + "\n"
+
+
+def parar_perfil(medicao):
+    # Para o medidor e monta o relatório; roda num finally, então também quando
+    # st.rerun()/st.stop() interrompem o script (o medidor nunca fica ligado)
+    if medicao is None:
+        return None
+    perfil = medicao["perfil"]
+    relatorio = {"duracao": (time.perf_counter() - medicao["inicio"]) * 1000}
+    if _Amostrador is not None:
+        perfil.stop()
+        relatorio["texto"] = perfil.output_text(unicode=True, color=False, show_all=False)
+        relatorio["html"] = perfil.output_html()
+        relatorio["speedscope"] = perfil.output(SpeedscopeRenderer())
+        return relatorio
+
+    perfil.disable()
+    estatisticas = pstats.Stats(perfil, stream=io.StringIO())
+    relatorio["funcoes"] = tabela_funcoes(estatisticas)
+    relatorio["colapsadas"] = pilhas_colapsadas(estatisticas)
+    relatorio["pstats"] = marshal.dumps(estatisticas.stats)
+    return relatorio
+
+
+def finalizar_perfil(relatorio, concluida=True):
+    # Execução interrompida por rerun: o relatório aparece no fim da execução seguinte,
+    # que já roda sem medidor
+    if relatorio is not None and not concluida:
+        st.session_state.perfil_interrompido = relatorio
+        return
+    if 'perfil_interrompido' in st.session_state:
+        exibir_perfil(st.session_state.pop('perfil_interrompido'), "execução anterior, interrompida por rerun")
+    if relatorio is not None:
+        exibir_perfil(relatorio, "desta execução")
+
+
+def exibir_perfil(relatorio, titulo):
+    # Os downloads não reexecutam o app: o relatório só existe na execução medida
+    with st.expander(f"⏱️ Perfil {titulo} ({relatorio['duracao']:.0f} ms)", expanded=True):
+        if "texto" in relatorio:
+            st.text(relatorio["texto"])
+            st.download_button("📥 Baixar perfil (HTML)", data=relatorio["html"].encode("utf-8"),
+                               file_name="perfil.html", mime="text/html", key=f"perfil_html_{titulo}", on_click="ignore")
+            st.download_button("📥 Baixar flame graph (speedscope)", data=relatorio["speedscope"].encode("utf-8"),
+                               file_name="perfil.speedscope.json", mime="application/json", key=f"perfil_speedscope_{titulo}",
+                               on_click="ignore")
+            return
+
+        st.dataframe(relatorio["funcoes"], use_container_width=True, hide_index=True)
+        st.download_button("📥 Baixar flame graph (collapsed stacks)", data=relatorio["colapsadas"].encode("utf-8"),
+                           file_name="perfil.folded", mime="text/plain", key=f"perfil_folded_{titulo}", on_click="ignore")
+        st.download_button("📥 Baixar perfil (pstats)", data=relatorio["pstats"],
+                           file_name="perfil.prof", mime="application/octet-stream", key=f"perfil_pstats_{titulo}",
+                           on_click="ignore")
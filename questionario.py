@@ -0,0 +1,164 @@
+# === Questionários versionados e tabelas de pontuação pré-compiladas ===
+# Cada questionário (lista de fatores com pesos inteiros) vem de um arquivo JSON ou
+# YAML em questionarios/. Como os pesos são inteiros, todo par de saldos alcançável
+# (casa, visitante) leva a uma tupla fixa de vitória, empate, derrota e odds justas:
+# as tabelas são montadas uma vez por lista de pesos e compartilhadas pelo processo,
+# então pontuar uma resposta vira uma consulta a array. Cada fator pode trazer a
+# regra que o responde pelas características dos times (ver regras.py).
+import glob
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+
+from nucleo import FATORES_PADRAO
+from regras import REGRAS_PADRAO, regras_padrao, validar_regra
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+VERSAO_QUESTIONARIO = 1
+PASTA_QUESTIONARIOS = "questionarios"
+ID_PADRAO = "padrao"
+PESO_MAXIMO = 20
+# Soma dos pesos: a tabela tem (soma + 1)² células por array
+PESO_TOTAL_MAXIMO = 200
+
+
+class TabelaPontuacao:
+    def __init__(self, pesos):
+        self.pesos = tuple(pesos)
+        n = sum(self.pesos) + 1
+        # Mesma aritmética (e arredondamento) de calcular_probabilidades e calcular_odds
+        # do checklist, para todos os pares de saldos de uma vez
+        saldos = np.arange(n, dtype=float)
+        prob_casa = np.broadcast_to(50 + saldos[:, None], (n, n))
+        prob_fora = np.broadcast_to(50 + saldos[None, :], (n, n))
+        total = prob_casa + prob_fora
+        self.vitoria = np.round(prob_casa / total * 100, 1)
+        self.derrota = np.round(prob_fora / total * 100, 1)
+        self.empate = np.maximum(0, np.round(100 - self.vitoria - self.derrota, 1))
+        with np.errstate(divide="ignore"):
+            self.odd_vitoria, self.odd_empate, self.odd_derrota = (
+                np.where(prob > 0, np.round(1 / (prob / 100), 2), np.inf)
+                for prob in (self.vitoria, self.empate, self.derrota)
+            )
+        for tabela in (self.vitoria, self.empate, self.derrota,
+                       self.odd_vitoria, self.odd_empate, self.odd_derrota):
+            tabela.setflags(write=False)
+
+    def pontuar(self, saldo_casa, saldo_fora):
+        # Aceita inteiros ou arrays de saldos (lotes de análises)
+        if np.ndim(saldo_casa) or np.ndim(saldo_fora):
+            return (self.vitoria[saldo_casa, saldo_fora],
+                    self.empate[saldo_casa, saldo_fora],
+                    self.derrota[saldo_casa, saldo_fora])
+        return (float(self.vitoria[saldo_casa, saldo_fora]),
+                float(self.empate[saldo_casa, saldo_fora]),
+                float(self.derrota[saldo_casa, saldo_fora]))
+
+    def odds_justas(self, saldo_casa, saldo_fora):
+        return {
+            "Vitória": float(self.odd_vitoria[saldo_casa, saldo_fora]),
+            "Empate": float(self.odd_empate[saldo_casa, saldo_fora]),
+            "Derrota": float(self.odd_derrota[saldo_casa, saldo_fora])
+        }
+
+
+@lru_cache(maxsize=64)
+def tabela_pontuacao(pesos):
+    return TabelaPontuacao(pesos)
+
+
+def validar_questionario(dados, origem="questionário"):
+    if not isinstance(dados, dict):
+        raise ValueError(f"{origem}: o conteúdo deve ser um objeto")
+    versao = dados.get("versao")
+    if versao != VERSAO_QUESTIONARIO:
+        raise ValueError(f"{origem}: versão {versao!r} não suportada (esperado {VERSAO_QUESTIONARIO})")
+    identificador = dados.get("id")
+    if not isinstance(identificador, str) or not identificador.strip():
+        raise ValueError(f"{origem}: campo 'id' obrigatório")
+    fatores = dados.get("fatores")
+    if not isinstance(fatores, list) or not fatores:
+        raise ValueError(f"{origem}: 'fatores' deve ser uma lista não vazia")
+    if len(fatores) > 255:
+        raise ValueError(f"{origem}: no máximo 255 fatores")
+
+    validados = []
+    regras = []
+    for i, fator in enumerate(fatores, start=1):
+        if not isinstance(fator, dict):
+            raise ValueError(f"{origem}: fator {i} deve ser um objeto com 'pergunta' e 'peso'")
+        pergunta, peso = fator.get("pergunta"), fator.get("peso")
+        if not isinstance(pergunta, str) or not pergunta.strip():
+            raise ValueError(f"{origem}: fator {i} sem 'pergunta'")
+        if isinstance(peso, bool) or not isinstance(peso, int) or not 1 <= peso <= PESO_MAXIMO:
+            raise ValueError(f"{origem}: fator {i} com peso inválido {peso!r} (inteiro de 1 a {PESO_MAXIMO})")
+        validados.append((pergunta.strip(), peso))
+        if sum(p for _, p in validados) > PESO_TOTAL_MAXIMO:
+            raise ValueError(f"{origem}: a soma dos pesos passa de {PESO_TOTAL_MAXIMO}")
+        # 'regra' liga o fator às características dos times; sem o campo vale a regra
+        # padrão da mesma pergunta e "regra": null desliga a resposta automática
+        if "regra" in fator:
+            regras.append(None if fator["regra"] is None else validar_regra(fator["regra"], f"{origem}: fator {i}"))
+        else:
+            regras.append(validar_regra(REGRAS_PADRAO[pergunta.strip()]) if pergunta.strip() in REGRAS_PADRAO else None)
+
+    return {
+        "id": identificador.strip(),
+        "nome": str(dados.get("nome") or identificador).strip(),
+        "versao": versao,
+        "fatores": validados,
+        "regras": regras,
+    }
+
+
+def ler_questionario(caminho):
+    with open(caminho, "r", encoding="utf-8") as arquivo:
+        if caminho.endswith((".yaml", ".yml")):
+            if yaml is None:
+                raise ValueError(f"{caminho}: instale o pacote 'pyyaml' para ler questionários YAML")
+            try:
+                dados = yaml.safe_load(arquivo)
+            except yaml.YAMLError as erro:
+                raise ValueError(f"{os.path.basename(caminho)}: YAML inválido ({erro})") from erro
+        else:
+            dados = json.load(arquivo)
+    return validar_questionario(dados, origem=os.path.basename(caminho))
+
+
+def carregar_questionarios(pasta=PASTA_QUESTIONARIOS):
+    # Retorna {id: questionário}, sempre com o checklist padrão embutido; os erros de
+    # arquivos inválidos são devolvidos à parte para não derrubar o app
+    questionarios = {
+        ID_PADRAO: {
+            "id": ID_PADRAO,
+            "nome": f"Checklist Completo ({len(FATORES_PADRAO)} critérios)",
+            "versao": VERSAO_QUESTIONARIO,
+            "fatores": list(FATORES_PADRAO),
+            "regras": regras_padrao(FATORES_PADRAO),
+        }
+    }
+    erros = []
+    caminhos = sorted(
+        caminho for extensao in ("json", "yaml", "yml")
+        for caminho in glob.glob(os.path.join(pasta, f"*.{extensao}"))
+    )
+    for caminho in caminhos:
+        try:
+            questionario = ler_questionario(caminho)
+        except (OSError, ValueError) as erro:
+            erros.append(str(erro))
+            continue
+        if questionario["id"] in questionarios:
+            erros.append(f"{os.path.basename(caminho)}: id '{questionario['id']}' repetido")
+            continue
+        questionarios[questionario["id"]] = questionario
+
+    for questionario in questionarios.values():
+        questionario["tabela"] = tabela_pontuacao(tuple(peso for _, peso in questionario["fatores"]))
+    return questionarios, erros
@@ -0,0 +1,177 @@
+# === Regras dos fatores: checklist respondido pelas características dos times ===
+# Cada pergunta pode ter uma regra: compara uma característica (xG, xG contra,
+# posse, saldo de gols...) da casa e do visitante, em média nas últimas N partidas
+# de cada um, e dá vantagem a quem estiver melhor por mais que a margem. As médias
+# de cada janela ficam numa matriz (time x característica) e os times viram
+# índices de linha, então responder milhares de jogos é indexação de array. As
+# características "forma_*" vêm do motor de forma recente (pontos, gols e xG nos
+# buffers circulares), no geral ou no mando de cada time; "importancia" vem da
+# simulação de liga/mata-mata: quanto o resultado do jogo mexe nas chances de cada
+# time (título, classificação, rebaixamento), em pontos percentuais.
+import numpy as np
+import pandas as pd
+
+import forma
+from nucleo import CASA, FORA, NENHUM
+
+SEM_RESPOSTA = -1
+MANDO = "mando"
+IMPORTANCIA = "importancia"
+# Colunas da tabela de características e as derivadas (saldos)
+COLUNAS_BASE = ["xg", "xg_contra", "gols", "gols_contra", "chutes", "chutes_no_alvo", "chutes_contra", "posse", "passes"]
+CARACTERISTICAS_REGRA = COLUNAS_BASE + ["saldo_gols", "saldo_xg"]
+# Características da forma recente e a métrica correspondente do motor
+CARACTERISTICAS_FORMA = {
+    "forma_pontos": "pontos", "forma_gols": "gols_pro", "forma_gols_contra": "gols_contra",
+    "forma_xg": "xg_pro", "forma_xg_contra": "xg_contra",
+}
+NOMES_CARACTERISTICAS = {
+    "forma_pontos": "pontos por jogo", "forma_gols": "gols", "forma_gols_contra": "gols sofridos",
+    "forma_xg": "xG", "forma_xg_contra": "xG sofrido", IMPORTANCIA: "em jogo na simulação (p.p.)",
+    "xg": "xG", "xg_contra": "xG contra", "gols": "gols", "gols_contra": "gols contra",
+    "saldo_gols": "saldo de gols", "saldo_xg": "saldo de xG", "chutes": "chutes",
+    "chutes_no_alvo": "chutes no alvo", "chutes_contra": "chutes contra", "posse": "posse (%)", "passes": "passes",
+}
+JANELA_PADRAO = 10
+
+# Regras do checklist padrão, ligadas pelo texto da pergunta
+REGRAS_PADRAO = {
+    "Quem tem os melhores meias e atacantes?": {"caracteristica": "chutes_no_alvo", "janela": 10, "margem": 0.5},
+    "Quem tem melhor ataque?": {"caracteristica": "xg", "janela": 10, "margem": 0.15},
+    "Quem tem melhor defesa?": {"caracteristica": "xg_contra", "janela": 10, "margem": 0.15, "maior_melhor": False},
+    "Quem tem mais posse de bola durante os jogos?": {"caracteristica": "posse", "janela": 10, "margem": 3},
+    "Quem joga em casa?": {"caracteristica": MANDO},
+    "Quem vem melhor nos últimos 5 jogos?": {"caracteristica": "forma_pontos", "janela": 5, "margem": 0.3},
+    "É jogo de mata-mata, classificação ou liderança?": {"caracteristica": IMPORTANCIA, "margem": 5},
+}
+
+
+def validar_regra(regra, origem="regra"):
+    # Regra normalizada com janela, margem e sentido preenchidos
+    if not isinstance(regra, dict):
+        raise ValueError(f"{origem}: a regra deve ser um objeto com 'caracteristica'")
+    caracteristica = regra.get("caracteristica")
+    if caracteristica not in (MANDO, IMPORTANCIA) and caracteristica not in CARACTERISTICAS_REGRA and caracteristica not in CARACTERISTICAS_FORMA:
+        raise ValueError(f"{origem}: característica {caracteristica!r} desconhecida")
+    janela = regra.get("janela", forma.JANELA_PADRAO if caracteristica in CARACTERISTICAS_FORMA else JANELA_PADRAO)
+    if isinstance(janela, bool) or not isinstance(janela, int) or janela < 1:
+        raise ValueError(f"{origem}: janela inválida {janela!r} (inteiro a partir de 1)")
+    if caracteristica in CARACTERISTICAS_FORMA and janela > forma.CAPACIDADE:
+        raise ValueError(f"{origem}: a forma recente guarda no máximo {forma.CAPACIDADE} jogos por time")
+    margem = regra.get("margem", 0)
+    if isinstance(margem, bool) or not isinstance(margem, (int, float)) or margem < 0:
+        raise ValueError(f"{origem}: margem inválida {margem!r}")
+    return {
+        "caracteristica": caracteristica,
+        "janela": janela,
+        "margem": float(margem),
+        "maior_melhor": bool(regra.get("maior_melhor", True)),
+        # Forma: casa nos jogos em casa e visitante nos jogos fora
+        "por_mando": bool(regra.get("por_mando", False)),
+    }
+
+
+def regras_padrao(fatores):
+    return [validar_regra(REGRAS_PADRAO[pergunta]) if pergunta in REGRAS_PADRAO else None for pergunta, _ in fatores]
+
+
+def descrever_regra(regra):
+    if regra is None:
+        return ""
+    if regra["caracteristica"] == MANDO:
+        return "mando de campo"
+    sentido = "maior" if regra["maior_melhor"] else "menor"
+    if regra["caracteristica"] == IMPORTANCIA:
+        return f"{sentido} {NOMES_CARACTERISTICAS[IMPORTANCIA]}"
+    mando = " no mando" if regra["caracteristica"] in CARACTERISTICAS_FORMA and regra["por_mando"] else ""
+    return f"{sentido} {NOMES_CARACTERISTICAS[regra['caracteristica']]}, últimos {regra['janela']} jogos{mando}"
+
+
+class IndiceCaracteristicas:
+    # Médias por time das últimas N partidas (na ordem de ingestão), uma matriz por janela;
+    # a última linha da matriz é toda NaN e recebe os times sem dados (posição -1)
+    def __init__(self, dados=None):
+        if dados is None:
+            dados = pd.DataFrame(columns=["partida", "time"] + COLUNAS_BASE, dtype=float)
+        dados = dados.drop_duplicates(["partida", "time"], keep="last")
+        self._dados = dados.assign(
+            saldo_gols=dados["gols"] - dados["gols_contra"],
+            saldo_xg=dados["xg"] - dados["xg_contra"],
+        )[["time"] + CARACTERISTICAS_REGRA]
+        self.times = pd.Index(self._dados["time"].unique())
+        self._coluna = {caracteristica: k for k, caracteristica in enumerate(CARACTERISTICAS_REGRA)}
+        self._medias = {}
+
+    def __len__(self):
+        return len(self.times)
+
+    def medias(self, janela):
+        if janela not in self._medias:
+            ultimas = self._dados.groupby("time", sort=False).tail(janela)
+            medias = ultimas.groupby("time")[CARACTERISTICAS_REGRA].mean().reindex(self.times).to_numpy(dtype=float)
+            self._medias[janela] = np.vstack([medias, np.full((1, len(CARACTERISTICAS_REGRA)), np.nan)])
+        return self._medias[janela]
+
+    def posicoes(self, times):
+        return self.times.get_indexer(pd.Index(np.atleast_1d(times)))
+
+    def responder(self, casas, foras, regras, motor_forma=None, importancia=None):
+        # Códigos (jogos, perguntas): CASA, FORA, NENHUM ou SEM_RESPOSTA (sem regra ou sem
+        # dados de algum dos times) e os valores comparados (jogos, perguntas, 2);
+        # importancia: {(casa, fora): (em jogo casa, em jogo fora)} dos jogos simulados
+        pos_casa, pos_fora = self.posicoes(casas), self.posicoes(foras)
+        medias_forma = {}
+        codigos = np.full((len(pos_casa), len(regras)), SEM_RESPOSTA, dtype=np.int8)
+        valores = np.full((len(pos_casa), len(regras), 2), np.nan)
+        for k, regra in enumerate(regras):
+            if regra is None:
+                continue
+            if regra["caracteristica"] == MANDO:
+                codigos[:, k] = CASA
+                continue
+            if regra["caracteristica"] == IMPORTANCIA:
+                simulados = np.array([(importancia or {}).get(jogo, (np.nan, np.nan)) for jogo in zip(np.atleast_1d(casas), np.atleast_1d(foras))], dtype=float)
+                casa, fora = simulados[:, 0], simulados[:, 1]
+            elif regra["caracteristica"] in CARACTERISTICAS_FORMA:
+                if motor_forma is None:
+                    continue
+                chave = (regra["janela"], regra["por_mando"])
+                if chave not in medias_forma:
+                    mandos = ("casa", "fora") if regra["por_mando"] else ("geral", "geral")
+                    medias_forma[chave] = (motor_forma.medias(casas, regra["janela"], mandos[0]),
+                                           motor_forma.medias(foras, regra["janela"], mandos[1]))
+                metrica = forma.METRICAS.index(CARACTERISTICAS_FORMA[regra["caracteristica"]])
+                casa, fora = medias_forma[chave][0][:, metrica], medias_forma[chave][1][:, metrica]
+            else:
+                coluna = self.medias(regra["janela"])[:, self._coluna[regra["caracteristica"]]]
+                casa, fora = coluna[pos_casa], coluna[pos_fora]
+            diferenca = (casa - fora) if regra["maior_melhor"] else (fora - casa)
+            codigos[:, k] = np.select(
+                [np.isnan(diferenca), diferenca > regra["margem"], diferenca < -regra["margem"]],
+                [SEM_RESPOSTA, CASA, FORA], NENHUM
+            )
+            valores[:, k, 0], valores[:, k, 1] = casa, fora
+        return codigos, valores
+
+
+def saldos_lote(codigos, pesos):
+    # Saldos (casa, visitante) de cada jogo; pergunta sem resposta conta como "Nenhum"
+    pesos = np.asarray(pesos)
+    return (codigos == CASA) @ pesos, (codigos == FORA) @ pesos
+
+
+def checklist_lote(indice, casas, foras, regras, tabela, motor_forma=None, importancia=None):
+    # Checklist inteiro de muitos jogos de uma vez: respostas dos dados, saldos e probabilidades
+    codigos, _ = indice.responder(casas, foras, regras, motor_forma, importancia)
+    saldo_casa, saldo_fora = saldos_lote(codigos, tabela.pesos)
+    vitoria, empate, derrota = tabela.pontuar(saldo_casa, saldo_fora)
+    return pd.DataFrame({
+        "Casa": np.atleast_1d(casas),
+        "Visitante": np.atleast_1d(foras),
+        "Respondidas": (codigos != SEM_RESPOSTA).sum(axis=1),
+        "Saldo Casa": saldo_casa,
+        "Saldo Visitante": saldo_fora,
+        "Vitória (%)": vitoria,
+        "Empate (%)": empate,
+        "Derrota (%)": derrota,
+    })
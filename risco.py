@@ -0,0 +1,97 @@
+# === Risco de ruína e drawdown para Kelly fracionário ===
+# Para uma aposta com vantagem (EV) e odd dadas, apostando uma fração do Kelly:
+# crescimento esperado por aposta, risco de ruína, chance de chegar à metade da
+# banca inicial, queda máxima esperada a partir do pico e tempo para dobrar a banca. As fórmulas analíticas usam a aproximação por difusão do
+# log da banca; a simulação confere o resultado num horizonte finito de apostas.
+# Tudo é pré-calculado numa grade (vantagem, odd, fração) guardada em cache, e o
+# painel só consulta a célula mais próxima.
+from functools import lru_cache
+
+import numpy as np
+
+FRACOES = (0.25, 0.5, 0.75, 1.0)
+VANTAGENS = np.round(np.geomspace(0.005, 0.5, 24), 4)
+ODDS = np.round(np.geomspace(1.1, 15, 24), 2)
+LIMITE_RUINA = 0.1
+HORIZONTE = 250
+N_TRAJETORIAS = 256
+
+
+def fracao_aposta(vantagem, odd, fracao):
+    # Kelly da aposta simples: f* = EV / (odd - 1)
+    return np.clip(fracao * np.asarray(vantagem) / (np.asarray(odd) - 1), 0, 0.999)
+
+
+def risco_analitico(vantagem, odd, fracao, limite=LIMITE_RUINA):
+    # Com drift g e variância s² por aposta no log da banca, a chance de um dia cair
+    # a uma fração x da banca *inicial* é x^(2g/s²); com Kelly cheio 2g/s² ~ 1 e, com
+    # uma fração c do Kelly, ~ 2/c - 1. A queda a partir do pico, num horizonte sem
+    # fim e com g > 0, acontece com certeza; ela só sai da simulação (queda_maxima)
+    vantagem, odd = np.asarray(vantagem, dtype=float), np.asarray(odd, dtype=float)
+    p = (1 + vantagem) / odd
+    f = fracao_aposta(vantagem, odd, fracao)
+    ganho, perda = np.log1p(f * (odd - 1)), np.log1p(-f)
+    g = p * ganho + (1 - p) * perda
+    s2 = p * (1 - p) * (ganho - perda) ** 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expoente = np.where((g > 0) & (s2 > 0), 2 * g / s2, 0)
+        return {
+            "fracao_banca": f,
+            "crescimento": g,
+            "ruina": np.where(expoente > 0, limite ** expoente, 1.0),
+            "metade_inicial": np.where(expoente > 0, 0.5 ** expoente, 1.0),
+            "tempo_dobrar": np.where(g > 0, np.log(2) / g, np.inf),
+        }
+
+
+def simular(p, odd, fracoes_banca, limite=LIMITE_RUINA, horizonte=HORIZONTE, uniformes=None):
+    # Trajetórias do log da banca; as mesmas vitórias servem para todas as frações
+    if uniformes is None:
+        uniformes = np.random.default_rng(0).random((N_TRAJETORIAS, horizonte), dtype=np.float32)
+    vitorias = np.cumsum(uniformes < p, axis=1, dtype=np.int32)
+    apostas = np.arange(1, uniformes.shape[1] + 1, dtype=np.int32)
+    f = np.asarray(fracoes_banca, dtype=np.float32)[:, None, None]
+    ganho, perda = np.log1p(f * (odd - 1)), np.log1p(-f)
+    log_banca = vitorias * ganho + (apostas - vitorias) * perda
+    pico = np.maximum(np.maximum.accumulate(log_banca, axis=2), 0)
+    queda = 1 - np.exp(np.min(log_banca - pico, axis=2))
+    dobrou = log_banca >= np.log(2)
+    tempo = np.where(dobrou.any(axis=2), dobrou.argmax(axis=2) + 1, np.inf)
+    return {
+        "ruina_simulada": (log_banca.min(axis=2) <= np.log(limite)).mean(axis=1),
+        "queda_maxima": queda.mean(axis=1),
+        "tempo_dobrar_simulado": np.median(tempo, axis=1),
+    }
+
+
+@lru_cache(maxsize=2)
+def grade_risco(limite=LIMITE_RUINA, horizonte=HORIZONTE):
+    # Arrays (vantagem x odd x fração); células com probabilidade >= 1 ficam NaN
+    v, o, c = np.meshgrid(VANTAGENS, ODDS, FRACOES, indexing="ij")
+    grade = {chave: np.asarray(valor, dtype=float) for chave, valor in risco_analitico(v, o, c, limite).items()}
+    for chave in ("ruina_simulada", "queda_maxima", "tempo_dobrar_simulado"):
+        grade[chave] = np.full(v.shape, np.nan)
+
+    # Números aleatórios comuns a todas as células: a grade fica suave e reprodutível
+    uniformes = np.random.default_rng(0).random((N_TRAJETORIAS, horizonte), dtype=np.float32)
+    for i, vantagem in enumerate(VANTAGENS):
+        for j, odd in enumerate(ODDS):
+            p = (1 + vantagem) / odd
+            if p >= 1:
+                continue
+            simulado = simular(p, odd, grade["fracao_banca"][i, j], limite, horizonte, uniformes)
+            for chave, valor in simulado.items():
+                grade[chave][i, j] = valor
+
+    invalidas = (1 + v) / o >= 1
+    for valor in grade.values():
+        valor[invalidas] = np.nan
+    return grade
+
+
+def consultar_risco(vantagem, odd, limite=LIMITE_RUINA, horizonte=HORIZONTE):
+    # Célula mais próxima (em escala log) para cada fração de Kelly
+    grade = grade_risco(limite, horizonte)
+    i = int(np.abs(np.log(VANTAGENS) - np.log(max(vantagem, VANTAGENS[0]))).argmin())
+    j = int(np.abs(np.log(ODDS) - np.log(max(odd, ODDS[0]))).argmin())
+    return {chave: valor[i, j] for chave, valor in grade.items()}, (VANTAGENS[i], ODDS[j])
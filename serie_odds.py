@@ -0,0 +1,257 @@
+# === Séries temporais de odds em buffers circulares ===
+# Cada série (partida, casa de apostas, resultado) tem um buffer circular de tamanho
+# fixo em arrays NumPy: inserir um lote de cotações é só indexação vetorizada, sem
+# objetos por cotação. Antes de o buffer sobrescrever cotações ainda não gravadas,
+# elas vão para a tabela "odds" do histórico colunar já reamostradas (última odd de
+# cada intervalo). Uma thread de manutenção descarrega os buffers periodicamente e
+# na saída do processo e, de hora em hora, reamostra mais grosso o que passou de
+# IDADE_REAMOSTRAGEM. Ao subir, os buffers são semeados com as cotações gravadas.
+import atexit
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import armazenamento
+from surebet import RESULTADOS
+
+CAPACIDADE = 256
+RESOLUCAO_ARQUIVO = 60
+RESOLUCAO_ANTIGA = 3600
+INTERVALO_DESCARGA = 30
+INTERVALO_REAMOSTRAGEM = 3600
+IDADE_REAMOSTRAGEM = 7 * 24 * 3600
+
+
+def ultimo_por_intervalo(series, tempos, resolucao):
+    # Máscara que mantém só a última cotação de cada (série, intervalo); entrada
+    # ordenada por série e, dentro dela, por tempo
+    intervalo = np.floor(np.asarray(tempos) / resolucao)
+    manter = np.ones(len(intervalo), dtype=bool)
+    manter[:-1] = (series[1:] != series[:-1]) | (intervalo[1:] != intervalo[:-1])
+    return manter
+
+
+class SeriesOdds:
+    def __init__(self, capacidade=CAPACIDADE, pasta=None, resolucao=RESOLUCAO_ARQUIVO):
+        self.capacidade = capacidade
+        self.pasta = pasta
+        self.resolucao = resolucao
+        self._trava = threading.RLock()
+        self._indices = {}
+        self._chaves = []
+        self._por_partida = {}
+        self._tempos = np.zeros((0, capacidade))
+        self._odds = np.zeros((0, capacidade), dtype=np.float32)
+        self._escritas = np.zeros(0, dtype=np.int64)
+        self._gravadas = np.zeros(0, dtype=np.int64)
+        self.lotes_vistos = set()
+        self._parar = None
+
+    def __len__(self):
+        return len(self._chaves)
+
+    def _series(self, partidas, casas, resultados):
+        # Código da série de cada cotação; séries novas ganham uma linha nos arrays
+        chaves = pd.MultiIndex.from_arrays([np.asarray(partidas, dtype=object), np.asarray(casas, dtype=object), np.asarray(resultados, dtype=np.int64)])
+        codigos, unicas = pd.factorize(chaves)
+        linhas = np.empty(len(unicas), dtype=np.int64)
+        for k, chave in enumerate(unicas):
+            linha = self._indices.get(chave)
+            if linha is None:
+                linha = self._indices[chave] = len(self._chaves)
+                self._chaves.append(chave)
+                self._por_partida.setdefault(chave[0], []).append(linha)
+            linhas[k] = linha
+        faltam = len(self._chaves) - len(self._escritas)
+        if faltam > 0:
+            # Crescimento em dobro: o custo de realocar fica diluído
+            novas = max(faltam, len(self._escritas))
+            self._tempos = np.vstack([self._tempos, np.zeros((novas, self.capacidade))])
+            self._odds = np.vstack([self._odds, np.zeros((novas, self.capacidade), dtype=np.float32)])
+            self._escritas = np.concatenate([self._escritas, np.zeros(novas, dtype=np.int64)])
+            self._gravadas = np.concatenate([self._gravadas, np.zeros(novas, dtype=np.int64)])
+        return linhas[codigos]
+
+    def inserir_lote(self, partidas, casas, resultados, odds, tempos=None):
+        odds = np.asarray(odds, dtype=np.float32)
+        tempos = np.full(len(odds), time.time()) if tempos is None else np.asarray(tempos, dtype=float)
+        with self._trava:
+            series = self._series(partidas, casas, resultados)
+            ordem = np.lexsort((tempos, series))
+            series, tempos, odds = series[ordem], tempos[ordem], odds[ordem]
+            unicas, inicio, contagem = np.unique(series, return_index=True, return_counts=True)
+            posto = np.arange(len(series)) - np.repeat(inicio, contagem)
+
+            # Cotações que passariam da capacidade sem estar gravadas vão para o disco antes
+            if self.pasta is not None and (self._escritas[unicas] + contagem - self._gravadas[unicas] > self.capacidade).any():
+                self.descarregar()
+            # Num lote maior que o buffer, só as últimas cotações de cada série ficam na memória
+            excedente = np.repeat(contagem - self.capacidade, contagem)
+            if self.pasta is not None and (excedente > 0).any():
+                self._gravar(series[posto < excedente], tempos[posto < excedente], odds[posto < excedente])
+            ficam = posto >= excedente
+            series, tempos, odds, posto = series[ficam], tempos[ficam], odds[ficam], posto[ficam]
+
+            coluna = (self._escritas[series] + posto) % self.capacidade
+            self._tempos[series, coluna] = tempos
+            self._odds[series, coluna] = odds
+            self._escritas[unicas] += contagem
+            if self.pasta is not None:
+                self._gravadas[unicas] = np.maximum(self._gravadas[unicas], self._escritas[unicas] - self.capacidade)
+
+    def inserir_tensor(self, odds, partidas, casas):
+        # Tensor jogos x casas x resultados do módulo de surebets; o mesmo conjunto
+        # de cotações reenviado não vira cotação nova
+        chave = hash((odds.tobytes(), tuple(partidas), tuple(casas)))
+        if chave in self.lotes_vistos:
+            return False
+        self.lotes_vistos.add(chave)
+        p, c, r = np.nonzero(~np.isnan(odds))
+        self.inserir_lote(np.array(partidas, dtype=object)[p], np.array(casas, dtype=object)[c], r, odds[p, c, r])
+        return True
+
+    def _janela(self, linha):
+        # Cotações da série em ordem cronológica
+        fim = self._escritas[linha]
+        colunas = np.arange(max(fim - self.capacidade, 0), fim) % self.capacidade
+        return self._tempos[linha, colunas], self._odds[linha, colunas]
+
+    def serie(self, partida, casa, resultado):
+        with self._trava:
+            linha = self._indices.get((partida, casa, resultado))
+            if linha is None:
+                return np.zeros(0), np.zeros(0, dtype=np.float32)
+            return self._janela(linha)
+
+    def cotacoes(self, partida):
+        # Todas as cotações em memória de um jogo, para o gráfico de movimento
+        with self._trava:
+            partes = []
+            for linha in self._por_partida.get(partida, []):
+                tempos, odds = self._janela(linha)
+                _, casa, resultado = self._chaves[linha]
+                partes.append(pd.DataFrame({"data": tempos, "casa_aposta": casa, "resultado": resultado, "odd": odds}))
+        if not partes:
+            return pd.DataFrame(columns=["data", "casa_aposta", "resultado", "odd"])
+        df = pd.concat(partes, ignore_index=True)
+        df["data"] = pd.to_datetime(df["data"], unit="s")
+        return df.sort_values("data", ignore_index=True)
+
+    def movimento_desde(self, partida, instante=None):
+        # Melhor odd de cada resultado no instante da análise e agora; quando o
+        # instante é anterior ao buffer vale a cotação mais antiga na memória
+        with self._trava:
+            linhas = self._por_partida.get(partida)
+            if not linhas:
+                return None
+            antes = np.full(3, np.nan)
+            agora = np.full(3, np.nan)
+            for linha in linhas:
+                tempos, odds = self._janela(linha)
+                if not len(odds):
+                    continue
+                resultado = self._chaves[linha][2]
+                k = 0 if instante is None else max(int(np.searchsorted(tempos, instante, side="right")) - 1, 0)
+                antes[resultado] = np.fmax(antes[resultado], odds[k])
+                agora[resultado] = np.fmax(agora[resultado], odds[-1])
+        return pd.DataFrame({
+            "Odd na análise": antes,
+            "Odd agora": agora,
+            "Variação (%)": ((agora / antes - 1) * 100).round(2),
+        }, index=RESULTADOS)
+
+    def _gravar(self, series, tempos, odds):
+        manter = ultimo_por_intervalo(series, tempos, self.resolucao)
+        if not manter.any():
+            return
+        partidas, casas, resultados = (np.array(coluna, dtype=object) for coluna in zip(*self._chaves))
+        series = series[manter]
+        armazenamento.gravar_lote("odds", pd.DataFrame({
+            "data": pd.to_datetime(tempos[manter], unit="s").floor("s"),
+            "partida": partidas[series],
+            "casa_aposta": casas[series],
+            "resultado": resultados[series].astype(np.int8),
+            "odd": odds[manter].astype(float),
+        }), self.pasta)
+
+    def carregar(self):
+        # Semeia os buffers com as últimas cotações gravadas de cada série, já
+        # marcadas como gravadas; feito uma vez, com os buffers ainda vazios
+        if self.pasta is None:
+            return 0
+        df = armazenamento.abrir_dataframe("odds", self.pasta)
+        if not len(df):
+            return 0
+        df = df.sort_values("data", kind="stable").groupby(["partida", "casa_aposta", "resultado"], sort=False).tail(self.capacidade)
+        with self._trava:
+            self.inserir_lote(
+                df["partida"].to_numpy(), df["casa_aposta"].to_numpy(), df["resultado"].to_numpy(),
+                df["odd"].to_numpy(), (df["data"] - pd.Timestamp(0)).dt.total_seconds().to_numpy()
+            )
+            self._gravadas[:] = self._escritas
+        return len(df)
+
+    def iniciar_manutencao(self, intervalo=INTERVALO_DESCARGA):
+        # Thread de fundo que descarrega os buffers e agenda a reamostragem grossa
+        if self.pasta is None or self._parar is not None:
+            return
+        self._parar = threading.Event()
+        threading.Thread(target=self._manutencao, args=(intervalo,), daemon=True, name="manutencao-odds").start()
+        atexit.register(self.parar_manutencao)
+
+    def _manutencao(self, intervalo):
+        proxima_reamostragem = time.time()
+        while not self._parar.wait(intervalo):
+            try:
+                self.descarregar()
+                if time.time() >= proxima_reamostragem:
+                    reamostrar_antigos(pd.to_datetime(time.time() - IDADE_REAMOSTRAGEM, unit="s"), pasta=self.pasta)
+                    proxima_reamostragem = time.time() + INTERVALO_REAMOSTRAGEM
+            except OSError:
+                # Disco indisponível: as cotações continuam pendentes para a próxima volta
+                pass
+
+    def parar_manutencao(self):
+        # Para a thread e grava o que ainda estiver só na memória
+        if self._parar is not None:
+            self._parar.set()
+        self.descarregar()
+
+    def descarregar(self):
+        # Grava tudo o que ainda não foi para o disco, reamostrado
+        if self.pasta is None:
+            return
+        with self._trava:
+            pendentes = np.flatnonzero(self._escritas > self._gravadas)
+            if not len(pendentes):
+                return
+            quantidades = self._escritas[pendentes] - self._gravadas[pendentes]
+            series = np.repeat(pendentes, quantidades)
+            posicoes = np.repeat(self._gravadas[pendentes] - np.cumsum(quantidades) + quantidades, quantidades) + np.arange(len(series))
+            colunas = posicoes % self.capacidade
+            self._gravar(series, self._tempos[series, colunas], self._odds[series, colunas])
+            self._gravadas[pendentes] = self._escritas[pendentes]
+
+
+def reamostrar_antigos(antes_de, resolucao=RESOLUCAO_ANTIGA, pasta=armazenamento.PASTA_HISTORICO):
+    # Reescreve a tabela "odds" numa compactação atômica, deixando nas cotações
+    # anteriores a 'antes_de' só a última odd de cada intervalo de 'resolucao' segundos
+    antes_de = pd.Timestamp(antes_de)
+
+    def reamostrar(tabela):
+        df = tabela.to_pandas()
+        antigas = (df["data"] < antes_de).to_numpy()
+        if not antigas.any():
+            return None
+        velhas = df[antigas].sort_values(["partida", "casa_aposta", "resultado", "data"], kind="stable", ignore_index=True)
+        series = velhas.groupby(["partida", "casa_aposta", "resultado"], sort=False).ngroup().to_numpy()
+        segundos = (velhas["data"] - pd.Timestamp(0)).dt.total_seconds().to_numpy()
+        manter = ultimo_por_intervalo(series, segundos, resolucao)
+        if manter.all():
+            # Já reamostrado: nada a reescrever
+            return None
+        return armazenamento.pa.Table.from_pandas(pd.concat([velhas[manter], df[~antigas]], ignore_index=True), preserve_index=False)
+
+    return armazenamento.compactar("odds", pasta, reamostrar)
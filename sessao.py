@@ -0,0 +1,376 @@
+# === Estado da sessão e caches compartilhados do app ===
+# O que todas as páginas usam: inicialização do st.session_state, snapshot na URL,
+# log de eventos do checklist e os recursos compartilhados entre as sessões. As
+# funções com cache são criadas uma vez, na importação, e não a cada reexecução.
+# Os motores (CLV, calibração, séries de odds, surebets...) são importados dentro
+# das funções que os usam, então só carregam quando a página ou o painel é aberto.
+import base64
+import os
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import armazenamento
+import eventos
+from nucleo import CASA, FORA, NENHUM, calcular_odds, codigo_resposta, montar_resposta
+from questionario import ID_PADRAO, carregar_questionarios
+from regras import SEM_RESPOSTA, IndiceCaracteristicas, regras_padrao
+from snapshot import codificar_snapshot, decodificar_snapshot
+
+PASTA_ODDS = os.path.join("dados", "odds")
+PASTA_FECHAMENTO = os.path.join("dados", "fechamento")
+PASTA_RESULTADOS = os.path.join("dados", "resultados")
+
+ENTRADAS_PADRAO = {
+    "time_casa": "Brasil",
+    "time_fora": "Argentina",
+    "odd_vitoria": 1.80,
+    "odd_empate": 3.20,
+    "odd_derrota": 4.00,
+    "banca": 100.0,
+    "analista": "",
+    "usar_bayes": False,
+}
+
+
+@st.cache_resource(show_spinner=False)
+def get_base64_image(image_path):
+    with open(image_path, "rb") as img_file:
+        return base64.b64encode(img_file.read()).decode()
+
+
+# Questionários compilados uma vez por processo e compartilhados entre as sessões
+@st.cache_resource(show_spinner=False)
+def obter_questionarios():
+    return carregar_questionarios()
+
+
+@st.cache_data(show_spinner=False)
+def carregar_tensor_odds(arquivos):
+    from surebet import COLUNAS_ODDS, ler_arquivos_odds, montar_tensor
+    tabelas = [pd.read_csv(BytesIO(conteudo), usecols=COLUNAS_ODDS) for conteudo in arquivos]
+    if not tabelas and os.path.isdir(PASTA_ODDS):
+        tabelas = [ler_arquivos_odds(PASTA_ODDS)]
+    df = pd.concat(tabelas, ignore_index=True) if tabelas else pd.DataFrame(columns=COLUNAS_ODDS)
+    return montar_tensor(df)
+
+
+# Grade das surebets: refeita só quando muda o conjunto de arquivos de odds ou a banca
+@st.cache_resource(max_entries=4, show_spinner=False)
+def grade_surebets(arquivos, banca):
+    from grade import GradeResultados
+    from surebet import detectar_surebets
+    df_surebets = detectar_surebets(*carregar_tensor_odds(arquivos), banca)
+    return GradeResultados(df_surebets) if len(df_surebets) else None
+
+
+# A grade do histórico é refeita só quando surge um lote novo de análises ou de fechamentos
+@st.cache_resource(max_entries=4, show_spinner=False)
+def grade_historico(arquivos, arquivos_fechamento):
+    from clv import analises_com_clv
+    from grade import GradeResultados
+    return GradeResultados(analises_com_clv(
+        armazenamento.abrir_dataframe("analises"),
+        armazenamento.abrir_dataframe("fechamento")
+    ))
+
+
+# Séries de odds do processo: cada carga de arquivos de odds vira um instante da série.
+# Sobem com as cotações já gravadas e descarregam/reamostram numa thread de fundo
+@st.cache_resource(show_spinner=False)
+def obter_series_odds():
+    from serie_odds import SeriesOdds
+    series = SeriesOdds(pasta=armazenamento.PASTA_HISTORICO if armazenamento.pa is not None else None)
+    series.carregar()
+    series.iniciar_manutencao()
+    return series
+
+
+# Agregados de CLV compartilhados entre as sessões e atualizados só com os lotes novos
+@st.cache_resource(show_spinner=False)
+def obter_agregados_clv():
+    from clv import AgregadosCLV
+    return AgregadosCLV()
+
+
+# Somas de calibração (Brier, log-loss, RPS, faixas) compartilhadas como as de CLV
+@st.cache_resource(show_spinner=False)
+def obter_agregados_calibracao():
+    from calibracao import AgregadosCalibracao
+    return AgregadosCalibracao()
+
+
+# Médias por time refeitas só quando a ingestão grava um lote novo
+@st.cache_data(max_entries=4, show_spinner=False)
+def tabela_caracteristicas(arquivos):
+    from caracteristicas import caracteristicas_times
+    return caracteristicas_times(armazenamento.abrir_dataframe("caracteristicas"))
+
+
+# Índice de médias por time para as regras do checklist, refeito com a tabela
+@st.cache_resource(max_entries=2, show_spinner=False)
+def indice_caracteristicas(arquivos):
+    return IndiceCaracteristicas(armazenamento.abrir_dataframe("caracteristicas"))
+
+
+def obter_indice_caracteristicas():
+    if armazenamento.pa is None:
+        return None
+    return indice_caracteristicas(tuple(armazenamento.arquivos_tabela("caracteristicas", armazenamento.PASTA_HISTORICO)))
+
+
+# Saldo, apostas em aberto e extrato do analista, relidos só quando entra um lote
+# novo no livro-caixa ou nas apostas
+@st.cache_data(max_entries=8, show_spinner=False)
+def resumo_banca(arquivos_banca, arquivos_apostas, analista):
+    import liquidacao
+    abertas = liquidacao.apostas_abertas()
+    extrato = liquidacao.livro_caixa(analista=analista)
+    saldo = float(extrato["valor"].sum()) if len(extrato) else None
+    return saldo, abertas[abertas["analista"] == analista], extrato.iloc[::-1].head(50)
+
+
+# Forma recente de todos os times em buffers circulares, compartilhada entre as sessões
+@st.cache_resource(show_spinner=False)
+def obter_motor_forma():
+    from forma import MotorForma
+    return MotorForma()
+
+
+def motor_forma_atual():
+    # Motor com os jogos gravados desde a última consulta; None sem pyarrow
+    if armazenamento.pa is None:
+        return None
+    motor = obter_motor_forma()
+    motor.sincronizar()
+    return motor
+
+
+def inicializar():
+    # Estado inicial e retomada da análise (snapshot de arquivo ou da URL ?s=...)
+    if 'respostas' not in st.session_state:
+        st.session_state.respostas = []
+    if 'fase' not in st.session_state:
+        st.session_state.fase = 1
+    if 'etapa' not in st.session_state:
+        st.session_state.etapa = 0
+    questionarios, erros = obter_questionarios()
+    if 'questionario' not in st.session_state or st.session_state.questionario not in questionarios:
+        st.session_state.questionario = ID_PADRAO
+    if 'fatores' not in st.session_state:
+        st.session_state.fatores = list(questionarios[st.session_state.questionario]["fatores"])
+    for chave, valor in ENTRADAS_PADRAO.items():
+        if chave not in st.session_state:
+            st.session_state[chave] = valor
+    if 'peso_mercado' not in st.session_state:
+        from bayes import PESO_MERCADO_PADRAO
+        st.session_state.peso_mercado = round(PESO_MERCADO_PADRAO * 100)
+    if 'workspace' not in st.session_state:
+        st.session_state.workspace = {}
+        st.session_state.proximo_id_partida = 1
+
+    if 'snapshot_pendente' in st.session_state:
+        aplicar_snapshot(st.session_state.pop('snapshot_pendente'))
+    if 'banca_pendente' in st.session_state:
+        st.session_state.banca = round(st.session_state.pop('banca_pendente'), 2)
+    if 'odds_pendentes' in st.session_state:
+        for chave, valor in st.session_state.pop('odds_pendentes').items():
+            st.session_state[chave] = valor
+    codigo_url = st.query_params.get("s")
+    if codigo_url and st.session_state.get("snapshot_aplicado") != codigo_url:
+        st.session_state.snapshot_aplicado = codigo_url
+        try:
+            aplicar_snapshot(decodificar_snapshot(codigo_url, fatores_por_questionario()))
+        except ValueError as erro:
+            st.warning(f"⚠️ Não foi possível retomar a análise da URL: {erro}")
+    if 'log_checklist' not in st.session_state or st.session_state.log_checklist["cursor"] != len(st.session_state.respostas):
+        reconstruir_log()
+    return questionarios, erros
+
+
+def fatores_por_questionario():
+    questionarios, _ = obter_questionarios()
+    return {qid: q["fatores"] for qid, q in questionarios.items()}
+
+
+def tabela_atual():
+    questionarios, _ = obter_questionarios()
+    return questionarios[st.session_state.questionario]["tabela"]
+
+
+def regras_atuais():
+    # Regras do questionário; fatores alterados (snapshot antigo) voltam às regras padrão
+    questionarios, _ = obter_questionarios()
+    questionario = questionarios[st.session_state.questionario]
+    if questionario["fatores"] == st.session_state.fatores:
+        return questionario["regras"]
+    return regras_padrao(st.session_state.fatores)
+
+
+def versao_tabela(nome):
+    # (arquivo, mtime) dos lotes da tabela: muda quando um lote entra ou a pasta é compactada
+    pasta = os.path.join(armazenamento.PASTA_HISTORICO, nome)
+    if not os.path.isdir(pasta):
+        return ()
+    with os.scandir(pasta) as entradas:
+        return tuple(sorted((entrada.name, entrada.stat().st_mtime_ns) for entrada in entradas if entrada.name.endswith(".arrow")))
+
+
+def sugestoes_atuais():
+    # Resposta que os dados dão a cada pergunta do jogo atual e os valores comparados.
+    # Guardada na sessão: só recalcula quando mudam os times, o questionário, os
+    # lotes de características/jogos ou a simulação do jogo, então o callback de
+    # "Próxima" e o fragmento do checklist leem o mesmo resultado sem avaliar as regras
+    jogo = (st.session_state.time_casa, st.session_state.time_fora)
+    chave = (
+        jogo, st.session_state.questionario, tuple(st.session_state.fatores),
+        versao_tabela("caracteristicas"), versao_tabela("jogos"),
+        st.session_state.get("importancia_simulada", {}).get(jogo),
+    )
+    cache = st.session_state.get("cache_sugestoes")
+    if cache is None or cache[0] != chave:
+        indice = obter_indice_caracteristicas()
+        if indice is None:
+            indice = IndiceCaracteristicas()
+        codigos, valores = indice.responder(
+            [jogo[0]], [jogo[1]], regras_atuais(), motor_forma_atual(), st.session_state.get("importancia_simulada")
+        )
+        cache = st.session_state.cache_sugestoes = (chave, codigos[0], valores[0])
+    return cache[1], cache[2]
+
+
+def peso_respondido(respondidas):
+    return sum(peso for _, peso in st.session_state.fatores[:respondidas])
+
+
+def posterior_atual(saldo_casa, saldo_fora, peso):
+    from bayes import posterior
+    odds = (st.session_state.odd_vitoria, st.session_state.odd_empate, st.session_state.odd_derrota)
+    return posterior(odds, saldo_casa, saldo_fora, peso, st.session_state.peso_mercado / 100, peso_respondido(None))
+
+
+def pontuar(saldo_casa, saldo_fora, peso):
+    # Probabilidades do checklist ou, com o mercado como prior, o posterior de Dirichlet;
+    # aceita inteiros ou arrays de saldos, como TabelaPontuacao.pontuar
+    if not st.session_state.usar_bayes:
+        return tabela_atual().pontuar(saldo_casa, saldo_fora)
+    media = np.round(posterior_atual(saldo_casa, saldo_fora, peso)["media"], 1)
+    if media.ndim > 1:
+        return media[..., 0], media[..., 1], media[..., 2]
+    return tuple(float(valor) for valor in media)
+
+
+def probabilidades_atuais():
+    # Saldos do checkpoint do log: O(1), sem somar a lista de respostas
+    saldo_casa, saldo_fora = eventos.saldos(st.session_state.log_checklist)
+    peso = peso_respondido(st.session_state.log_checklist["cursor"])
+    return saldo_casa, saldo_fora, pontuar(saldo_casa, saldo_fora, peso)
+
+
+def odds_justas(vitoria, empate, derrota):
+    return {"Vitória": calcular_odds(vitoria), "Empate": calcular_odds(empate), "Derrota": calcular_odds(derrota)}
+
+
+def aplicar_snapshot(estado):
+    for chave, valor in estado.items():
+        st.session_state[chave] = valor
+    if "respostas" in estado:
+        reconstruir_log()
+
+
+def reconstruir_log():
+    # Log de eventos a partir das respostas atuais (snapshot retomado ou sessão antiga)
+    st.session_state.log_checklist = eventos.log_de_codigos(
+        [codigo_resposta(r) for r in st.session_state.respostas],
+        [peso for _, peso in st.session_state.fatores]
+    )
+
+
+def sincronizar_snapshot():
+    # None quando o estado não cabe no snapshot: a URL fica sem ?s= em vez de quebrar a página
+    try:
+        codigo = codificar_snapshot(st.session_state)
+    except ValueError:
+        if "s" in st.query_params:
+            del st.query_params["s"]
+        return None
+    if st.query_params.get("s") != codigo:
+        st.query_params["s"] = codigo
+        st.session_state.snapshot_aplicado = codigo
+    return codigo
+
+
+def registrar_resposta():
+    etapa_atual = st.session_state.etapa
+    pergunta, peso = st.session_state.fatores[etapa_atual]
+    escolha = st.session_state[f"etapa_{etapa_atual}"]
+    time_c, time_f = st.session_state.time_casa, st.session_state.time_fora
+    codigo = CASA if escolha == time_c else FORA if escolha == time_f else NENHUM
+    # Resposta igual à dos dados fica marcada como tal na trilha de auditoria
+    origem = "dados" if sugestoes_atuais()[0][etapa_atual] == codigo else "analista"
+    eventos.responder(st.session_state.log_checklist, codigo, peso, origem)
+    st.session_state.respostas.append(montar_resposta(codigo, pergunta, peso, time_c, time_f))
+
+    st.session_state.etapa += 1
+    if st.session_state.etapa >= len(st.session_state.fatores):
+        st.session_state.fase = 3
+
+
+def responder_com_dados():
+    # Aceita as respostas dos dados a partir da pergunta atual até a primeira sem dados
+    codigos, _ = sugestoes_atuais()
+    log = st.session_state.log_checklist
+    while log["cursor"] < len(st.session_state.fatores) and codigos[log["cursor"]] != SEM_RESPOSTA:
+        eventos.responder(log, int(codigos[log["cursor"]]), st.session_state.fatores[log["cursor"]][1], "dados")
+    alinhar_respostas()
+
+
+def alinhar_respostas():
+    # respostas acompanha o cursor do log: só as perguntas entre o cursor antigo e o
+    # novo mudam, então desfazer e refazer custam O(1)
+    log = st.session_state.log_checklist
+    respostas_sessao = st.session_state.respostas
+    cursor = log["cursor"]
+    time_c, time_f = st.session_state.time_casa, st.session_state.time_fora
+    del respostas_sessao[cursor:]
+    for i in range(len(respostas_sessao), cursor):
+        pergunta, peso = st.session_state.fatores[i]
+        respostas_sessao.append(montar_resposta(log["codigos"][i], pergunta, peso, time_c, time_f))
+    if eventos.pode_refazer(log):
+        # A pergunta reaberta já vem marcada com a resposta anterior
+        st.session_state[f"etapa_{cursor}"] = {CASA: time_c, FORA: time_f}.get(log["codigos"][cursor], "Nenhum")
+    st.session_state.etapa = cursor
+    if cursor >= len(st.session_state.fatores):
+        st.session_state.fase = 3
+    else:
+        st.session_state.fase = 2
+        st.session_state.subfase_kelly = 0
+
+
+def desfazer_resposta():
+    eventos.desfazer(st.session_state.log_checklist)
+    alinhar_respostas()
+
+
+def refazer_resposta():
+    eventos.refazer(st.session_state.log_checklist)
+    alinhar_respostas()
+
+
+def ir_para_pergunta(chave):
+    eventos.ir_para(st.session_state.log_checklist, st.session_state[chave])
+    alinhar_respostas()
+
+
+def nova_analise():
+    # Volta à fase 1 mantendo times, odds e banca preenchidos
+    st.session_state.respostas = []
+    st.session_state.etapa = 0
+    st.session_state.fase = 1
+    st.session_state.subfase_kelly = 0
+    st.session_state.mercado_escolhido = None
+    st.session_state.anotacoes = ""
+    st.session_state.log_checklist = eventos.novo_log()
+
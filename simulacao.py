@@ -0,0 +1,243 @@
+# === Simulação de liga e mata-mata: o que está em jogo na partida ===
+# Os jogos que faltam são disputados centenas de milhares de vezes a partir das
+# probabilidades de cada partida. Na liga, as probabilidades 1X2 viram médias de
+# gols (as mesmas da escada de handicap) e os placares de todas as simulações saem
+# de uma vez; pontos, saldo e gols pró somam por multiplicação de matrizes e a
+# classificação é um argsort por linha. No mata-mata cada fase é sorteada para
+# todas as simulações juntas. As simulações são divididas em tarefas com sementes
+# independentes e espalhadas entre processos; cada tarefa devolve só contagens de
+# posição por time, separadas pelo resultado do jogo em foco, e daí saem título,
+# classificação, rebaixamento e quanto cada resultado do jogo muda essas chances.
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import handicap
+
+N_SIMULACOES = 200_000
+SIMULACOES_POR_TAREFA = 20_000
+# Sem probabilidades no arquivo, o jogo recebe a média de mandante/empate/visitante
+PROBABILIDADES_PADRAO = (45.0, 27.0, 28.0)
+FORCA_PADRAO = 1500.0
+COLUNAS_TABELA = ["time", "pontos"]
+COLUNAS_RESTANTES = ["time_casa", "time_fora"]
+COLUNAS_PROBABILIDADES = ["prob_casa", "prob_empate", "prob_fora"]
+COLUNAS_CHAVE = ["time"]
+RESULTADOS_FOCO = ["Vitória casa", "Empate", "Vitória visitante"]
+_VITORIA_CASA, _EMPATE, _VITORIA_FORA = range(3)
+NOMES_FASES = {2: "Final", 4: "Semifinal", 8: "Quartas", 16: "Oitavas", 32: "16 avos"}
+
+
+def _tarefas(n_simulacoes, semente):
+    # (simulações, semente) de cada tarefa; a soma dá exatamente n_simulacoes
+    n_tarefas = max(1, -(-n_simulacoes // SIMULACOES_POR_TAREFA))
+    tamanhos = np.full(n_tarefas, n_simulacoes // n_tarefas)
+    tamanhos[:n_simulacoes % n_tarefas] += 1
+    return list(zip(tamanhos.tolist(), np.random.SeedSequence(semente).spawn(n_tarefas)))
+
+
+def _executar(funcao, modelo, n_simulacoes, semente, processos):
+    # Soma as contagens das tarefas, em processos quando houver mais de um núcleo
+    tarefas = [(modelo, n, s) for n, s in _tarefas(n_simulacoes, semente)]
+    processos = min(processos or os.cpu_count() or 1, len(tarefas))
+    if processos <= 1:
+        return sum(map(funcao, tarefas))
+    # spawn: os processos não herdam as threads do servidor do Streamlit
+    with ProcessPoolExecutor(processos, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return sum(executor.map(funcao, tarefas))
+
+
+def _probabilidades(jogos):
+    # (jogos, 3) em proporção; colunas ausentes ou vazias ficam com o padrão
+    probs = np.tile(np.asarray(PROBABILIDADES_PADRAO, dtype=float), (len(jogos), 1))
+    if set(COLUNAS_PROBABILIDADES) <= set(jogos.columns):
+        informadas = jogos[COLUNAS_PROBABILIDADES].to_numpy(dtype=float)
+        completas = ~np.isnan(informadas).any(axis=1)
+        probs[completas] = informadas[completas]
+    if (probs < 0).any() or (probs.sum(axis=1) <= 0).any():
+        raise ValueError("probabilidades dos jogos devem ser positivas")
+    return probs / probs.sum(axis=1, keepdims=True)
+
+
+def _indice_foco(casas, foras, foco):
+    if foco is None:
+        return -1
+    encontrados = np.flatnonzero((casas == foco[0]) & (foras == foco[1]))
+    return int(encontrados[0]) if len(encontrados) else -1
+
+
+def modelo_liga(tabela, restantes, foco=None, probabilidades_foco=None):
+    # Tudo o que as tarefas precisam, em arrays: times, somas atuais, médias de gols
+    # dos jogos restantes e o jogo em foco (time_casa, time_fora), se estiver entre eles
+    for df, colunas in ((tabela, COLUNAS_TABELA), (restantes, COLUNAS_RESTANTES)):
+        faltando = set(colunas) - set(df.columns)
+        if faltando:
+            raise KeyError(f"Colunas ausentes: {', '.join(sorted(faltando))}")
+    tabela = tabela.dropna(subset=COLUNAS_TABELA).drop_duplicates("time", keep="last")
+    restantes = restantes.dropna(subset=COLUNAS_RESTANTES)
+    times = pd.Index(tabela["time"].astype(str))
+    casas = times.get_indexer(restantes["time_casa"].astype(str))
+    foras = times.get_indexer(restantes["time_fora"].astype(str))
+    if (casas < 0).any() or (foras < 0).any():
+        desconhecidos = set(restantes["time_casa"].astype(str)[casas < 0]) | set(restantes["time_fora"].astype(str)[foras < 0])
+        raise ValueError(f"times fora da classificação: {', '.join(sorted(desconhecidos))}")
+
+    probs = _probabilidades(restantes)
+    indice_foco = _indice_foco(restantes["time_casa"].astype(str).to_numpy(), restantes["time_fora"].astype(str).to_numpy(), foco)
+    if indice_foco >= 0 and probabilidades_foco is not None:
+        probs[indice_foco] = np.asarray(probabilidades_foco, dtype=float) / np.sum(probabilidades_foco)
+    medias_casa, medias_fora = handicap.ajustar_medias(probs[:, 0], probs[:, 1], probs[:, 2]) if len(probs) else (np.empty(0), np.empty(0))
+    coluna = lambda nome: tabela[nome].to_numpy(dtype=float) if nome in tabela else np.zeros(len(tabela))
+    return {
+        "times": list(times),
+        "pontos": coluna("pontos"), "saldo": coluna("saldo"), "gols_pro": coluna("gols_pro"),
+        "casas": casas, "foras": foras, "medias_casa": medias_casa, "medias_fora": medias_fora,
+        "foco": indice_foco,
+    }
+
+
+def _simular_liga(tarefa):
+    # Executado nos processos: contagens (resultado do foco, time, posição)
+    modelo, n, semente = tarefa
+    rng = np.random.default_rng(semente)
+    n_times, n_jogos = len(modelo["times"]), len(modelo["casas"])
+    gols_casa = rng.poisson(modelo["medias_casa"], size=(n, n_jogos)).astype(np.float32)
+    gols_fora = rng.poisson(modelo["medias_fora"], size=(n, n_jogos)).astype(np.float32)
+
+    # Matrizes jogo x time: cada jogo soma no mandante e no visitante
+    mandante = np.zeros((n_jogos, n_times), dtype=np.float32)
+    visitante = np.zeros((n_jogos, n_times), dtype=np.float32)
+    mandante[np.arange(n_jogos), modelo["casas"]] = 1
+    visitante[np.arange(n_jogos), modelo["foras"]] = 1
+    pontos_casa = np.where(gols_casa > gols_fora, 3, np.where(gols_casa == gols_fora, 1, 0)).astype(np.float32)
+    pontos_fora = np.where(gols_fora > gols_casa, 3, np.where(gols_casa == gols_fora, 1, 0)).astype(np.float32)
+    pontos = modelo["pontos"] + pontos_casa @ mandante + pontos_fora @ visitante
+    saldo = modelo["saldo"] + (gols_casa - gols_fora) @ (mandante - visitante)
+    gols_pro = modelo["gols_pro"] + gols_casa @ mandante + gols_fora @ visitante
+
+    # Critérios: pontos, saldo, gols pró e sorteio
+    chave = pontos * 1e6 + (saldo + 1e3) * 1e2 + np.minimum(gols_pro, 99) + rng.random((n, n_times)) * 0.5
+    posicoes = np.empty((n, n_times), dtype=np.int64)
+    np.put_along_axis(posicoes, np.argsort(-chave, axis=1), np.arange(n_times), axis=1)
+
+    if modelo["foco"] >= 0:
+        diferenca = gols_casa[:, modelo["foco"]] - gols_fora[:, modelo["foco"]]
+        resultado = np.where(diferenca > 0, _VITORIA_CASA, np.where(diferenca == 0, _EMPATE, _VITORIA_FORA))
+    else:
+        resultado = np.zeros(n, dtype=np.int64)
+    indices = (resultado[:, None] * n_times + np.arange(n_times)) * n_times + posicoes
+    return np.bincount(indices.ravel(), minlength=3 * n_times * n_times).reshape(3, n_times, n_times)
+
+
+def simular_liga(modelo, n_simulacoes=N_SIMULACOES, semente=0, processos=None):
+    return _executar(_simular_liga, modelo, n_simulacoes, semente, processos)
+
+
+def modelo_mata_mata(chave, foco=None, probabilidades_foco=None):
+    # Chave na ordem do chaveamento (1º x 2º, 3º x 4º...) e, opcionalmente, a força
+    # (Elo) de cada time; o jogo em foco precisa ser um confronto da primeira fase
+    faltando = set(COLUNAS_CHAVE) - set(chave.columns)
+    if faltando:
+        raise KeyError(f"Colunas ausentes: {', '.join(sorted(faltando))}")
+    chave = chave.dropna(subset=COLUNAS_CHAVE)
+    times = chave["time"].astype(str).tolist()
+    if len(times) < 2 or len(times) & (len(times) - 1) or len(set(times)) != len(times):
+        raise ValueError("a chave precisa de 2, 4, 8, 16... times distintos")
+    forca = chave["forca"].fillna(FORCA_PADRAO).to_numpy(dtype=float) if "forca" in chave else np.full(len(times), FORCA_PADRAO)
+    # Chance de a linha passar pela coluna (empate decidido nos pênaltis, meio a meio)
+    avanco = 1 / (1 + 10 ** ((forca[None, :] - forca[:, None]) / 400))
+
+    indice_foco = -1
+    if foco is not None and foco[0] in times and foco[1] in times:
+        casa, fora = times.index(foco[0]), times.index(foco[1])
+        if casa // 2 == fora // 2:
+            indice_foco = casa
+            if probabilidades_foco is not None:
+                vitoria, empate, derrota = np.asarray(probabilidades_foco, dtype=float) / np.sum(probabilidades_foco)
+                avanco[casa, fora] = vitoria + empate / 2
+                avanco[fora, casa] = 1 - avanco[casa, fora]
+    return {"times": times, "avanco": avanco, "foco": indice_foco}
+
+
+def _simular_mata_mata(tarefa):
+    # Executado nos processos: contagens (resultado do foco, time, fases vencidas)
+    modelo, n, semente = tarefa
+    rng = np.random.default_rng(semente)
+    n_times = len(modelo["times"])
+    n_fases = n_times.bit_length() - 1
+    vivos = np.broadcast_to(np.arange(n_times), (n, n_times))
+    vencidas = np.zeros((n, n_times), dtype=np.int64)
+    resultado = np.zeros(n, dtype=np.int64)
+    for fase in range(n_fases):
+        a, b = vivos[:, 0::2], vivos[:, 1::2]
+        passa_a = rng.random(a.shape) < modelo["avanco"][a, b]
+        vivos = np.where(passa_a, a, b)
+        vencidas[np.arange(n)[:, None], vivos] += 1
+        if fase == 0 and modelo["foco"] >= 0:
+            passou_casa = passa_a[:, modelo["foco"] // 2] == (modelo["foco"] % 2 == 0)
+            resultado = np.where(passou_casa, _VITORIA_CASA, _VITORIA_FORA)
+    indices = (resultado[:, None] * n_times + np.arange(n_times)) * (n_fases + 1) + vencidas
+    return np.bincount(indices.ravel(), minlength=3 * n_times * (n_fases + 1)).reshape(3, n_times, n_fases + 1)
+
+
+def simular_mata_mata(modelo, n_simulacoes=N_SIMULACOES, semente=0, processos=None):
+    return _executar(_simular_mata_mata, modelo, n_simulacoes, semente, processos)
+
+
+NOMES_LIGA = ["Título", "Classificação", "Rebaixamento"]
+
+
+def objetivos_liga(contagem, vagas, rebaixados):
+    # (..., time, objetivo) em %: título, classificação e rebaixamento
+    n_times = contagem.shape[-1]
+    probs = contagem / np.maximum(contagem.sum(axis=-1, keepdims=True), 1) * 100
+    return np.stack([
+        probs[..., 0],
+        probs[..., :min(vagas, n_times)].sum(axis=-1),
+        probs[..., n_times - min(rebaixados, n_times):].sum(axis=-1),
+    ], axis=-1)
+
+
+def objetivos_mata_mata(contagem):
+    # (..., time, fase) em %: chance de chegar a cada fase seguinte e de ser campeão
+    probs = contagem / np.maximum(contagem.sum(axis=-1, keepdims=True), 1) * 100
+    return np.cumsum(probs[..., ::-1], axis=-1)[..., ::-1][..., 1:]
+
+
+def nomes_mata_mata(n_times):
+    n_fases = n_times.bit_length() - 1
+    return [NOMES_FASES.get(n_times >> fase, f"{n_times >> fase} times") for fase in range(1, n_fases)] + ["Título"]
+
+
+def resumo_liga(contagem, times, vagas, rebaixados):
+    # Chances de todos os times, somando os resultados do jogo em foco
+    total = contagem.sum(axis=0)
+    df = pd.DataFrame(objetivos_liga(total, vagas, rebaixados).round(1), columns=[f"{nome} (%)" for nome in NOMES_LIGA])
+    df.insert(0, "Time", times)
+    df["Posição média"] = ((total * np.arange(1, len(times) + 1)).sum(axis=1) / np.maximum(total.sum(axis=1), 1)).round(1)
+    return df.sort_values("Posição média", ignore_index=True)
+
+
+def resumo_mata_mata(contagem, times):
+    nomes = nomes_mata_mata(len(times))
+    df = pd.DataFrame(objetivos_mata_mata(contagem.sum(axis=0)).round(1), columns=[f"{nome} (%)" for nome in nomes])
+    df.insert(0, "Time", times)
+    return df.sort_values(list(df.columns[:0:-1]), ascending=False, ignore_index=True)
+
+
+def impacto(objetivos, contagem, times, foco, nomes):
+    # Chances dos dois times do jogo em foco para cada resultado dele e o que está em
+    # jogo: a maior variação de um objetivo entre os resultados possíveis, em p.p.
+    ocorridos = np.flatnonzero(contagem.sum(axis=(1, 2)) > 0)
+    linhas, em_jogo = [], {}
+    for time in foco:
+        k = times.index(time)
+        variacao = objetivos[ocorridos, k].max(axis=0) - objetivos[ocorridos, k].min(axis=0)
+        em_jogo[time] = float(variacao.max()) if len(ocorridos) > 1 else 0.0
+        for r in ocorridos:
+            linhas.append({"Time": time, "Resultado": RESULTADOS_FOCO[r], **{f"{nome} (%)": round(float(v), 1) for nome, v in zip(nomes, objetivos[r, k])}})
+        linhas.append({"Time": time, "Resultado": "Em jogo (p.p.)", **{f"{nome} (%)": round(float(v), 1) for nome, v in zip(nomes, variacao)}})
+    return pd.DataFrame(linhas), em_jogo
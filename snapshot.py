@@ -0,0 +1,148 @@
+# === Snapshot compacto da sessão ===
+# Serializa o estado da análise (questionário, fase, respostas, odds, banca) em poucos bytes,
+# codificados em base64 seguro para URL. Serve para a query string (?s=...),
+# para arquivos .snap locais e para gerar estados prontos em testes de carga.
+import base64
+import math
+import struct
+
+from nucleo import FATORES_PADRAO, MERCADOS, codigo_resposta, montar_resposta
+
+# v1: checklist padrão (ou um prefixo dele); v2: acrescenta o id do questionário;
+# v3: etapa, nº de fatores e nº de respostas com 16 bits
+VERSAO_SNAPSHOT = 3
+ID_QUESTIONARIO_PADRAO = "padrao"
+
+# versão, fase, etapa, subfase_kelly, mercado (0 = nenhum), nº de fatores,
+# nº de respostas, odds em centésimos (vitória, empate, derrota), banca
+_CABECALHO = struct.Struct("<BBHBBHH3Id")
+_CABECALHO_V2 = struct.Struct("<BBBBBBB3Id")
+_MAX_NOME = 255
+_MAX_CENTESIMOS = 2 ** 32 - 1
+
+
+def _empacotar_respostas(codigos):
+    # 2 bits por resposta, 4 respostas por byte
+    dados = bytearray((len(codigos) + 3) // 4)
+    for i, codigo in enumerate(codigos):
+        dados[i // 4] |= (codigo & 0b11) << (2 * (i % 4))
+    return bytes(dados)
+
+
+def _desempacotar_respostas(dados, n):
+    return [(dados[i // 4] >> (2 * (i % 4))) & 0b11 for i in range(n)]
+
+
+def _empacotar_nome(nome):
+    bruto = nome.encode("utf-8")[:_MAX_NOME]
+    # Não corta um caractere multibyte ao meio
+    bruto = bruto.decode("utf-8", errors="ignore").encode("utf-8")
+    return bytes([len(bruto)]) + bruto
+
+
+def _ler_nome(dados, pos):
+    tamanho = dados[pos]
+    fim = pos + 1 + tamanho
+    if fim > len(dados):
+        raise ValueError("Snapshot truncado")
+    return dados[pos + 1:fim].decode("utf-8"), fim
+
+
+def _centesimos(odd):
+    # Odd em centésimos limitada ao campo de 32 bits; odd não finita vira 0
+    odd = float(odd)
+    return min(max(0, round(odd * 100)), _MAX_CENTESIMOS) if math.isfinite(odd) else 0
+
+
+def codificar_snapshot(estado):
+    # ValueError quando o estado não cabe no formato (mais de 65535 fatores, por exemplo)
+    mercado = estado.get("mercado_escolhido")
+    codigos = [codigo_resposta(r) for r in estado["respostas"]]
+    try:
+        cabecalho = _CABECALHO.pack(
+            VERSAO_SNAPSHOT,
+            estado["fase"],
+            estado["etapa"],
+            estado.get("subfase_kelly", 0),
+            MERCADOS.index(mercado) + 1 if mercado in MERCADOS else 0,
+            len(estado["fatores"]),
+            len(codigos),
+            _centesimos(estado["odd_vitoria"]),
+            _centesimos(estado["odd_empate"]),
+            _centesimos(estado["odd_derrota"]),
+            float(estado["banca"]),
+        )
+    except struct.error as erro:
+        raise ValueError(f"Estado fora do formato do snapshot: {erro}") from erro
+    corpo = (
+        cabecalho
+        + _empacotar_nome(estado["time_casa"])
+        + _empacotar_nome(estado["time_fora"])
+        + _empacotar_nome(estado.get("questionario") or ID_QUESTIONARIO_PADRAO)
+        + _empacotar_respostas(codigos)
+    )
+    return base64.urlsafe_b64encode(corpo).decode("ascii").rstrip("=")
+
+
+def decodificar_snapshot(codigo, questionarios=None):
+    # questionarios: {id: lista de fatores}; o checklist padrão está sempre disponível
+    questionarios = {ID_QUESTIONARIO_PADRAO: FATORES_PADRAO, **(questionarios or {})}
+    try:
+        dados = base64.urlsafe_b64decode(codigo + "=" * (-len(codigo) % 4))
+    except (ValueError, TypeError) as erro:
+        raise ValueError("Snapshot inválido") from erro
+    if not dados:
+        raise ValueError("Snapshot truncado")
+    if dados[0] not in (1, 2, VERSAO_SNAPSHOT):
+        raise ValueError(f"Versão de snapshot não suportada: {dados[0]}")
+    cabecalho = _CABECALHO if dados[0] >= 3 else _CABECALHO_V2
+    if len(dados) < cabecalho.size:
+        raise ValueError("Snapshot truncado")
+
+    (versao, fase, etapa, subfase, mercado, n_fatores, n_respostas,
+     odd_v, odd_e, odd_d, banca) = cabecalho.unpack_from(dados)
+
+    time_casa, pos = _ler_nome(dados, cabecalho.size)
+    time_fora, pos = _ler_nome(dados, pos)
+    questionario = ID_QUESTIONARIO_PADRAO
+    if versao >= 2:
+        questionario, pos = _ler_nome(dados, pos)
+    if questionario not in questionarios:
+        raise ValueError(f"Questionário '{questionario}' não está disponível")
+    fatores_base = questionarios[questionario]
+    if n_fatores > len(fatores_base) or n_respostas > n_fatores or etapa > n_fatores:
+        raise ValueError("Snapshot incompatível com o checklist atual")
+    empacotadas = dados[pos:]
+    if len(empacotadas) < (n_respostas + 3) // 4:
+        raise ValueError("Snapshot truncado")
+
+    fatores = list(fatores_base[:n_fatores])
+    respostas = [
+        montar_resposta(c, pergunta, peso, time_casa, time_fora)
+        for c, (pergunta, peso) in zip(_desempacotar_respostas(empacotadas, n_respostas), fatores)
+    ]
+    return {
+        "fase": fase,
+        "etapa": etapa,
+        "subfase_kelly": subfase,
+        "mercado_escolhido": MERCADOS[mercado - 1] if 0 < mercado <= len(MERCADOS) else None,
+        "questionario": questionario,
+        "fatores": fatores,
+        "respostas": respostas,
+        "time_casa": time_casa,
+        "time_fora": time_fora,
+        "odd_vitoria": odd_v / 100,
+        "odd_empate": odd_e / 100,
+        "odd_derrota": odd_d / 100,
+        "banca": banca,
+    }
+
+
+def salvar_snapshot(caminho, estado):
+    with open(caminho, "w", encoding="ascii") as arquivo:
+        arquivo.write(codificar_snapshot(estado) + "\n")
+
+
+def carregar_snapshot(caminho, questionarios=None):
+    with open(caminho, "r", encoding="ascii") as arquivo:
+        return decodificar_snapshot(arquivo.read().strip(), questionarios)
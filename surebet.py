@@ -0,0 +1,120 @@
+# === Surebets e melhores preços entre casas de apostas ===
+# As odds ficam num tensor jogos x casas x resultados (vitória, empate, derrota),
+# com NaN onde a casa não cotou. Melhor preço, margem e divisão de stakes são
+# calculados de uma vez para todos os jogos; o índice de melhor preço é mantido
+# incrementalmente quando chegam cotações novas.
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+RESULTADOS = ["Vitória", "Empate", "Derrota"]
+_APELIDOS_RESULTADO = {
+    "1": 0, "v": 0, "vitoria": 0, "vitória": 0, "casa": 0,
+    "x": 1, "e": 1, "empate": 1,
+    "2": 2, "d": 2, "derrota": 2, "fora": 2, "visitante": 2,
+}
+COLUNAS_ODDS = ["partida", "casa_aposta", "resultado", "odd"]
+
+
+def ler_arquivos_odds(caminhos):
+    # Aceita CSV no formato longo: partida, casa_aposta, resultado, odd
+    if isinstance(caminhos, (str, os.PathLike)):
+        caminhos = sorted(glob.glob(os.path.join(caminhos, "*.csv"))) if os.path.isdir(caminhos) else [caminhos]
+    tabelas = [pd.read_csv(c, usecols=COLUNAS_ODDS) for c in caminhos]
+    if not tabelas:
+        return pd.DataFrame(columns=COLUNAS_ODDS)
+    return pd.concat(tabelas, ignore_index=True)
+
+
+def codigos_resultado(serie):
+    # "1"/"X"/"2", "Vitória"/"Empate"/"Derrota" etc. -> 0, 1, 2
+    resultado = serie.astype(str).str.strip().str.lower().map(_APELIDOS_RESULTADO)
+    if resultado.isna().any():
+        invalidos = sorted(serie[resultado.isna()].astype(str).unique())
+        raise ValueError(f"Resultados não reconhecidos: {', '.join(invalidos)}")
+    return resultado.astype(int)
+
+
+def montar_tensor(df):
+    df = df.dropna(subset=COLUNAS_ODDS)
+    resultado = codigos_resultado(df["resultado"])
+
+    partida = pd.Categorical(df["partida"].astype(str))
+    casa = pd.Categorical(df["casa_aposta"].astype(str))
+    odds = np.full((len(partida.categories), len(casa.categories), 3), np.nan)
+    # Cotações repetidas: vale a última linha lida
+    odds[partida.codes, casa.codes, resultado.to_numpy(dtype=int)] = df["odd"].to_numpy(dtype=float)
+    odds[odds <= 1] = np.nan
+    return odds, list(partida.categories), list(casa.categories)
+
+
+def melhores_precos(odds, eixo_casas=1):
+    # Melhor odd e índice da casa que a oferece (-1 / NaN quando ninguém cotou)
+    sem_cotacao = np.isnan(odds).all(axis=eixo_casas)
+    preenchidas = np.where(np.isnan(odds), -np.inf, odds)
+    casa = np.where(sem_cotacao, -1, preenchidas.argmax(axis=eixo_casas))
+    melhor = np.where(sem_cotacao, np.nan, preenchidas.max(axis=eixo_casas))
+    return melhor, casa
+
+
+def margem(melhor):
+    # Soma das probabilidades implícitas nos melhores preços; < 1 indica surebet
+    return (1 / melhor).sum(axis=1)
+
+
+def dividir_stakes(melhor, banca):
+    # Stakes proporcionais a 1/odd: o retorno é o mesmo qualquer que seja o resultado
+    inverso = 1 / melhor
+    return banca * inverso / inverso.sum(axis=1, keepdims=True)
+
+
+def detectar_surebets(odds, partidas, casas, banca):
+    melhor, casa = melhores_precos(odds)
+    soma = margem(melhor)
+    arbitragem = np.flatnonzero(soma < 1)
+    stakes = dividir_stakes(melhor[arbitragem], banca)
+
+    nomes_casas = np.array(casas, dtype=object)
+    linhas = {"Jogo": np.array(partidas, dtype=object)[arbitragem]}
+    for k, nome in enumerate(RESULTADOS):
+        linhas[f"Odd {nome}"] = melhor[arbitragem, k]
+        linhas[f"Casa {nome}"] = nomes_casas[casa[arbitragem, k]]
+        linhas[f"Stake {nome} (R$)"] = stakes[:, k].round(2)
+    linhas["Lucro Garantido (%)"] = ((1 / soma[arbitragem] - 1) * 100).round(2)
+    linhas["Retorno (R$)"] = (banca / soma[arbitragem]).round(2)
+    return pd.DataFrame(linhas).sort_values("Lucro Garantido (%)", ascending=False, ignore_index=True)
+
+
+class IndiceMelhorPreco:
+    def __init__(self, odds):
+        self.odds = np.array(odds, dtype=float)
+        self.melhor, self.casa = melhores_precos(self.odds)
+
+    def atualizar(self, partida, casa, resultado, odd):
+        odd = np.nan if odd is None or odd <= 1 else float(odd)
+        self.odds[partida, casa, resultado] = odd
+        atual = self.melhor[partida, resultado]
+        if not np.isnan(odd) and (np.isnan(atual) or odd >= atual):
+            self.melhor[partida, resultado] = odd
+            self.casa[partida, resultado] = casa
+        elif self.casa[partida, resultado] == casa:
+            # A casa que tinha o melhor preço baixou ou retirou a odd: só essa linha é reavaliada
+            self._recalcular(np.array([partida]), np.array([resultado]))
+
+    def atualizar_lote(self, partidas, casas, resultados, odds):
+        partidas = np.asarray(partidas)
+        resultados = np.asarray(resultados)
+        odds = np.asarray(odds, dtype=float)
+        self.odds[partidas, casas, resultados] = np.where(odds > 1, odds, np.nan)
+        pares = np.unique(np.stack([partidas, resultados]), axis=1)
+        self._recalcular(pares[0], pares[1])
+
+    def _recalcular(self, partidas, resultados):
+        melhor, casa = melhores_precos(self.odds[partidas, :, resultados], eixo_casas=1)
+        self.melhor[partidas, resultados] = melhor
+        self.casa[partidas, resultados] = casa
+
+    def surebets(self):
+        return np.flatnonzero(margem(self.melhor) < 1)
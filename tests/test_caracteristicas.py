@@ -0,0 +1,32 @@
+# === Características: JSONL dividido em faixas de bytes ===
+import json
+
+import pandas as pd
+import pytest
+
+import caracteristicas
+
+
+@pytest.fixture
+def jsonl(tmp_path):
+    caminho = tmp_path / "eventos.jsonl"
+    with open(caminho, "w") as arquivo:
+        for i in range(500):
+            evento = {"partida": i % 7, "time": f"{'AB'[i % 2]}{i % 7}", "tipo": ["chute", "passe", "outro"][i % 3],
+                      "xg": (i % 10) / 10, "gol": i % 11 == 0, "duracao": (i % 5) / 2}
+            arquivo.write(json.dumps(evento) + ("\n\n" if i % 50 == 0 else "\n"))
+    return str(caminho)
+
+
+@pytest.mark.parametrize("tamanho_fatia", [1, 97, 1000, 4096])
+def test_faixas_cobrem_cada_linha_uma_vez(jsonl, tamanho_fatia):
+    eventos = [e for _, inicio, fim in caracteristicas.fatias_arquivo(jsonl, tamanho_fatia)
+               for e in caracteristicas.ler_faixa(jsonl, inicio, fim)]
+    assert eventos == list(caracteristicas.ler_eventos(jsonl))
+
+
+def test_arquivo_em_faixas_agrega_igual_ao_inteiro(jsonl):
+    inteiro = pd.DataFrame(caracteristicas.agregar_arquivo(jsonl, tamanho_fatia=10 ** 9))
+    em_faixas = pd.DataFrame(caracteristicas.agregar_arquivo(jsonl, tamanho_fatia=300))
+    pd.testing.assert_frame_equal(em_faixas.sort_values(["partida", "time"], ignore_index=True),
+                                  inteiro.sort_values(["partida", "time"], ignore_index=True))
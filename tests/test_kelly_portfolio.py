@@ -0,0 +1,29 @@
+# === Kelly de carteira: fração de Kelly e tetos de exposição ===
+import numpy as np
+import pytest
+
+from kelly_portfolio import kelly_carteira
+
+# Quatro jogos com bastante valor na vitória: o Kelly cheio passaria do teto total
+PROBS = np.tile([0.6, 0.25, 0.15], (4, 1))
+ODDS = np.tile([2.2, 3.5, 6.0], (4, 1))
+
+
+def test_fracao_vale_antes_do_teto_total():
+    cheio = kelly_carteira(PROBS, ODDS, limite_total=0.25, limite_aposta=1.0, fracao=1.0)
+    metade = kelly_carteira(PROBS, ODDS, limite_total=0.25, limite_aposta=1.0, fracao=0.5)
+    assert cheio.sum() == pytest.approx(0.25, abs=1e-6)
+    # Metade do Kelly livre (~0,67 / 2) ainda passa de 25%: o teto segue valendo inteiro
+    assert metade.sum() == pytest.approx(0.25, abs=1e-6)
+
+
+def test_fracao_escala_quando_os_tetos_nao_prendem():
+    cheio = kelly_carteira(PROBS[:1], ODDS[:1], limite_total=0.99, limite_aposta=0.99, fracao=1.0)
+    metade = kelly_carteira(PROBS[:1], ODDS[:1], limite_total=0.99, limite_aposta=0.99, fracao=0.5)
+    np.testing.assert_allclose(metade, cheio / 2, atol=1e-5)
+
+
+def test_teto_por_aposta():
+    fracoes = kelly_carteira(PROBS, ODDS, limite_total=0.5, limite_aposta=0.05, fracao=0.5)
+    assert fracoes.max() <= 0.05 + 1e-9
+    assert fracoes.max() == pytest.approx(0.05, abs=1e-6)
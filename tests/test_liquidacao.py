@@ -0,0 +1,71 @@
+# === Liquidação: retorno por unidade apostada em cada mercado ===
+import numpy as np
+import pandas as pd
+import pytest
+
+import calibracao
+
+import liquidacao
+from liquidacao import CASA, CODIGOS_MERCADO, EMPATE, FORA, MERCADO_1X2
+from nucleo import MERCADOS
+
+ODD = 2.0
+
+
+def retorno(mercado, selecao, gols_casa, gols_fora, linha=np.nan):
+    return float(liquidacao.retornos(
+        [CODIGOS_MERCADO[mercado]], [selecao], [linha], [ODD], [gols_casa], [gols_fora]
+    )[0])
+
+
+@pytest.mark.parametrize("selecao, placar, esperado", [
+    (CASA, (2, 0), ODD), (CASA, (1, 1), 0.0), (CASA, (0, 1), 0.0),
+    (EMPATE, (1, 1), ODD), (EMPATE, (2, 0), 0.0),
+    (FORA, (0, 1), ODD), (FORA, (2, 0), 0.0),
+])
+def test_1x2(selecao, placar, esperado):
+    assert retorno(MERCADO_1X2, selecao, *placar) == esperado
+
+
+@pytest.mark.parametrize("selecao, placar, esperado", [
+    (CASA, (2, 0), ODD), (CASA, (1, 1), 1.0), (CASA, (0, 1), 0.0),
+    (FORA, (0, 1), ODD), (FORA, (1, 1), 1.0), (FORA, (2, 0), 0.0),
+])
+def test_empate_anula(selecao, placar, esperado):
+    assert retorno(MERCADOS[0], selecao, *placar) == esperado
+
+
+@pytest.mark.parametrize("selecao, placar, esperado", [
+    # Casa ou empate: o visitante fica de fora
+    (FORA, (2, 0), ODD), (FORA, (1, 1), ODD), (FORA, (0, 1), 0.0),
+    # Empate ou visitante: a casa fica de fora
+    (CASA, (0, 1), ODD), (CASA, (1, 1), ODD), (CASA, (2, 0), 0.0),
+])
+def test_dupla_possibilidade(selecao, placar, esperado):
+    assert retorno(MERCADOS[1], selecao, *placar) == esperado
+
+
+@pytest.mark.parametrize("selecao, linha, placar, esperado", [
+    # -0,25: metade em 0 (devolve no empate) e metade em -0,5 (perde no empate)
+    (CASA, -0.25, (1, 0), ODD), (CASA, -0.25, (1, 1), 0.5), (CASA, -0.25, (0, 1), 0.0),
+    # -0,75: vitória por um gol ganha meia (-0,5) e devolve meia (-1)
+    (CASA, -0.75, (1, 0), (ODD + 1) / 2), (CASA, -0.75, (2, 0), ODD), (CASA, -0.75, (1, 1), 0.0),
+    # +0,25 para o visitante: empate ganha meia e devolve meia
+    (FORA, 0.25, (1, 1), (ODD + 1) / 2), (FORA, 0.25, (1, 0), 0.0), (FORA, 0.25, (0, 1), ODD),
+])
+def test_handicap_quarto(selecao, linha, placar, esperado):
+    assert retorno(MERCADOS[2], selecao, *placar, linha=linha) == pytest.approx(esperado)
+
+
+def test_mercado_desconhecido_fica_aberto():
+    assert np.isnan(liquidacao.retornos([-1], [CASA], [np.nan], [ODD], [1], [0])[0])
+
+
+def test_liquidar_dupla_possibilidade_casa_ou_empate(tmp_path):
+    # Registrada como na página: casa ou empate grava o visitante como seleção
+    pasta = str(tmp_path)
+    liquidacao.registrar_aposta("A x B", "ana", MERCADOS[1], 1.4, 10, 100, selecao=FORA, pasta=pasta)
+    calibracao.importar_resultados(pd.DataFrame({"partida": ["A x B"], "gols_casa": [1], "gols_fora": [0]}), pasta)
+    liquidadas = liquidacao.liquidar(pasta)
+    assert liquidadas["retorno"].tolist() == pytest.approx([14.0])
+    assert liquidacao.saldo("ana", pasta) == pytest.approx(104.0)
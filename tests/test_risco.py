@@ -0,0 +1,30 @@
+# === Risco: fórmulas analíticas x simulação ===
+import numpy as np
+import pytest
+
+import risco
+
+
+@pytest.mark.parametrize("vantagem, odd, fracao", [(0.05, 2.0, 0.5), (0.05, 2.0, 1.0), (0.1, 3.0, 0.5)])
+def test_metade_inicial_confere_com_a_simulacao(vantagem, odd, fracao):
+    # x^(2g/s²) é a chance de um dia chegar a x da banca inicial: a simulação longa,
+    # com limite 0,5, fica logo abaixo (horizonte finito e saltos discretos)
+    analitico = risco.risco_analitico(vantagem, odd, fracao)
+    uniformes = np.random.default_rng(1).random((2000, 4000), dtype=np.float32)
+    simulado = risco.simular((1 + vantagem) / odd, odd, [float(analitico["fracao_banca"])], 0.5, 4000, uniformes)
+    assert simulado["ruina_simulada"][0] == pytest.approx(float(analitico["metade_inicial"]), rel=0.2)
+    assert simulado["ruina_simulada"][0] <= float(analitico["metade_inicial"])
+
+
+def test_metade_inicial_com_fracao_de_kelly():
+    # Aproximação contínua: com uma fração c do Kelly o expoente é 2/c - 1
+    for fracao in (0.25, 0.5, 1.0):
+        analitico = risco.risco_analitico(0.02, 2.0, fracao)
+        assert float(analitico["metade_inicial"]) == pytest.approx(0.5 ** (2 / fracao - 1), rel=0.05)
+
+
+def test_queda_do_pico_nao_e_a_metade_inicial():
+    # A queda máxima a partir do pico (simulada) passa da chance de chegar à metade inicial
+    analitico = risco.risco_analitico(0.05, 2.0, 0.5)
+    simulado = risco.simular(1.05 / 2.0, 2.0, [float(analitico["fracao_banca"])], horizonte=4000)
+    assert simulado["queda_maxima"][0] > 0.5 > float(analitico["metade_inicial"])
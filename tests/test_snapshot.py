@@ -0,0 +1,41 @@
+# === Snapshot: ida e volta e estados extremos ===
+import math
+
+import pytest
+
+import snapshot
+from nucleo import FATORES_PADRAO, montar_resposta
+
+
+def estado(**mudancas):
+    base = {
+        "fase": 2, "etapa": 3, "subfase_kelly": 0, "mercado_escolhido": None,
+        "fatores": FATORES_PADRAO, "questionario": snapshot.ID_QUESTIONARIO_PADRAO,
+        "respostas": [montar_resposta(0, pergunta, peso, "A", "B") for pergunta, peso in FATORES_PADRAO[:3]],
+        "time_casa": "A", "time_fora": "B", "odd_vitoria": 1.8, "odd_empate": 3.2, "odd_derrota": 4.0, "banca": 100.0,
+    }
+    return {**base, **mudancas}
+
+
+def test_ida_e_volta():
+    decodificado = snapshot.decodificar_snapshot(snapshot.codificar_snapshot(estado()))
+    assert (decodificado["etapa"], decodificado["odd_vitoria"], decodificado["banca"]) == (3, 1.8, 100.0)
+    assert len(decodificado["respostas"]) == 3
+
+
+@pytest.mark.parametrize("odd, esperada", [(1e12, (2 ** 32 - 1) / 100), (math.nan, 0.0), (math.inf, 0.0), (-2.0, 0.0)])
+def test_odds_fora_do_campo_sao_limitadas(odd, esperada):
+    decodificado = snapshot.decodificar_snapshot(snapshot.codificar_snapshot(estado(odd_vitoria=odd)))
+    assert decodificado["odd_vitoria"] == esperada
+
+
+def test_mais_de_255_fatores():
+    fatores = [("Pergunta", 1)] * 300
+    codigo = snapshot.codificar_snapshot(estado(fatores=fatores, etapa=299))
+    decodificado = snapshot.decodificar_snapshot(codigo, {snapshot.ID_QUESTIONARIO_PADRAO: fatores})
+    assert (len(decodificado["fatores"]), decodificado["etapa"]) == (300, 299)
+
+
+def test_estado_que_nao_cabe_vira_value_error():
+    with pytest.raises(ValueError):
+        snapshot.codificar_snapshot(estado(fase=300))
@@ -0,0 +1,69 @@
+# === Workspace da rodada: vários jogos, cada um com o seu checklist ===
+# Cada partida guarda o próprio progresso e os saldos acumulados, então responder
+# uma pergunta não depende das outras partidas nem do tamanho do workspace.
+import pandas as pd
+
+from nucleo import CASA, FORA, NENHUM, montar_resposta
+from regras import SEM_RESPOSTA
+
+
+def nova_partida(pid, time_casa, time_fora, odds, questionario, fatores):
+    return {
+        "id": pid,
+        "time_casa": time_casa,
+        "time_fora": time_fora,
+        "odds": tuple(odds),
+        "questionario": questionario,
+        "fatores": list(fatores),
+        "respostas": [],
+        "etapa": 0,
+        "saldo_casa": 0,
+        "saldo_fora": 0,
+    }
+
+
+def concluida(partida):
+    return partida["etapa"] >= len(partida["fatores"])
+
+
+def responder(partida, codigo):
+    if concluida(partida):
+        return
+    pergunta, peso = partida["fatores"][partida["etapa"]]
+    partida["respostas"].append(
+        montar_resposta(codigo, pergunta, peso, partida["time_casa"], partida["time_fora"])
+    )
+    if codigo == CASA:
+        partida["saldo_casa"] += peso
+    elif codigo == FORA:
+        partida["saldo_fora"] += peso
+    partida["etapa"] += 1
+
+
+def responder_com_codigos(partida, codigos):
+    # Respostas dos dados da etapa atual até o fim; pergunta sem dados fica "Nenhum"
+    while not concluida(partida):
+        codigo = codigos[partida["etapa"]]
+        responder(partida, NENHUM if codigo == SEM_RESPOSTA else int(codigo))
+
+
+def reiniciar(partida):
+    partida.update(respostas=[], etapa=0, saldo_casa=0, saldo_fora=0)
+
+
+def resumo_partidas(partidas, tabelas):
+    # tabelas: {id do questionário: TabelaPontuacao}
+    linhas = []
+    for partida in partidas:
+        tabela = tabelas[partida["questionario"]]
+        vitoria, empate, derrota = tabela.pontuar(partida["saldo_casa"], partida["saldo_fora"])
+        odd_vitoria = partida["odds"][0]
+        linhas.append({
+            "Jogo": f"{partida['time_casa']} x {partida['time_fora']}",
+            "Progresso": f"{partida['etapa']}/{len(partida['fatores'])}",
+            "Vitória (%)": vitoria,
+            "Empate (%)": empate,
+            "Derrota (%)": derrota,
+            "EV Vitória": round(vitoria / 100 * odd_vitoria - 1, 2),
+        })
+    return pd.DataFrame(linhas, columns=["Jogo", "Progresso", "Vitória (%)", "Empate (%)", "Derrota (%)", "EV Vitória"])